@@ -0,0 +1,168 @@
+# src/bench/browser.py
+# ============================================================
+# BENCH: perfil de Chrome "full" vs "lean" (bytes, latencia, RSS)
+# ============================================================
+# Uso:
+#   python -m src.bench.browser [--pages 20] [--profiles full,lean] [--json out.json]
+#
+# - Servidor local con páginas sintéticas tipo Nitter que además referencian
+#   lo que trae una búsqueda real: avatares (/pic/), previews de media,
+#   un video y una fuente web. El servidor cuenta los bytes servidos por tipo.
+# - Cada página se abre con SeleniumPager.open (misma espera de "página
+#   lista" que la corrida real): latencia = get + espera.
+# - RSS: suma del árbol de procesos de Chrome al final (psutil si está
+#   instalado; si no, /proc en Linux).
+# Requiere Chrome + undetected_chromedriver (no corre en CI sin navegador).
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from src.bench.fixtures import timeline_page_html
+from src.config.settings import Settings
+
+_ASSET_SIZES = {"pic": 24_000, "video": 300_000, "fonts": 60_000}
+_ASSET_TYPES = {"pic": "image/jpeg", "video": "video/mp4", "fonts": "font/woff2"}
+_CSS = (b"@font-face{font-family:Bench;src:url(/fonts/bench.woff2) format('woff2')}"
+        b"body{font-family:Bench,sans-serif}")
+_MEDIA = ('<div class="attachments"><img src="/pic/media%2Fcard{k}.jpg" alt="">'
+          '<video src="/video/clip{k}.mp4" preload="auto" muted></video></div>')
+
+
+class _Counter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.by_kind: dict[str, int] = {}
+
+    def add(self, kind: str, n: int) -> None:
+        with self.lock:
+            self.by_kind[kind] = self.by_kind.get(kind, 0) + n
+
+    def reset(self) -> dict[str, int]:
+        with self.lock:
+            out, self.by_kind = self.by_kind, {}
+        return out
+
+
+def _page_html(page: int) -> bytes:
+    html = timeline_page_html(20, seed=3, page_index=page)
+    html = html.replace("</head>", '<link rel="stylesheet" href="/css/bench.css"></head>', 1)
+    html = html.replace('<div class="timeline">', '<div class="timeline">' + _MEDIA.format(k=page), 1)
+    return html.encode("utf-8")
+
+
+def _make_handler(counter: _Counter):
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            first = self.path.lstrip("/").split("/", 1)[0].split("?", 1)[0]
+            if first in _ASSET_SIZES:
+                kind, body, ctype = first, b"\0" * _ASSET_SIZES[first], _ASSET_TYPES[first]
+            elif first == "css":
+                kind, body, ctype = "css", _CSS, "text/css"
+            else:
+                page = 0
+                if "page=" in self.path:
+                    page = int(self.path.rsplit("page=", 1)[1].split("&", 1)[0] or 0)
+                kind, body, ctype = "html", _page_html(page), "text/html; charset=utf-8"
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+                counter.add(kind, len(body))
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Chrome cancela media que ya no necesita
+
+        def log_message(self, *args):
+            pass
+
+    return _Handler
+
+
+def run_profile(profile: str, base_url: str, pages: int, counter: _Counter, settings: Settings) -> dict:
+    from src.scraping.browser import browser_pid, driver_factory_from_settings, process_tree_rss_mb
+    from src.scraping.fetchers import SeleniumPager
+
+    s = replace(settings, BROWSER_PROFILE=profile, PACING_MODE="fixed")
+    t0 = time.perf_counter()
+    driver = driver_factory_from_settings(s)()
+    startup_sec = time.perf_counter() - t0
+    counter.reset()
+
+    latencies, items = [], 0
+    try:
+        pager = SeleniumPager(driver, s)
+        for k in range(pages):
+            t = time.perf_counter()
+            pager.open(f"{base_url}/search?f=tweets&q=bench&page={k}")
+            latencies.append(time.perf_counter() - t)
+            items += len(pager.items())
+        time.sleep(1.0)  # media/fuentes que siguen bajando tras "página lista"
+        rss_mb = process_tree_rss_mb(browser_pid(driver))
+    finally:
+        driver.quit()
+
+    by_kind = counter.reset()
+    lat = sorted(latencies)
+    return {
+        "profile": profile,
+        "pages": pages,
+        "items": items,
+        "startup_sec": startup_sec,
+        "bytes_total": sum(by_kind.values()),
+        "bytes_per_page": sum(by_kind.values()) / max(1, pages),
+        "bytes_by_kind": by_kind,
+        "latency_p50_ms": statistics.median(lat) * 1000 if lat else None,
+        "latency_p95_ms": lat[min(len(lat) - 1, int(0.95 * len(lat)))] * 1000 if lat else None,
+        "rss_mb": rss_mb,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.bench.browser")
+    ap.add_argument("--pages", type=int, default=20)
+    ap.add_argument("--profiles", default="full,lean")
+    ap.add_argument("--json", type=Path, default=None, help="Guarda los resultados en JSON.")
+    args = ap.parse_args(argv)
+
+    counter = _Counter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(counter))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = []
+    try:
+        for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+            print(f"🧪 Perfil {profile}: {args.pages} páginas...")
+            results.append(run_profile(profile, base_url, args.pages, counter, Settings()))
+    except Exception as e:
+        print(f"❌ No se pudo correr el bench de navegador (¿Chrome instalado?): {e}")
+        return 1
+    finally:
+        server.shutdown()
+
+    print(f"{'perfil':<8}{'items':>7}{'KB/página':>12}{'p50 ms':>9}{'p95 ms':>9}{'RSS MB':>9}{'arranque s':>12}")
+    for r in results:
+        rss = f"{r['rss_mb']:.0f}" if r["rss_mb"] is not None else "n/d"
+        print(f"{r['profile']:<8}{r['items']:>7}{r['bytes_per_page'] / 1000:>12.1f}"
+              f"{r['latency_p50_ms']:>9.0f}{r['latency_p95_ms']:>9.0f}{rss:>9}{r['startup_sec']:>12.1f}")
+        print(f"         bytes por tipo: {r['bytes_by_kind']}")
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
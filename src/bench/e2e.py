@@ -0,0 +1,310 @@
+# src/bench/e2e.py
+# ============================================================
+# BENCH: end-to-end de run_study contra mirrors simulados locales
+# ============================================================
+# Uso:
+#   python -m src.bench.e2e [--scenario mixed] [--hours 2] [--workers 4]
+#                           [--mirror "lento:latency=600,error=0.1"] ...
+#                           [--set RATE_MAX_RPS=10] ... [--json out.json] [--trace trace.json]
+#                           [--verbose]
+#
+# - Arranca 1 MockMirror (src/bench/mock_mirror.py) por perfil del escenario
+#   (o por cada --mirror) y corre run_study con esas URLs en lugar de MIRRORS.
+# - Backend http (sin Chrome), pacing adaptativo y scheduler de mirrors como
+#   en una corrida real; logs, dataset, ledger, dedup y archivo HTML en un
+#   directorio temporal (ledger, dedup y archivo apagados por defecto).
+# - --set KEY=VALUE cambia un campo de Settings; los objetos de la corrida
+#   (planner, dedup, archivo, ledger, ...) salen de build_run_components, igual
+#   que en main. Los campos que el harness no usa (IGNORED_SETTINGS) se rechazan.
+# - Reporta tweets/min, p50/p95 del tiempo por subventana (suma de t_total_sec
+#   de sus intentos en request_log; en hedge, el intento más lento del par),
+#   failover (unidades con > 1 intento), errores por tipo y contadores por
+#   mirror (telemetría + servidor), y el tiempo total por etapa (spans).
+# - El encabezado muestra el tramo realmente scrapeado (horas enteras desde
+#   --start, según request_log), no solo el pedido.
+# Todo local: repetible entre commits (misma semilla -> mismos tweets).
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, fields, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.bench.mock_mirror import MockMirror, parse_profile, start_mirrors
+from src.utils.spans import stage_totals, start_trace, stop_trace
+
+SCENARIOS: dict[str, tuple[str, ...]] = {
+    "healthy": ("a:latency=80", "b:latency=100", "c:latency=120"),
+    "mixed": ("rapido:latency=80", "lento:latency=600,sigma=0.8", "inestable:latency=150,error=0.3",
+              "limitado:latency=150,rl=0.3"),
+    "degraded": ("inestable:latency=200,error=0.4", "limitado:latency=200,rl=0.5",
+                 "vacio:latency=400,sigma=0.6,empty=0.4"),
+}
+
+
+# Campos de Settings sin efecto en el harness (--set los rechaza en vez de ignorarlos en silencio).
+IGNORED_SETTINGS: dict[str, str] = {
+    "FETCH_BACKEND": "el harness corre siempre con backend http (sin Chrome)",
+    "TRACE_ENABLED": "usar --trace",
+    "TRACE_PATH": "usar --trace",
+    "METRICS_ENABLED": "el endpoint /metrics solo lo abre main",
+    "METRICS_PORT": "el endpoint /metrics solo lo abre main",
+    "METRICS_HOST": "el endpoint /metrics solo lo abre main",
+}
+
+
+def _coerce(settings, key: str, value: str):
+    """Valor de --set con el tipo del campo actual de Settings."""
+    names = {f.name for f in fields(settings)}
+    if key not in names:
+        raise ValueError(f"Settings no tiene el campo {key!r}")
+    if key in IGNORED_SETTINGS:
+        raise ValueError(f"--set {key} no tiene efecto en el bench e2e: {IGNORED_SETTINGS[key]}")
+    current = getattr(settings, key)
+    if isinstance(current, bool):
+        return value.strip().lower() in ("1", "true", "yes", "si", "sí")
+    if isinstance(current, tuple):
+        return tuple(type(current[0])(v) if current else v for v in value.split(","))
+    if isinstance(current, Path):
+        return Path(value)
+    return type(current)(value)
+
+
+def bench_settings(tmp: Path, workers: int, rps: float, overrides: list[str]):
+    from src.config.settings import Settings
+
+    s = replace(
+        Settings(),
+        FETCH_BACKEND="http",
+        WORKERS=max(1, workers),
+        PACING_MODE="adaptive",
+        RATE_INITIAL_RPS=rps,
+        RATE_MAX_RPS=rps * 4,
+        LEDGER_ENABLED=False,
+        RESUME=False,
+        DEDUP_ENABLED=False,
+        ARCHIVE_ENABLED=False,
+        DATASET_FORMAT="csv",
+        DATASET_PATH=tmp / "dataset.csv",
+        DATASET_PARQUET_DIR=tmp / "dataset",
+        WINDOW_LOG_PATH=tmp / "window_log.csv",
+        REQUEST_LOG_PATH=tmp / "request_log.csv",
+        DRIVER_LOG_PATH=tmp / "driver_log.csv",
+        RUN_SUMMARY_PATH=tmp / "run_summary.json",
+        LEDGER_PATH=tmp / "progress_ledger.sqlite",
+        DEDUP_DB_PATH=tmp / "status_ids.sqlite",
+        DEDUP_BLOOM_PATH=tmp / "status_ids.bloom",
+        ARCHIVE_DIR=tmp / "html_archive",
+    )
+    for item in overrides:
+        key, _, value = item.partition("=")
+        s = replace(s, **{key.strip(): _coerce(s, key.strip(), value)})
+    return s
+
+
+def subwindow_times(request_log: Path) -> tuple[list[float], Counter, int, tuple[str, str] | None]:
+    """
+    Segundos por unidad (subventana x canal), errores por tipo, unidades con failover
+    y el tramo realmente scrapeado (primer window_id, último window_end; hora local).
+    """
+    units: dict[tuple, dict] = defaultdict(lambda: {"serial": 0.0, "hedge": 0.0, "attempts": 0})
+    errors: Counter = Counter()
+    if not request_log.exists():
+        return [], errors, 0, None
+    with open(request_log, newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            u = units[(r["window_id"], r["window_end"], r["channel"])]
+            t = float(r["t_total_sec"] or 0.0)
+            if r.get("hedge_role"):
+                u["hedge"] = max(u["hedge"], t)
+            else:
+                u["serial"] += t
+            u["attempts"] += 1
+            if r["had_error"] == "1":
+                errors[r["error_type"] or "error"] += 1
+    times = [u["serial"] + u["hedge"] for u in units.values()]
+    failover = sum(1 for u in units.values() if u["attempts"] > 1)
+    span = (min(k[0] for k in units), max(k[1] for k in units)) if units else None
+    return times, errors, failover, span
+
+
+def _pct(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    v = sorted(values)
+    return v[min(len(v) - 1, int(q * len(v)))]
+
+
+def run_e2e(mirrors: list[MockMirror], settings, start_local: datetime, hours: float, verbose: bool) -> dict:
+    from src.scraping.orchestrator import build_run_components, run_study
+    from src.utils.logging import Telemetry, start_background_writer, stop_background_writer
+
+    urls = [m.url for m in mirrors]
+    telemetry = Telemetry(
+        request_log_path=settings.REQUEST_LOG_PATH,
+        run_summary_path=settings.RUN_SUMMARY_PATH,
+        write_header_if_new=True,
+        request_log_flush_every=settings.REQUEST_LOG_FLUSH_EVERY,
+        driver_log_path=settings.DRIVER_LOG_PATH,
+    )
+
+    out = sys.stdout if verbose else io.StringIO()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        if settings.BACKGROUND_WRITER:
+            start_background_writer(max_queue=settings.WRITER_QUEUE_MAX)
+        # Mismo armado que main: planner, dedup, archivo, ledger, scheduler y rate limiter según Settings
+        comps = build_run_components(settings, telemetry, urls)
+        try:
+            run_study(
+                driver=None,
+                mirrors=urls,
+                settings=settings,
+                telemetry=telemetry,
+                start_study=start_local,
+                end_study=start_local + timedelta(hours=hours),
+                **comps.run_kwargs(),
+            )
+        finally:
+            comps.writer.flush()
+            telemetry.flush_request_log()
+            stop_background_writer()
+            extra = comps.summary_extra()
+            if comps.ledger is not None:
+                extra["ledger"] = comps.ledger.summary()
+            comps.close()
+    elapsed = time.perf_counter() - t0
+    rate_limiter = comps.rate_limiter
+
+    times, errors, failover, span = subwindow_times(settings.REQUEST_LOG_PATH)
+    s = telemetry.stats
+    by_mirror = {}
+    for m in mirrors:
+        t = s.by_mirror.get(m.url, {})
+        by_mirror[m.profile.name] = {
+            "requests": t.get("requests", 0), "ok": t.get("ok", 0), "empty": t.get("empty", 0),
+            "error": t.get("error", 0), "tweets": t.get("tweets", 0),
+            "server": {k: v for k, v in m.snapshot().items() if k not in ("name", "url")},
+        }
+    return {
+        "elapsed_sec": elapsed,
+        "units": len(times),
+        "span": span,
+        "rows_written": s.total_rows_written,
+        "tweets_per_min": s.total_rows_written / elapsed * 60 if elapsed > 0 else None,
+        "attempts": s.total_requests,
+        "pages": s.total_pages,
+        "subwindow_p50_sec": statistics.median(times) if times else None,
+        "subwindow_p95_sec": _pct(times, 0.95),
+        "failover_units": failover,
+        "errors": dict(errors),
+        "hedges": {"started": s.hedges_started, "wins": s.hedge_wins},
+        "by_mirror": by_mirror,
+        "mirror_rate": rate_limiter.snapshot() if rate_limiter is not None else None,
+        "stage_sec": stage_totals(),
+        "planner": {"rows_derived": s.planner_rows_derived, "queries_saved": s.planner_queries_saved,
+                    "topups": s.planner_topups},
+        "rows_deduped": s.total_rows_deduped,
+        "archive": extra.get("archive"),
+        "ledger": extra.get("ledger"),
+    }
+
+
+def print_results(res: dict) -> None:
+    m = res["meta"]
+    p50, p95 = res["subwindow_p50_sec"], res["subwindow_p95_sec"]
+    span = f"{res['span'][0]} -> {res['span'][1]}" if res["span"] else "sin unidades"
+    print(f"🧪 E2E | escenario={m['scenario']} | {m['hours']} h desde {m['start']} | scrapeado {span} | "
+          f"workers={m['workers']}")
+    print(f"   {res['units']} unidades | {res['attempts']} intentos | {res['pages']} páginas | "
+          f"{res['rows_written']} filas en {res['elapsed_sec']:.1f} s")
+    print(f"   ⚡ {res['tweets_per_min']:.0f} tweets/min | subventana p50={p50 or 0:.2f} s p95={p95 or 0:.2f} s | "
+          f"failover en {res['failover_units']} unidades | errores={res['errors'] or '-'}")
+    pl, arc = res["planner"], res["archive"]
+    extras = []
+    if pl["rows_derived"] or pl["queries_saved"]:
+        extras.append(f"planner: {pl['rows_derived']} filas derivadas, {pl['queries_saved']} queries ahorradas, "
+                      f"{pl['topups']} top-ups")
+    if res["rows_deduped"]:
+        extras.append(f"dedup: {res['rows_deduped']} repetidas")
+    if arc is not None:
+        extras.append(f"archivo: {arc['pages']} páginas, {arc['blobs']} blobs, ratio {arc['ratio']}")
+    if res["ledger"] is not None:
+        extras.append(f"ledger: {res['ledger']}")
+    if extras:
+        print("   🧩 " + " | ".join(extras))
+    stages = sorted(res["stage_sec"].items(), key=lambda kv: -kv[1])
+    print("   ⏱️ etapas (s): " + " | ".join(f"{k}={v:.1f}" for k, v in stages))
+    print(f"{'mirror':<12}{'req':>6}{'ok':>6}{'empty':>7}{'error':>7}{'tweets':>8}"
+          f"{'srv 429':>9}{'srv 500':>9}{'srv ms':>8}")
+    for name, r in res["by_mirror"].items():
+        srv = r["server"]
+        print(f"{name:<12}{r['requests']:>6}{r['ok']:>6}{r['empty']:>7}{r['error']:>7}{r['tweets']:>8}"
+              f"{srv['rate_limited']:>9}{srv['error']:>9}{srv['latency_avg_ms'] or 0:>8.0f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.bench.e2e")
+    ap.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    ap.add_argument("--mirror", action="append", default=[],
+                    help='Perfil de mirror (repetible; reemplaza el escenario), p.ej. "lento:latency=600".')
+    ap.add_argument("--hours", type=float, default=2.0)
+    ap.add_argument("--start", default="2025-06-04 08:00", help="Inicio del estudio (hora local Bogotá).")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--rps", type=float, default=5.0, help="RATE_INITIAL_RPS por mirror (RATE_MAX_RPS = 4x).")
+    ap.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                    help="Cambia un campo de Settings (repetible).")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", type=Path, default=None, help="Guarda los resultados en JSON.")
+    ap.add_argument("--trace", type=Path, default=None, help="Exporta los spans en formato Chrome trace.")
+    ap.add_argument("--verbose", action="store_true", help="Muestra la salida de run_study.")
+    args = ap.parse_args(argv)
+
+    from src.config.settings import TZ_LOCAL
+
+    profiles = [parse_profile(s) for s in (args.mirror or SCENARIOS[args.scenario])]
+    start_local = datetime.strptime(args.start, "%Y-%m-%d %H:%M").replace(tzinfo=TZ_LOCAL)
+    mirrors = start_mirrors(profiles, seed=args.seed)
+    if args.trace is not None:
+        start_trace(args.trace)
+    try:
+        with tempfile.TemporaryDirectory(prefix="e2e-") as tmp:
+            try:
+                settings = bench_settings(Path(tmp), args.workers, args.rps, args.overrides)
+            except ValueError as e:
+                ap.error(str(e))
+            res = run_e2e(mirrors, settings, start_local, args.hours, args.verbose)
+    finally:
+        for m in mirrors:
+            m.stop()
+        stop_trace()
+
+    res["meta"] = {
+        "scenario": "custom" if args.mirror else args.scenario,
+        "profiles": [asdict(p) for p in profiles],
+        "hours": args.hours,
+        "start": args.start,
+        "workers": args.workers,
+        "rps": args.rps,
+        "overrides": args.overrides,
+        "ts_utc": datetime.utcnow().isoformat(),
+    }
+    print_results(res)
+    if args.json is not None:
+        args.json.write_text(json.dumps(res, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
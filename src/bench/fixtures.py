@@ -0,0 +1,153 @@
+# src/bench/fixtures.py
+# ============================================================
+# FIXTURES SINTÉTICAS: HTML tipo Nitter para benchmarks offline
+# ============================================================
+# Nota:
+# - Reproduce la estructura que usa el extractor: div.timeline-item con
+#   a.tweet-link, span.tweet-date > a[title], div.tweet-content,
+#   a.username, span.tweet-stat, y el "Load more" (div.show-more, cursor=).
+# - Determinista por seed; permite variar densidad de casos raros
+#   (fechas faltantes, stats atípicos, items fuera de ventana, quotes).
+# ============================================================
+
+from __future__ import annotations
+
+import html as _html
+import random
+from datetime import datetime, timedelta, timezone
+
+_WORDS = (
+    "Petro", "Uribe", "Congreso", "seguridad", "paz total", "reforma", "Senado", "inflación",
+    "corrupción", "democracia", "Bogotá", "Medellín", "marchas", "protesta", "ñandú", "acción",
+    "🇨🇴", "😡", "👏", "política", "elecciones", "Fiscalía", "dólar", "empleo",
+)
+_HASHTAGS = ("#Colombia", "#ReformaLaboral", "#PazTotal", "#Petro", "#Congreso")
+_MENTIONS = ("@petrogustavo", "@AlvaroUribeVel", "@ELTIEMPO", "@RevistaSemana", "@FicoGutierrez")
+_STATS_NORMAL = ("0", "3", "12", "1,234", "56", "1.2K", "3,4K", "1.1M", "987")
+_STATS_ODD = ("—", "", "N/A", " 7 ", "12.5K", "2M", "1 234")
+
+
+def nitter_title(dt_utc: datetime) -> str:
+    """Formato del atributo title de span.tweet-date > a (ej. 'Jun 4, 2025 · 11:59 PM UTC')."""
+    hour12 = dt_utc.hour % 12 or 12
+    ampm = "AM" if dt_utc.hour < 12 else "PM"
+    return f"{dt_utc.strftime('%b')} {dt_utc.day}, {dt_utc.year} · {hour12}:{dt_utc.minute:02d} {ampm} UTC"
+
+
+def _content_html(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(4, 28)):
+        r = rng.random()
+        if r < 0.08:
+            h = rng.choice(_HASHTAGS)
+            parts.append(f'<a href="/search?q=%23{h[1:]}">{h}</a>')
+        elif r < 0.14:
+            m = rng.choice(_MENTIONS)
+            parts.append(f'<a href="/{m[1:]}">{m}</a>')
+        elif r < 0.16:
+            parts.append('<a href="https://t.co/xyz">elpais.com.co/politica/…</a>')
+        elif r < 0.18:
+            parts.append("\n")
+        elif r < 0.19:
+            parts.append("&amp; &quot;citas&quot;&nbsp;")
+        else:
+            parts.append(_html.escape(rng.choice(_WORDS)))
+    return " ".join(parts)
+
+
+def _stats_html(rng: random.Random, odd_stats_rate: float) -> str:
+    n = 4
+    pool = _STATS_NORMAL
+    if rng.random() < odd_stats_rate:
+        n = rng.choice((0, 2, 3, 4, 5))
+        pool = _STATS_ODD + _STATS_NORMAL
+    icons = ("comment", "retweet", "quote", "heart", "views")
+    spans = []
+    for k in range(n):
+        spans.append(
+            f'<span class="tweet-stat"><div class="icon-container">'
+            f'<span class="icon-{icons[k % len(icons)]}" title=""></span> {rng.choice(pool)}</div></span>'
+        )
+    return f'<div class="tweet-stats">{"".join(spans)}</div>'
+
+
+def tweet_item_html(rng: random.Random, status_id: int, dt_utc: datetime, *,
+                    missing_date: bool = False, iso_only: bool = False,
+                    no_link: bool = False, no_content: bool = False,
+                    quote: bool = False, odd_stats_rate: float = 0.0) -> str:
+    user = rng.choice(_MENTIONS)[1:]
+    link = "" if no_link else f'<a class="tweet-link" href="/{user}/status/{status_id}#m"></a>'
+
+    if missing_date:
+        date_html = ""
+    elif iso_only:
+        iso = dt_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+        date_html = f'<span class="tweet-date"><a href="/{user}/status/{status_id}#m" datetime="{iso}">1h</a></span>'
+    else:
+        date_html = (f'<span class="tweet-date"><a href="/{user}/status/{status_id}#m" '
+                     f'title="{nitter_title(dt_utc)}">{dt_utc.strftime("%b")} {dt_utc.day}</a></span>')
+
+    content = "" if no_content else f'<div class="tweet-content media-body" dir="auto">{_content_html(rng)}</div>'
+    quote_html = ""
+    if quote:
+        quote_html = (f'<div class="quote quote-big"><a class="quote-link" href="/x/status/{status_id - 7}#m"></a>'
+                      f'<div class="quote-text" dir="auto">{_content_html(rng)}</div></div>')
+
+    return (
+        f'<div class="timeline-item " data-username="{user}">{link}'
+        f'<div class="tweet-body"><div><div class="tweet-header">'
+        f'<a class="tweet-avatar" href="/{user}"><img class="avatar round" src="/pic/profile_images%2F1%2F{user}.jpg" alt=""></a>'
+        f'<div class="tweet-name-row"><div class="fullname-and-username">'
+        f'<a class="fullname" href="/{user}" title="{user}">{user.upper()}</a>'
+        f'<a class="username" href="/{user}" title="@{user}">@{user}</a></div>'
+        f'{date_html}</div></div></div>'
+        f'{content}{quote_html}'
+        f'{_stats_html(rng, odd_stats_rate)}'
+        f'</div></div>'
+    )
+
+
+def timeline_page_html(n_items: int = 20, *, seed: int = 0,
+                       window_start_utc: datetime | None = None, window_minutes: int = 10,
+                       page_index: int = 0, has_more: bool = True,
+                       missing_date_rate: float = 0.02, iso_only_rate: float = 0.02,
+                       no_link_rate: float = 0.01, no_content_rate: float = 0.01,
+                       outside_window_rate: float = 0.05, quote_rate: float = 0.1,
+                       odd_stats_rate: float = 0.05) -> str:
+    """
+    Página de búsqueda sintética (newest-first). Con page_index > 0 incluye el
+    "Load newest" superior (timeline-item show-more), como las páginas de cursor.
+    """
+    rng = random.Random(seed * 7919 + page_index)
+    if window_start_utc is None:
+        window_start_utc = datetime(2025, 6, 4, 17, 0, tzinfo=timezone.utc)
+    span_sec = window_minutes * 60
+    base_id = 1_930_000_000_000_000_000 + seed * 1_000_000
+
+    parts = ['<!DOCTYPE html><html><head><title>Search</title></head><body><div class="container">'
+             '<div class="timeline-container"><div class="timeline">']
+    if page_index > 0:
+        parts.append('<div class="timeline-item show-more"><a href="?f=tweets&amp;q=x">Load newest</a></div>')
+
+    for k in range(n_items):
+        idx = page_index * n_items + k
+        frac = 1.0 - (idx + 1) / (n_items * (page_index + 2) + 1)
+        dt = window_start_utc + timedelta(seconds=int(span_sec * max(frac, 0.0)))
+        if rng.random() < outside_window_rate:
+            dt = window_start_utc - timedelta(minutes=rng.randint(1, 120))
+        parts.append(tweet_item_html(
+            rng, base_id - idx, dt,
+            missing_date=rng.random() < missing_date_rate,
+            iso_only=rng.random() < iso_only_rate,
+            no_link=rng.random() < no_link_rate,
+            no_content=rng.random() < no_content_rate,
+            quote=rng.random() < quote_rate,
+            odd_stats_rate=odd_stats_rate,
+        ))
+
+    if has_more:
+        parts.append(f'<div class="show-more"><a href="?f=tweets&amp;q=x&amp;cursor=DAAC{seed}x{page_index + 1}">Load more</a></div>')
+    else:
+        parts.append('<h2 class="timeline-end">No more items</h2>')
+    parts.append("</div></div></div></body></html>")
+    return "".join(parts)
@@ -0,0 +1,498 @@
+# src/bench/hotpath.py
+# ============================================================
+# BENCH: hot path de extracción por etapa (ops/s + memoria)
+# ============================================================
+# Uso:
+#   python -m src.bench.hotpath [--pages 60] [--repeat 5] [--parser auto]
+#                               [--json out.json] [--compare base.json]
+#                               [--against <git-ref>] [--check]
+#
+# Etapas (sobre fixtures sintéticas tipo Nitter: 5/20/100 items por página,
+# fechas faltantes o solo ISO, stats atípicos, items "show-more"):
+#   parse_page        parse_timeline_page (PARSER_BACKEND)
+#   collector         SubwindowCollector.consume (armado de filas por item)
+#   page_to_rows      parseo + consume (lo que paga extraer_subventana_epoch por página)
+#   dates_fields      parse_date_fields_utc (title / ISO / faltante)
+#   dates_cold        idem con el memo de títulos vacío en cada pasada (fast path sin cache)
+#   dates_batch       parse_date_fields_utc_batch sobre la columna completa
+#   dates_any_bs4     parse_date_any_utc sobre Tags de bs4
+#   clean_metric      clean_metric por texto de stat
+#   stats_texts       parse_stats_texts por item
+#   stats_bs4         parse_stats_best_effort sobre Tags de bs4
+#   whitespace        normalize_whitespace por texto de tweet
+#   alloc_day         allocate_targets_for_day_by_hour
+#   alloc_hour        allocate_targets_for_hour
+#
+# - ops/s: mejor de --repeat pasadas (perf_counter).
+# - Memoria: 1 pasada aparte bajo tracemalloc: pico (peak_kb) y lo que queda
+#   vivo al terminar (retained_kb), en KB por 1000 ops.
+# - --against REF corre este mismo archivo (y las fixtures de HEAD) contra el
+#   src/ de otro commit (git worktree temporal): solo se importan de allí las
+#   funciones de cada etapa. Si ese commit no tiene src/scraping/parsers.py,
+#   parse_page/collector/page_to_rows usan el camino bs4 original del extractor
+#   (parse_date_any_utc + parse_stats_best_effort) y las etapas sin función
+#   equivalente se omiten. Todo offline, sin navegador ni red.
+# - --check: equivalencia estricta de los fast paths de fechas y métricas
+#   contra los parsers de referencia (strptime / regex) sobre las fixtures y
+#   un corpus determinista de títulos y stats mutados; sale con 1 si difieren.
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+WINDOW_START_UTC = datetime(2025, 6, 4, 15, 0, tzinfo=timezone.utc)
+LEGACY_PARSER = "bs4 (legacy)"
+
+
+def _fixtures():
+    """fixtures.py junto a este archivo (no el del src/ comparado: en --against puede no existir)."""
+    path = Path(__file__).resolve().with_name("fixtures.py")
+    spec = importlib.util.spec_from_file_location("_hotpath_fixtures", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def build_fixture_pages(n_pages: int, seed: int = 0) -> list[str]:
+    """Páginas deterministas con tamaños y tasas de casos raros variados."""
+    timeline_page_html = _fixtures().timeline_page_html
+
+    pages = []
+    for i in range(n_pages):
+        odd = i % 3 == 2
+        pages.append(timeline_page_html(
+            (5, 20, 100)[i % 3], seed=seed + i, page_index=i % 6, has_more=(i % 6) < 5,
+            window_start_utc=WINDOW_START_UTC,
+            missing_date_rate=0.2 if odd else 0.02,
+            iso_only_rate=0.2 if odd else 0.02,
+            odd_stats_rate=0.5 if odd else 0.05,
+            no_content_rate=0.05 if odd else 0.01,
+            no_link_rate=0.05 if odd else 0.01,
+        ))
+    return pages
+
+
+def _import_parsers():
+    """(parse_timeline_page, resolve_backend) del src/ activo, o None si es anterior a parsers.py."""
+    try:
+        from src.scraping.parsers import parse_timeline_page, resolve_backend
+    except ModuleNotFoundError as e:
+        if e.name != "src.scraping.parsers":
+            raise
+        return None
+    return parse_timeline_page, resolve_backend
+
+
+def _core_stages(pages: list[str], parser: str):
+    """parse_page / collector / page_to_rows + entradas crudas (fechas, stats, textos) de las fixtures."""
+    from src.config.settings import TZ_LOCAL
+    from src.scraping.extractor import SubwindowCollector
+
+    parse_timeline_page, _ = _import_parsers()
+    parsed = [parse_timeline_page(h, parser).items for h in pages]
+    items = [it for page in parsed for it in page]
+    real = [it for it in items if not it["show_more"]]
+    sub_start = WINDOW_START_UTC.astimezone(TZ_LOCAL)
+    sub_end = sub_start + timedelta(minutes=10)
+
+    def new_collector():
+        return SubwindowCollector("TIPO_A_ACTORES", "https://bench", "bench", sub_start, sub_end, 10**9)
+
+    def st_parse_page() -> int:
+        return sum(len(parse_timeline_page(h, parser).items) for h in pages)
+
+    def st_collector() -> int:
+        col = new_collector()
+        for page in parsed:
+            col.consume(page)
+        return len(items)
+
+    def st_page_to_rows() -> int:
+        col = new_collector()
+        for h in pages:
+            col.consume(parse_timeline_page(h, parser).items)
+        return col.seen_items_total
+
+    stages = {"parse_page": st_parse_page, "collector": st_collector, "page_to_rows": st_page_to_rows}
+    date_fields = [(it["title"], it["datetime"]) for it in real]
+    return stages, date_fields, [it["stats"] for it in real], [it["text"] for it in real if it["text"]]
+
+
+def _legacy_core_stages(pages: list[str]):
+    """Igual que _core_stages para commits sin parsers.py: el bucle bs4 del extractor original."""
+    import re
+
+    from bs4 import BeautifulSoup
+    from src.config.settings import TZ_LOCAL
+    from src.utils.dates import parse_date_any_utc
+    from src.utils.metrics import parse_stats_best_effort
+    from src.utils.text import normalize_whitespace
+
+    sub_start = WINDOW_START_UTC.astimezone(TZ_LOCAL)
+    sub_end = sub_start + timedelta(minutes=10)
+
+    def parse(h: str) -> list:
+        return BeautifulSoup(h, "html.parser").find_all("div", class_="timeline-item")
+
+    parsed = [parse(h) for h in pages]
+    real = [t for page in parsed for t in page if "show-more" not in (t.get("class") or [])]
+
+    def rows_from(pages_items) -> tuple[int, int]:
+        ids_vistos, rows, seen = set(), [], 0
+        for page in pages_items:
+            for item in page:
+                if "show-more" in (item.get("class") or []):
+                    continue
+                seen += 1
+                a_link = item.find("a", class_="tweet-link")
+                if not a_link or not a_link.get("href"):
+                    continue
+                m = re.search(r"status/(\d+)", a_link["href"])
+                status_id = m.group(1) if m else a_link["href"]
+                if status_id in ids_vistos:
+                    continue
+                ids_vistos.add(status_id)
+                dt_utc = parse_date_any_utc(item)
+                if dt_utc is None:
+                    continue
+                dt_local = dt_utc.astimezone(TZ_LOCAL)
+                if not (sub_start <= dt_local < sub_end):
+                    continue
+                content = item.find("div", class_="tweet-content")
+                if content is None:
+                    continue
+                st = parse_stats_best_effort(item)
+                links = [x.get_text() for x in content.find_all("a")]
+                user_a = item.find("a", class_="username")
+                raw_text = content.get_text(separator=" ", strip=True)
+                rows.append({
+                    "timestamp_local": dt_local.isoformat(),
+                    "usuario": user_a.get_text(strip=True) if user_a else "",
+                    "texto_raw": raw_text,
+                    "texto_norm": normalize_whitespace(raw_text),
+                    "hashtags": "|".join(x for x in links if x.startswith("#")),
+                    "menciones": "|".join(x for x in links if x.startswith("@")),
+                    **st,
+                    "status_id": status_id,
+                })
+        return seen, len(rows)
+
+    def st_parse_page() -> int:
+        return sum(len(parse(h)) for h in pages)
+
+    def st_collector() -> int:
+        rows_from(parsed)
+        return sum(len(page) for page in parsed)
+
+    def st_page_to_rows() -> int:
+        return rows_from(parse(h) for h in pages)[0]
+
+    def date_attrs(t) -> tuple[str | None, str | None]:
+        td = t.find("span", class_="tweet-date")
+        a = td.find("a") if td else None
+        return (a.get("title"), a.get("datetime")) if a else (None, None)
+
+    stages = {"parse_page": st_parse_page, "collector": st_collector, "page_to_rows": st_page_to_rows}
+    date_fields = [date_attrs(t) for t in real]
+    stat_lists = [[s.get_text(strip=True) for s in t.find_all("span", class_="tweet-stat")] for t in real]
+    texts = [c.get_text(separator=" ", strip=True) for t in real if (c := t.find("div", class_="tweet-content"))]
+    return stages, date_fields, stat_lists, texts
+
+
+def _legacy_date_fields(title: str | None, iso: str | None) -> datetime | None:
+    """parse_date_any_utc del extractor original sin el recorrido de Tags (title y luego ISO)."""
+    from src.utils.dates import parse_date_title_utc
+
+    dt = parse_date_title_utc(title) if title else None
+    if dt is None and iso:
+        try:
+            dt = datetime.fromisoformat(iso.replace("Z", "+00:00")).astimezone(timezone.utc)
+        except ValueError:
+            return None
+    return dt
+
+
+def build_stages(pages: list[str], parser: str) -> dict[str, Callable[[], int]]:
+    """Etapa -> función sin argumentos que hace 1 pasada y devuelve cuántas ops hizo."""
+    from src.utils import dates, metrics
+    from src.utils.metrics import clean_metric
+    from src.utils.text import normalize_whitespace
+
+    if _import_parsers() is not None:
+        stages, date_fields, stat_lists, texts = _core_stages(pages, parser)
+    else:
+        stages, date_fields, stat_lists, texts = _legacy_core_stages(pages)
+    stat_texts = [s for lst in stat_lists for s in lst]
+    parse_date_fields_utc = getattr(dates, "parse_date_fields_utc", _legacy_date_fields)
+    parse_stats_texts = getattr(metrics, "parse_stats_texts", None)
+
+    def st_dates_fields() -> int:
+        for title, iso in date_fields:
+            parse_date_fields_utc(title, iso)
+        return len(date_fields)
+
+    def st_dates_cold() -> int:
+        clear = getattr(dates, "_parse_date_title_cached", None)
+        if clear is not None:
+            clear.cache_clear()
+        for title, iso in date_fields:
+            parse_date_fields_utc(title, iso)
+        return len(date_fields)
+
+    def st_clean_metric() -> int:
+        for s in stat_texts:
+            clean_metric(s)
+        return len(stat_texts)
+
+    def st_stats_texts() -> int:
+        for lst in stat_lists:
+            parse_stats_texts(lst)
+        return len(stat_lists)
+
+    def st_whitespace() -> int:
+        for t in texts:
+            normalize_whitespace(t)
+        return len(texts)
+
+    stages.update({
+        "dates_fields": st_dates_fields,
+        "dates_cold": st_dates_cold,
+        "clean_metric": st_clean_metric,
+        "stats_texts": st_stats_texts,
+        "whitespace": st_whitespace,
+    })
+    if parse_stats_texts is None:
+        del stages["stats_texts"]
+
+    batch = getattr(dates, "parse_date_fields_utc_batch", None)
+    if batch is not None:
+        titles = [t for t, _ in date_fields]
+        isos = [i for _, i in date_fields]
+
+        def st_dates_batch() -> int:
+            batch(titles, isos)
+            return len(date_fields)
+
+        stages["dates_batch"] = st_dates_batch
+
+    try:
+        from bs4 import BeautifulSoup
+        from src.utils.dates import parse_date_any_utc
+        from src.utils.metrics import parse_stats_best_effort
+    except ImportError:
+        pass
+    else:
+        tags = [t for h in pages for t in BeautifulSoup(h, "html.parser").find_all("div", class_="timeline-item")
+                if "show-more" not in (t.get("class") or [])]
+
+        def st_dates_any_bs4() -> int:
+            for t in tags:
+                parse_date_any_utc(t)
+            return len(tags)
+
+        def st_stats_bs4() -> int:
+            for t in tags:
+                parse_stats_best_effort(t)
+            return len(tags)
+
+        stages["dates_any_bs4"] = st_dates_any_bs4
+        stages["stats_bs4"] = st_stats_bs4
+
+    from src.scraping import orchestrator
+    day_totals = list(range(0, 5000, 7))
+
+    def st_alloc_day() -> int:
+        for total in day_totals:
+            orchestrator.allocate_targets_for_day_by_hour(total, total % 2 == 0)
+        return len(day_totals)
+
+    def st_alloc_hour() -> int:
+        for total in day_totals:
+            orchestrator.allocate_targets_for_hour(total // 24)
+        return len(day_totals)
+
+    if hasattr(orchestrator, "allocate_targets_for_day_by_hour"):
+        stages["alloc_day"] = st_alloc_day
+    if hasattr(orchestrator, "allocate_targets_for_hour"):
+        stages["alloc_hour"] = st_alloc_hour
+    return stages
+
+
+def equivalence_corpus(pages: list[str], seed: int = 0) -> tuple[list[str], list[str]]:
+    """Títulos y textos de stats: los de las fixtures + variantes mutadas (deterministas)."""
+    import random
+    import re
+
+    nitter_title = _fixtures().nitter_title
+
+    titles = re.findall(r'title="([^"]*· [^"]*)"', "".join(pages))
+    stats = [m.strip() for m in re.findall(r"</span>([^<]*)</div></span>", "".join(pages))]
+    rng = random.Random(seed)
+    t0 = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    titles += [nitter_title(t0 + timedelta(minutes=rng.randint(0, 15_000_000))) for _ in range(5000)]
+    titles += ["Jun 31, 2025 · 1:00 PM UTC", "Feb 29, 2024 · 12:00 AM UTC", "Feb 29, 2023 · 12:00 AM UTC",
+               "Jun 4, 2025 · 0:30 AM UTC", "Jun 4, 2025 · 13:30 PM UTC", "jun 4, 2025 · 1:30 pm UTC",
+               "Jun 04, 2025 · 01:05 PM UTC", "Jun 4, 2025 · 1:5 PM UTC", "", "·",
+               "Jun 4, 2025 · 11:59 PM UTC · x", "Jun 4, 2025 · 11:59 PM"]
+    stats += ["", "—", "-", "N/A", " 7 ", "1 234", "12,345,678", "4.35K", "1.005M", "1.K", ".5K", "1k",
+              "1.2 k", " 9M ", "1.2.3K", "K", "M", "١٢", "1٢K", "x"]
+    alphabet = "JunFebDec0123456789 ,·:APMUTCapm.KMkx\t١"
+
+    def mutate(s: str) -> str:
+        chars = list(s)
+        for _ in range(rng.randint(1, 3)):
+            pos = rng.randrange(len(chars) + 1)
+            op = rng.random()
+            if op < 0.4 and chars:
+                chars.pop(min(pos, len(chars) - 1))
+            elif op < 0.8:
+                chars.insert(pos, rng.choice(alphabet))
+            elif chars:
+                chars[min(pos, len(chars) - 1)] = rng.choice(alphabet)
+        return "".join(chars)
+
+    titles += [mutate(rng.choice(titles)) for _ in range(5000)]
+    stats += [mutate(rng.choice(stats) or "0") for _ in range(5000)]
+    return titles, stats
+
+
+def check_equivalence(pages: list[str]) -> int:
+    """Fast paths (memo + parser a mano) vs referencia; devuelve el número de diferencias."""
+    from src.utils import dates, metrics
+
+    titles, stats = equivalence_corpus(pages)
+    isos = [None, "2025-06-04T12:00:00Z", "no-iso"] * (len(titles) // 3 + 1)
+    bad_dates = [t for t in titles if dates.parse_date_title_utc(t) != dates._parse_date_title_strptime(t)]
+    bad_metrics = [t for t in stats if metrics.clean_metric(t) != metrics._clean_metric_regex(t)]
+    batch = dates.parse_date_fields_utc_batch(titles, isos)
+    bad_batch = sum(1 for b, t, i in zip(batch, titles, isos) if b != dates.parse_date_fields_utc(t, i))
+    bad_metrics_batch = int(metrics.clean_metrics(stats) != [metrics._clean_metric_regex(t) for t in stats])
+
+    print(f"🔍 Equivalencia: {len(titles)} títulos ({len(bad_dates)} difieren), "
+          f"{len(stats)} stats ({len(bad_metrics)} difieren), batch fechas ({bad_batch} difieren), "
+          f"batch stats ({'difiere' if bad_metrics_batch else 'ok'})")
+    for t in (bad_dates[:5] + bad_metrics[:5]):
+        print(f"   ❌ {t!r}")
+    return len(bad_dates) + len(bad_metrics) + bad_batch + bad_metrics_batch
+
+
+def measure(fn: Callable[[], int], repeat: int) -> dict:
+    best, n_ops = float("inf"), 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n_ops = fn()
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    per_kop = 1000 / max(1, n_ops) / 1024
+    return {
+        "ops": n_ops,
+        "sec": best,
+        "ops_per_sec": n_ops / best if best > 0 else None,
+        "peak_kb_per_kop": (peak - base) * per_kop,
+        "retained_kb_per_kop": max(0, current - base) * per_kop,
+    }
+
+
+def run_suite(n_pages: int, repeat: int, parser: str) -> dict:
+    pages = build_fixture_pages(n_pages)
+    stages = build_stages(pages, parser)
+    parsers = _import_parsers()
+
+    return {
+        "meta": {
+            "pages": n_pages,
+            "html_kb": round(sum(len(h) for h in pages) / 1024, 1),
+            "parser": parsers[1](parser) if parsers is not None else LEGACY_PARSER,
+            "python": sys.version.split()[0],
+            "ts_utc": datetime.now(timezone.utc).isoformat(),
+        },
+        "stages": {name: measure(fn, repeat) for name, fn in stages.items()},
+    }
+
+
+def run_against(ref: str, args: argparse.Namespace) -> dict | None:
+    """Corre este archivo (de HEAD) contra el src/ de 'ref' en un worktree temporal."""
+    repo = Path(__file__).resolve().parents[2]
+    tmp = Path(tempfile.mkdtemp(prefix="hotpath-"))
+    wt, out = tmp / "wt", tmp / "res.json"
+    subprocess.run(["git", "worktree", "add", "--detach", "-q", str(wt), ref], cwd=repo, check=True)
+    try:
+        env = {**os.environ, "PYTHONPATH": str(wt)}
+        cmd = [sys.executable, str(Path(__file__).resolve()), "--pages", str(args.pages),
+               "--repeat", str(args.repeat), "--parser", args.parser, "--json", str(out)]
+        proc = subprocess.run(cmd, cwd=wt, env=env, capture_output=True, text=True)
+        if proc.returncode != 0 or not out.exists():
+            print(f"⚠️ No se pudo correr el bench en {ref}: {proc.stderr.strip()[-300:]}")
+            return None
+        return json.loads(out.read_text(encoding="utf-8"))
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", str(wt)], cwd=repo, check=False)
+
+
+def print_results(res: dict, base: dict | None = None, base_label: str = "base") -> None:
+    m = res["meta"]
+    print(f"🧪 Hot path | páginas={m['pages']} ({m['html_kb']} KB) | parser={m['parser']} | Python {m['python']}")
+    header = f"{'etapa':<14}{'ops':>9}{'ops/s':>12}{'peak KB/kop':>13}{'ret KB/kop':>12}"
+    if base is not None:
+        header += f"{'vs ' + base_label:>16}"
+    print(header)
+    for name, r in res["stages"].items():
+        line = (f"{name:<14}{r['ops']:>9}{r['ops_per_sec']:>12.0f}"
+                f"{r['peak_kb_per_kop']:>13.1f}{r['retained_kb_per_kop']:>12.1f}")
+        if base is not None:
+            b = base.get("stages", {}).get(name)
+            speed = f"{r['ops_per_sec'] / b['ops_per_sec']:.2f}x" if b and b.get("ops_per_sec") else "n/d"
+            line += f"{speed:>16}"
+        print(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.bench.hotpath")
+    ap.add_argument("--pages", type=int, default=60)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--parser", default="auto")
+    ap.add_argument("--json", type=Path, default=None, help="Guarda los resultados en JSON.")
+    ap.add_argument("--compare", type=Path, default=None, help="JSON de una corrida previa para comparar.")
+    ap.add_argument("--against", default=None, help="Commit/rama contra el que comparar (git worktree).")
+    ap.add_argument("--check", action="store_true",
+                    help="Solo verifica la equivalencia de los fast paths de fechas/métricas.")
+    args = ap.parse_args(argv)
+
+    if args.check:
+        return 1 if check_equivalence(build_fixture_pages(args.pages)) else 0
+
+    res = run_suite(args.pages, args.repeat, args.parser)
+    if args.json is not None:
+        args.json.write_text(json.dumps(res, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    base, label = None, "base"
+    if args.compare is not None:
+        base, label = json.loads(args.compare.read_text(encoding="utf-8")), args.compare.stem
+    elif args.against is not None:
+        base, label = run_against(args.against, args), args.against
+    print_results(res, base, label)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
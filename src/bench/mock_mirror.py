@@ -0,0 +1,275 @@
+# src/bench/mock_mirror.py
+# ============================================================
+# MOCK MIRROR: servidor local tipo Nitter para benchmarks end-to-end
+# ============================================================
+# Uso (suelto, para probar a mano o apuntar main/e2e a un puerto fijo):
+#   python -m src.bench.mock_mirror --profile "lento:latency=600,sigma=0.8,error=0.05" [--port 8080]
+#
+# - Sirve /search?f=tweets&q=<query> since_time:X until_time:Y con paginación
+#   por cursor (div.show-more > a[href*=cursor=]) y páginas newest-first de
+#   PAGE_SIZE items (HTML de src/bench/fixtures.py).
+# - Los tweets de cada (query, ventana) son deterministas: mismo query -> mismos
+#   status_id en cualquier mirror con igual tweets_per_min (failover / hedge
+#   comparables).
+# - Perfil por mirror: latencia (fixed / uniform / lognormal), tasa de páginas
+#   vacías ("No items found"), de errores HTTP 500 y de rate limit (HTTP 429).
+# - Cuenta requests por resultado (ok / empty / error / rate_limited) y bytes.
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import re
+import sys
+import threading
+import time
+import urllib.parse
+import zlib
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.bench.fixtures import tweet_item_html
+
+_SINCE_RE = re.compile(r"since_time:(\d+)")
+_UNTIL_RE = re.compile(r"until_time:(\d+)")
+_CURSOR_PREFIX = "DAAC"
+
+_PAGE_HEAD = ('<!DOCTYPE html><html><head><title>Search</title></head><body><div class="container">'
+              '<div class="timeline-container"><div class="timeline">')
+_PAGE_TAIL = "</div></div></div></body></html>"
+_EMPTY_HTML = (_PAGE_HEAD + '<div class="timeline-none">No items found</div>' + _PAGE_TAIL).encode("utf-8")
+_ERROR_HTML = b"<html><body><h1>Internal Server Error</h1></body></html>"
+_RATE_LIMIT_HTML = b"<html><body><div class=\"error-panel\"><span>Rate limited</span></div></body></html>"
+
+# Alias cortos aceptados en las specs de --profile / --mirror
+_ALIASES = {"rl": "rate_limit_rate", "error": "error_rate", "empty": "empty_rate", "latency": "latency_ms",
+            "sigma": "latency_sigma", "dist": "latency_dist", "tpm": "tweets_per_min",
+            "outside": "outside_window_rate"}
+
+
+@dataclass(frozen=True)
+class MirrorProfile:
+    """Comportamiento de 1 mirror simulado (tasas por request, en [0, 1])."""
+    name: str = "mock"
+    latency_ms: float = 120.0       # mediana (lognormal) / centro (uniform) / valor (fixed)
+    latency_sigma: float = 0.3      # lognormal: sigma; uniform: ± fracción de latency_ms
+    latency_dist: str = "lognormal"  # "lognormal" | "uniform" | "fixed"
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    empty_rate: float = 0.0
+    tweets_per_min: float = 3.0     # densidad media por query (varía ±50% según el query)
+    page_size: int = 20
+    outside_window_rate: float = 0.03  # items con fecha anterior a la ventana (retweets viejos)
+
+
+def parse_profile(spec: str) -> MirrorProfile:
+    """
+    "nombre:clave=valor,clave=valor" -> MirrorProfile. Claves: los campos del
+    dataclass o sus alias (latency, sigma, dist, error, rl, empty, tpm, outside).
+    """
+    name, _, body = spec.partition(":") if ":" in spec else ("mock", "", spec)
+    kinds = {f.name: f.type for f in fields(MirrorProfile)}
+    kw: dict = {"name": name.strip() or "mock"}
+    for part in filter(None, (p.strip() for p in body.split(","))):
+        key, _, value = part.partition("=")
+        key = _ALIASES.get(key.strip(), key.strip())
+        if key not in kinds or key == "name":
+            raise ValueError(f"Clave de perfil desconocida: {key!r}")
+        kind = kinds[key]
+        kw[key] = value.strip() if kind == "str" else (int(value) if kind == "int" else float(value))
+    prof = MirrorProfile(**kw)
+    if prof.latency_dist not in ("lognormal", "uniform", "fixed"):
+        raise ValueError(f"latency_dist desconocida: {prof.latency_dist!r}")
+    return prof
+
+
+def _query_seed(query: str) -> int:
+    """Semilla estable del query sin la ventana (since/until)."""
+    base = _UNTIL_RE.sub("", _SINCE_RE.sub("", query)).strip()
+    return zlib.crc32(base.encode("utf-8"))
+
+
+class MockMirror:
+    """
+    Servidor HTTP (ThreadingHTTPServer en 127.0.0.1) con 1 MirrorProfile.
+    start() arranca en un thread daemon; url es lo que va en la lista de mirrors.
+    """
+    def __init__(self, profile: MirrorProfile, port: int = 0, seed: int = 0):
+        self.profile = profile
+        self._rng = random.Random(zlib.crc32(profile.name.encode("utf-8")) + seed)
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "ok": 0, "empty": 0, "error": 0, "rate_limited": 0,
+                         "not_found": 0, "items": 0, "bytes": 0, "latency_sum": 0.0}
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "MockMirror":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                        name=f"mock-{self.profile.name}")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            c = dict(self.counters)
+        c["latency_avg_ms"] = round(1000 * c.pop("latency_sum") / c["requests"], 1) if c["requests"] else None
+        return {"name": self.profile.name, "url": self.url, **c}
+
+    # -------------------------
+    # Respuestas
+    # -------------------------
+    def _draw(self) -> tuple[float, str]:
+        """Latencia (s) y resultado de 1 request, según el perfil."""
+        p = self.profile
+        with self._lock:
+            if p.latency_dist == "fixed":
+                lat = p.latency_ms
+            elif p.latency_dist == "uniform":
+                lat = p.latency_ms * (1.0 + self._rng.uniform(-p.latency_sigma, p.latency_sigma))
+            else:
+                lat = p.latency_ms * math.exp(self._rng.gauss(0.0, p.latency_sigma))
+            r = self._rng.random()
+        if r < p.error_rate:
+            kind = "error"
+        elif r < p.error_rate + p.rate_limit_rate:
+            kind = "rate_limited"
+        elif r < p.error_rate + p.rate_limit_rate + p.empty_rate:
+            kind = "empty"
+        else:
+            kind = "ok"
+        return max(0.0, lat) / 1000.0, kind
+
+    def search_page(self, query: str, offset: int) -> tuple[bytes, int]:
+        """HTML de la página de búsqueda desde 'offset' (newest-first) y cuántos items trae."""
+        p = self.profile
+        since_m, until_m = _SINCE_RE.search(query), _UNTIL_RE.search(query)
+        if not since_m or not until_m:
+            return _EMPTY_HTML, 0
+        since, until = int(since_m.group(1)), int(until_m.group(1))
+        span = max(0, until - since)
+        seed = _query_seed(query)
+
+        # Densidad por query: tweets_per_min x [0.5, 1.5) según el query (siempre igual)
+        density = p.tweets_per_min * (0.5 + (seed % 1000) / 1000)
+        total = int(round(density * span / 60))
+        if offset >= total:
+            return _EMPTY_HTML, 0
+
+        rng = random.Random(seed * 7919 + since + offset)
+        step = span / max(1, total)
+        parts = [_PAGE_HEAD]
+        if offset > 0:
+            q_newest = urllib.parse.quote(query)
+            parts.append(f'<div class="timeline-item show-more"><a href="?f=tweets&amp;q={q_newest}">Load newest</a></div>')
+        end = min(total, offset + p.page_size)
+        for idx in range(offset, end):
+            ts = until - step * (idx + 1)
+            if rng.random() < p.outside_window_rate:
+                ts = since - rng.randint(60, 7200)
+            dt = datetime.fromtimestamp(int(ts), tz=timezone.utc)
+            # snowflake-ish: único por (query, ventana, posición), igual en todos los mirrors
+            status_id = (int(since) << 22) | ((seed & 0x3FF) << 12) | (idx & 0xFFF)
+            parts.append(tweet_item_html(rng, status_id, dt, odd_stats_rate=0.02))
+        if end < total:
+            cursor = urllib.parse.quote(f"{_CURSOR_PREFIX}{end}")
+            parts.append(f'<div class="show-more"><a href="?f=tweets&amp;q={urllib.parse.quote(query)}'
+                         f'&amp;cursor={cursor}">Load more</a></div>')
+        else:
+            parts.append('<h2 class="timeline-end">No more items</h2>')
+        parts.append(_PAGE_TAIL)
+        return "".join(parts).encode("utf-8"), end - offset
+
+    def _make_handler(self):
+        mirror = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urllib.parse.urlsplit(self.path)
+                lat, kind = mirror._draw()
+                time.sleep(lat)
+
+                n_items = 0
+                if url.path.rstrip("/") != "/search":
+                    kind, status, body = "not_found", 404, b"<html><body>Not found</body></html>"
+                elif kind == "error":
+                    status, body = 500, _ERROR_HTML
+                elif kind == "rate_limited":
+                    status, body = 429, _RATE_LIMIT_HTML
+                elif kind == "empty":
+                    status, body = 200, _EMPTY_HTML
+                else:
+                    qs = urllib.parse.parse_qs(url.query)
+                    cursor = (qs.get("cursor") or [""])[0]
+                    offset = int(cursor[len(_CURSOR_PREFIX):] or 0) if cursor.startswith(_CURSOR_PREFIX) else 0
+                    status = 200
+                    body, n_items = mirror.search_page((qs.get("q") or [""])[0], offset)
+                    if n_items == 0:
+                        kind = "empty"
+
+                with mirror._lock:
+                    c = mirror.counters
+                    c["requests"] += 1
+                    c[kind] += 1
+                    c["items"] += n_items
+                    c["bytes"] += len(body)
+                    c["latency_sum"] += lat
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # el cliente canceló (hedge perdedor / timeout)
+
+            def log_message(self, *args):
+                pass
+
+        return _Handler
+
+
+def start_mirrors(profiles: list[MirrorProfile], seed: int = 0) -> list[MockMirror]:
+    """Arranca 1 MockMirror por perfil (puertos libres) y los devuelve en orden."""
+    return [MockMirror(p, seed=seed).start() for p in profiles]
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.bench.mock_mirror")
+    ap.add_argument("--profile", default="mock", help='Spec del perfil, p.ej. "lento:latency=600,error=0.05".')
+    ap.add_argument("--port", type=int, default=0)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    mirror = MockMirror(parse_profile(args.profile), port=args.port, seed=args.seed).start()
+    print(f"🧪 Mock mirror '{mirror.profile.name}' en {mirror.url} | {mirror.profile}")
+    now = int(datetime.now(timezone.utc).timestamp()) // 600 * 600
+    example = urllib.parse.quote(f"colombia since_time:{now - 600} until_time:{now}")
+    print(f"   ej.: {mirror.url}/search?f=tweets&q={example}")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"   📊 {mirror.snapshot()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mirror.stop()
+        print(f"🛑 {mirror.snapshot()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+# src/bench/parsers.py
+# ============================================================
+# BENCH: paridad + throughput de los backends de parseo
+# ============================================================
+# Uso:
+#   python -m src.bench.parsers [--pages 40] [--items 20] [--repeat 3]
+#
+# - Paridad: cada backend instalado debe producir los mismos items crudos
+#   y las mismas filas (SubwindowCollector) que "bs4" (ruta de referencia).
+#   Si alguno difiere, sale con código 1.
+# - Throughput: items/s y speedup vs bs4 sobre fixtures sintéticas.
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.bench.fixtures import timeline_page_html
+from src.config.settings import TZ_LOCAL
+from src.scraping.extractor import SubwindowCollector
+from src.scraping.parsers import available_backends, parse_timeline_page
+
+WINDOW_START_UTC = datetime(2025, 6, 4, 15, 0, tzinfo=timezone.utc)
+
+
+def build_pages(n_pages: int, n_items: int, seed: int = 0) -> list[str]:
+    """Mezcla páginas normales, páginas 'raras' y una página acumulada (modo click)."""
+    pages = []
+    for i in range(n_pages):
+        odd = (i % 4 == 3)
+        pages.append(timeline_page_html(
+            n_items, seed=seed + i, page_index=i % 12, has_more=(i % 12) < 11,
+            window_start_utc=WINDOW_START_UTC,
+            missing_date_rate=0.15 if odd else 0.02,
+            iso_only_rate=0.15 if odd else 0.02,
+            odd_stats_rate=0.4 if odd else 0.05,
+            no_content_rate=0.05 if odd else 0.01,
+        ))
+    pages.append(timeline_page_html(n_items * 12, seed=seed + 999, window_start_utc=WINDOW_START_UTC))
+    return pages
+
+
+def rows_for(pages: list[str], backend: str) -> list[dict]:
+    sub_start = WINDOW_START_UTC.astimezone(TZ_LOCAL)
+    col = SubwindowCollector("TIPO_A_ACTORES", "https://bench", "bench", sub_start,
+                             sub_start + timedelta(minutes=10), target=10**9)
+    for html in pages:
+        col.consume(parse_timeline_page(html, backend).items)
+    return col.recolectados
+
+
+def check_parity(pages: list[str], backends: list[str]) -> dict[str, str]:
+    ref_pages = [parse_timeline_page(h, "bs4") for h in pages]
+    ref_rows = rows_for(pages, "bs4")
+    out = {}
+    for b in backends:
+        if b == "bs4":
+            out[b] = "ref"
+            continue
+        status = "OK"
+        for idx, (h, ref) in enumerate(zip(pages, ref_pages)):
+            got = parse_timeline_page(h, b)
+            if got.next_cursor != ref.next_cursor:
+                status = f"FAIL cursor página {idx}"
+                break
+            if got.items != ref.items:
+                bad = next(k for k, (x, y) in enumerate(zip(got.items, ref.items)) if x != y) \
+                    if len(got.items) == len(ref.items) else "len"
+                status = f"FAIL items página {idx} (item {bad})"
+                break
+        if status == "OK" and rows_for(pages, b) != ref_rows:
+            status = "FAIL filas"
+        out[b] = status
+    return out
+
+
+def bench_backend(pages: list[str], backend: str, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    n_items = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        n_items = sum(len(parse_timeline_page(h, backend).items) for h in pages)
+        best = min(best, time.perf_counter() - t0)
+    return best, n_items
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.bench.parsers")
+    ap.add_argument("--pages", type=int, default=40)
+    ap.add_argument("--items", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    backends = available_backends()
+    pages = build_pages(args.pages, args.items)
+    total_kb = sum(len(h) for h in pages) / 1024
+
+    print(f"🧪 Backends instalados: {', '.join(backends)} | páginas={len(pages)} ({total_kb:.0f} KB)")
+    parity = check_parity(pages, backends)
+
+    results = {b: bench_backend(pages, b, args.repeat) for b in backends}
+    base = results["bs4"][0]
+
+    print(f"{'backend':<12} {'paridad':<24} {'seg':>8} {'items/s':>10} {'speedup':>8}")
+    for b in backends:
+        dt, n = results[b]
+        print(f"{b:<12} {parity[b]:<24} {dt:>8.3f} {n / dt:>10.0f} {base / dt:>7.1f}x")
+
+    failed = [b for b, st in parity.items() if st.startswith("FAIL")]
+    if failed:
+        print(f"❌ Paridad rota en: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# src/bench/resume.py
+# ============================================================
+# CHECK: reintento de resume contra un mirror simulado local
+# ============================================================
+# Uso:
+#   python -m src.bench.resume [--target 12] [--first 5] [--tpm 10]
+#
+# - 1 MockMirror (páginas newest-first, mismos status_id en cada request) y
+#   backend http; ledger, dataset y logs en un directorio temporal.
+# - Pasada 1: la unidad baja solo --first filas (unidad "short" en el ledger).
+# - Pasada 2: resume_tasks la reintenta con target = faltantes y exclude_ids =
+#   lo ya escrito; el mirror vuelve a entregar primero los mismos tweets.
+# - Verifica que el reintento junte las faltantes con ids nuevos (la unidad
+#   queda "done" y el dataset sin repetidos); sale con 1 si no.
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import io
+import sys
+import tempfile
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.bench.e2e import bench_settings
+from src.bench.mock_mirror import parse_profile, start_mirrors
+
+
+def _dataset_ids(path: Path) -> list[str]:
+    if not path.exists():
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        return [r["status_id"] for r in csv.DictReader(f)]
+
+
+def check_resume(target: int, first: int, tpm: float, verbose: bool = False) -> int:
+    """Corre las 2 pasadas; devuelve el número de problemas encontrados."""
+    from src.config.settings import TZ_LOCAL
+    from src.scraping.orchestrator import SubwindowTask, build_run_components, resume_tasks, run_subwindow_task
+    from src.utils.logging import Telemetry
+
+    mirror, = start_mirrors([parse_profile(f"resume:latency=5,tpm={tpm},outside=0")])
+    sub_start = datetime(2025, 6, 4, 8, 0, tzinfo=TZ_LOCAL)
+    task = SubwindowTask(sub_start=sub_start, sub_end=sub_start + timedelta(minutes=10),
+                         etapa="TIPO_A_ACTORES", target=target)
+    out = sys.stdout if verbose else io.StringIO()
+    try:
+        with tempfile.TemporaryDirectory(prefix="resume-") as tmp:
+            settings = bench_settings(Path(tmp), 1, 50.0, ["LEDGER_ENABLED=true", "RESUME=true",
+                                                           "BACKGROUND_WRITER=false"])
+            telemetry = Telemetry(
+                request_log_path=settings.REQUEST_LOG_PATH,
+                run_summary_path=settings.RUN_SUMMARY_PATH,
+                write_header_if_new=True,
+                request_log_flush_every=settings.REQUEST_LOG_FLUSH_EVERY,
+                driver_log_path=settings.DRIVER_LOG_PATH,
+            )
+            comps = build_run_components(settings, telemetry, [mirror.url])
+            run = dict(http_engine=comps.http_engine, rate_limiter=comps.rate_limiter, ledger=comps.ledger)
+            try:
+                with contextlib.redirect_stdout(out):
+                    # Pasada 1: corrida cortada con 'first' filas (el ledger guarda el target completo)
+                    run_subwindow_task(None, replace(task, target=first), [mirror.url], settings, telemetry,
+                                       comps.writer, http_engine=comps.http_engine, rate_limiter=comps.rate_limiter)
+                    comps.writer.flush()
+                    written = _dataset_ids(settings.DATASET_PATH)
+                    comps.ledger.record(*task.unit_key, target, [{"status_id": i} for i in written])
+
+                    # Pasada 2: reintento de resume (pide lo que falta, excluye lo ya escrito)
+                    retry = list(resume_tasks(iter([task]), comps.ledger, settings))
+                    for t in retry:
+                        run_subwindow_task(None, t, [mirror.url], settings, telemetry, comps.writer, **run)
+                    comps.writer.flush()
+                unit = comps.ledger.get(*task.unit_key)
+                ids = _dataset_ids(settings.DATASET_PATH)
+            finally:
+                comps.close()
+    finally:
+        mirror.stop()
+
+    new_ids = len(set(ids) - set(written))
+    problems = []
+    if len(written) != first:
+        problems.append(f"la pasada 1 escribió {len(written)} filas (se esperaban {first})")
+    if len(retry) != 1:
+        problems.append("resume_tasks no reintentó la unidad short")
+    if new_ids != target - first:
+        problems.append(f"el reintento juntó {new_ids} ids nuevos (faltaban {target - first})")
+    if len(ids) != len(set(ids)):
+        problems.append(f"{len(ids) - len(set(ids))} status_id repetidos en el dataset")
+    if unit is None or unit["status"] != "done" or unit["obtained"] != target:
+        problems.append(f"ledger: {unit}")
+
+    print(f"🔁 Resume: pasada 1 = {len(written)}/{target} filas | reintento = {new_ids} ids nuevos "
+          f"(faltaban {target - first}) | ledger = {unit}")
+    for p in problems:
+        print(f"   ❌ {p}")
+    return len(problems)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.bench.resume")
+    ap.add_argument("--target", type=int, default=12)
+    ap.add_argument("--first", type=int, default=5, help="Filas que escribe la pasada 1 (< --target).")
+    ap.add_argument("--tpm", type=float, default=10.0, help="tweets/min del mirror simulado.")
+    ap.add_argument("--verbose", action="store_true", help="Muestra la salida de run_subwindow_task.")
+    args = ap.parse_args(argv)
+    if not 0 < args.first < args.target:
+        ap.error("--first debe estar entre 1 y --target - 1")
+    return 1 if check_resume(args.target, args.first, args.tpm, args.verbose) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
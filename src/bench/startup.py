@@ -0,0 +1,173 @@
+# src/bench/startup.py
+# ============================================================
+# BENCH: tiempo de arranque (imports + time-to-first-request)
+# ============================================================
+# Uso:
+#   python -m src.bench.startup [--repeat 5] [--import-budget-ms 150]
+#                               [--ttfr-budget-ms 1500] [--history logs/startup_bench.jsonl]
+#
+# - import: `python -c "import src.main"` en un proceso limpio (mejor de N),
+#   más el acumulado de src.main según -X importtime.
+# - pesados: ninguno de HEAVY_MODULES debe quedar cargado tras importar src.main.
+# - time-to-first-request: proceso limpio que arranca el engine HTTP y pide una
+#   página sintética a un servidor local (sin Chrome); se mide hasta que sale el
+#   request (on_request del pager, como run_summary["startup"]). time-to-first-page
+#   es el proceso completo hasta tener esa página parseada.
+# Sale con código 1 si se rompe un presupuesto o se carga un módulo pesado.
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from src.bench.fixtures import timeline_page_html
+from src.config.settings import PROJECT_ROOT
+
+HEAVY_MODULES: tuple[str, ...] = (
+    "undetected_chromedriver",
+    "selenium",
+    "bs4",
+    "pandas",
+    "pyarrow",
+    "aiohttp",
+    "asyncio",
+)
+
+_CHECK_HEAVY = (
+    "import sys, json, src.main; "
+    f"print(json.dumps([m for m in {list(HEAVY_MODULES)!r} if m in sys.modules]))"
+)
+
+_FIRST_REQUEST = """
+import sys
+import time
+from dataclasses import replace
+from src.config.settings import Settings
+from src.scraping.fetchers import HttpFetchEngine, HttpPager
+import src.main  # noqa: F401  (mismo costo de import que la corrida real)
+settings = replace(Settings(), FETCH_BACKEND="http", PARSER_BACKEND="auto")
+engine = HttpFetchEngine(settings).start()
+pager = HttpPager(engine, sys.argv[1], settings)
+sent = []
+pager.on_request = lambda: sent.append(time.perf_counter())
+pager.open(sys.argv[1] + "/search?f=tweets&q=bench")
+n = len(pager.items())
+engine.close()
+print(time.perf_counter() - sent[0])  # request -> fin del proceso
+print(n)
+"""
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    body = timeline_page_html(20, seed=1).encode("utf-8")
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _run_child(args: list[str]) -> tuple[float, str]:
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return time.perf_counter() - t0, out.stdout.strip()
+
+
+def measure_import(repeat: int) -> dict:
+    baseline = min(_run_child(["-c", "pass"])[0] for _ in range(repeat))
+    wall = min(_run_child(["-c", "import src.main"])[0] for _ in range(repeat))
+
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.main"],
+                         cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    cumulative_us = 0
+    for line in out.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == "src.main":
+            cumulative_us = int(parts[1])
+
+    heavy = json.loads(_run_child(["-c", _CHECK_HEAVY])[1].splitlines()[-1])
+    return {
+        "interpreter_ms": baseline * 1000,
+        "import_wall_ms": wall * 1000,
+        "import_src_main_ms": cumulative_us / 1000,
+        "heavy_modules_loaded": heavy,
+    }
+
+
+def measure_first_request(repeat: int) -> dict:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    mirror = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        runs = [_run_child(["-c", _FIRST_REQUEST, mirror]) for _ in range(repeat)]
+    finally:
+        server.shutdown()
+    # wall del proceso - (request -> salida) = arranque hasta que sale el 1er request
+    ttfr = min(wall - float(out.splitlines()[-2]) for wall, out in runs)
+    first_page, out = min(runs)
+    return {"time_to_first_request_ms": ttfr * 1000, "time_to_first_page_ms": first_page * 1000,
+            "items_first_page": int(out.splitlines()[-1])}
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m src.bench.startup")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--import-budget-ms", type=float, default=150.0,
+                    help="Presupuesto para el acumulado de src.main (-X importtime).")
+    ap.add_argument("--ttfr-budget-ms", type=float, default=1500.0,
+                    help="Presupuesto para time-to-first-request (arranque del proceso hasta que sale el 1er request).")
+    ap.add_argument("--history", type=Path, default=None,
+                    help="JSONL donde se agrega el resultado (seguimiento entre commits).")
+    args = ap.parse_args(argv)
+
+    res = measure_import(args.repeat)
+    try:
+        res.update(measure_first_request(args.repeat))
+    except (subprocess.CalledProcessError, ValueError) as e:
+        print(f"⚠️ time-to-first-request no medido: {e}")
+        res["time_to_first_request_ms"] = None
+
+    print(f"🧪 intérprete vacío:        {res['interpreter_ms']:8.1f} ms")
+    print(f"🧪 import src.main (wall):  {res['import_wall_ms']:8.1f} ms")
+    print(f"🧪 import src.main (cum):   {res['import_src_main_ms']:8.1f} ms  (budget {args.import_budget_ms:.0f})")
+    if res["time_to_first_request_ms"] is not None:
+        print(f"🧪 time-to-first-request:   {res['time_to_first_request_ms']:8.1f} ms  (budget {args.ttfr_budget_ms:.0f})")
+        print(f"🧪 time-to-first-page:      {res['time_to_first_page_ms']:8.1f} ms")
+    print(f"🧪 módulos pesados cargados: {res['heavy_modules_loaded'] or 'ninguno'}")
+
+    failures = []
+    if res["heavy_modules_loaded"]:
+        failures.append(f"import eager de {', '.join(res['heavy_modules_loaded'])}")
+    if res["import_src_main_ms"] > args.import_budget_ms:
+        failures.append(f"import {res['import_src_main_ms']:.0f} ms > {args.import_budget_ms:.0f} ms")
+    ttfr = res["time_to_first_request_ms"]
+    if ttfr is not None and ttfr > args.ttfr_budget_ms:
+        failures.append(f"first request {ttfr:.0f} ms > {args.ttfr_budget_ms:.0f} ms")
+
+    if args.history is not None:
+        rec = {"ts_utc": datetime.now(timezone.utc).isoformat(), **res, "ok": not failures}
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    if failures:
+        print(f"❌ Presupuesto de arranque roto: {'; '.join(failures)}")
+        return 1
+    print("✅ Arranque dentro del presupuesto")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -41,12 +41,138 @@ class Settings:
 
     # Scraping
     MAX_LOAD_MORE: int = 12
+
+    # Corte temprano de paginación (además de MAX_LOAD_MORE):
+    # - past_window_start: EARLY_STOP_PAST_PAGES páginas seguidas con >= EARLY_STOP_PAST_FRACTION
+    #   de items anteriores al inicio de la subventana (o 1 página entera).
+    # - low_yield: vistos need_raw items distintos (target x OVERSAMPLE_FACTOR) y menos de
+    #   EARLY_STOP_MIN_YIELD filas/página en las últimas EARLY_STOP_MIN_PAGES páginas.
+    EARLY_STOP: bool = True
+    EARLY_STOP_PAST_FRACTION: float = 0.8
+    EARLY_STOP_PAST_PAGES: int = 2
+    EARLY_STOP_MIN_YIELD: float = 1.0
+    EARLY_STOP_MIN_PAGES: int = 2
     SLEEP_BETWEEN_PAGES: tuple[float, float] = (2.5, 4.0)
     SLEEP_BETWEEN_MIRRORS: tuple[float, float] = (1.0, 2.0)
 
+    # Orden de mirrors por subventana: "adaptive" (MirrorScheduler: score por
+    # éxito/latencia recientes + circuit breaker) o "shuffle" (aleatorio).
+    MIRROR_SELECTION: str = "adaptive"
+    MIRROR_EWMA_ALPHA: float = 0.2
+    MIRROR_EXPLORE_RATE: float = 0.1
+    MIRROR_FAIL_THRESHOLD: int = 3
+    MIRROR_COOLDOWN_BASE_SEC: float = 60.0
+    MIRROR_COOLDOWN_MAX_SEC: float = 1800.0
+    MIRROR_LATENCY_REF_SEC: float = 10.0
+
+    # Hedging: si el mirror no produce filas de la ventana en HEDGE_AFTER_SEC,
+    # se lanza el siguiente mirror en paralelo (driver extra por worker o HTTP)
+    # y gana el primero en entregar; el otro se cancela. Apunta al p95/p99.
+    HEDGE_ENABLED: bool = False
+    HEDGE_AFTER_SEC: float = 12.0
+
+    # Planner de queries (src/queries/planner.py): los canales cuya query está
+    # contenida en la de otros (TIPO_C_MIXTA ⊂ TIPO_A / TIPO_B) se evalúan
+    # localmente sobre las filas ya bajadas de sus fuentes en la misma subventana.
+    # Opt-in: la muestra del canal derivado sale de la de sus fuentes.
+    # QUERY_PLANNER_TOPUP: si lo derivado no alcanza el target, se pide remoto lo que falta.
+    QUERY_PLANNER: bool = False
+    QUERY_PLANNER_TOPUP: bool = True
+    PLANNER_SOURCE_TIMEOUT_SEC: float = 1800.0
+
+    # Ritmo de requests: "adaptive" (MirrorRateLimiter: token bucket por mirror
+    # con AIMD según feedback: ok / vacío / error / rate limit / latencia) o
+    # "fixed" (pausas aleatorias SLEEP_BETWEEN_*). La tasa inicial ~ ritmo fijo previo.
+    PACING_MODE: str = "adaptive"
+    RATE_INITIAL_RPS: float = 0.3
+    RATE_MIN_RPS: float = 0.05
+    RATE_MAX_RPS: float = 2.0
+    RATE_BURST: float = 2.0
+    RATE_INCREASE_RPS: float = 0.05
+    RATE_DECREASE_FACTOR: float = 0.5
+    RATE_ERROR_FACTOR: float = 0.7
+    RATE_EMPTY_FACTOR: float = 0.9
+    RATE_LATENCY_TARGET_SEC: float = 8.0
+
+    # Paginación en Selenium:
+    # - "click": scroll + click en "Load more" y re-parseo del DOM acumulado (O(k) por página).
+    # - "cursor": driver.get del href cursor= del "Load more"; cada página se parsea una vez.
+    # (El backend HTTP siempre pagina por cursor.)
+    PAGINATION_MODE: str = "click"
+
+    # Espera de "página lista" en Selenium (en lugar de pausas a ciegas tras get/click):
+    # cambia el número de timeline-item, aparece "No items found" o un panel de error.
+    PAGE_READY_TIMEOUT_SEC: float = 15.0
+    PAGE_READY_POLL_SEC: float = 0.15
+
+    # Perfil de Chrome:
+    # - "full": perfil por defecto con ventana (comportamiento histórico).
+    # - "lean": headless, page load "eager" y bloqueo por CDP de imágenes,
+    #   fuentes y media (avatares/previews que la extracción nunca usa).
+    BROWSER_PROFILE: str = "full"
+    BROWSER_BLOCKED_URL_PATTERNS: tuple[str, ...] = (
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+        "*.woff", "*.woff2", "*.ttf", "*.otf",
+        "*.mp4", "*.webm", "*.m3u8", "*.m4s",
+        "*/pic/*", "*/video/*",
+    )
+
+    # Reciclaje de Chrome (corridas de días): entre subventanas se muestrea el RSS
+    # del árbol de procesos del navegador y se reconstruye el driver tras
+    # DRIVER_RECYCLE_PAGES páginas o por encima de DRIVER_RECYCLE_RSS_MB (0 = sin límite).
+    # Cada muestra/reciclaje va a logs/driver_log.csv.
+    DRIVER_RECYCLE_PAGES: int = 2000
+    DRIVER_RECYCLE_RSS_MB: float = 2500.0
+    DRIVER_RSS_SAMPLE_SEC: float = 60.0
+
     # Subventanas
     SUBWINDOW_MINUTES: int = 10
 
+    # Subventanas adaptativas (src/scraping/subwindows.py): "fixed" (6 x SUBWINDOW_MINUTES
+    # por hora) o "adaptive": según la densidad observada en window_log por canal y
+    # franja horaria, fusiona ventanas ralas y bisecta las que saturan MAX_LOAD_MORE.
+    # Los targets horarios se conservan. (Resume usa las claves exactas de ventana:
+    # si el layout cambió entre corridas, combinar con --dedup.)
+    SUBWINDOW_MODE: str = "fixed"
+    ADAPTIVE_EWMA_ALPHA: float = 0.3
+    ADAPTIVE_MIN_OBS: int = 3
+    ADAPTIVE_PAGE_ITEMS: int = 20
+    ADAPTIVE_MERGE_PAGES: int = 1
+    ADAPTIVE_MAX_MINUTES: int = 60
+    ADAPTIVE_MIN_MINUTES: int = 5
+    ADAPTIVE_SPLIT_SATURATION: float = 0.5
+
+    # Parser de páginas (src/scraping/parsers.py): "bs4" (referencia), "lxml",
+    # "selectolax" o "auto" (el más rápido instalado). Mismas filas en todos.
+    PARSER_BACKEND: str = "auto"
+
+    # Extracción en Selenium:
+    # - "page_source": se transfiere el DOM completo y se parsea en Python.
+    # - "js": 1 execute_script devuelve JSON compacto de los items aún no vistos.
+    EXTRACTION_MODE: str = "page_source"
+
+    # Backend de fetch:
+    # - "selenium": Chrome completo por request (default histórico).
+    # - "http": cliente asyncio con pool keep-alive por mirror; Selenium solo como
+    #   fallback para mirrors con challenge JS. Combinar con WORKERS para tener
+    #   muchas subventanas en vuelo sin un Chrome por worker.
+    FETCH_BACKEND: str = "selenium"
+    HTTP_MAX_IN_FLIGHT: int = 32
+    HTTP_POOL_PER_MIRROR: int = 8
+    HTTP_TIMEOUT_SEC: float = 20.0
+    HTTP_SLEEP_BETWEEN_PAGES: tuple[float, float] = (0.5, 1.0)
+    HTTP_BROWSER_ONLY_MIRRORS: tuple[str, ...] = ()
+    HTTP_USER_AGENT: str = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    )
+
+    # Paralelismo: N drivers independientes consumiendo (subventana, canal) de una cola.
+    # 1 = modo serial clásico (un solo driver).
+    WORKERS: int = 1
+    # Tras Ctrl + C, espera máxima (s) a que los workers corten su intento y escriban lo recolectado.
+    POOL_STOP_TIMEOUT_SEC: float = 60.0
+
     # Presupuesto diario por canal
     TOTAL_PER_DAY_PER_CHANNEL_WEEKDAY: int = 2400
     TOTAL_PER_DAY_PER_CHANNEL_WEEKEND: int = 2000
@@ -56,10 +182,65 @@ class Settings:
 
     # Outputs (raw + logs)
     DATASET_PATH: Path = DATA_RAW_DIR / "SISMOGRAFO_TDA_DATASET_RAW.csv"
+    # Formato del dataset: "csv" (DATASET_PATH) o "parquet" (requiere pyarrow):
+    # directorio particionado day=YYYY-MM-DD/query_type=<canal>, schema tipado.
+    # Cada flush crea un archivo por partición -> flush más grande que en CSV.
+    DATASET_FORMAT: str = "csv"
+    DATASET_PARQUET_DIR: Path = DATA_RAW_DIR / "SISMOGRAFO_TDA_DATASET_RAW"
+    PARQUET_FLUSH_EVERY_N_ROWS: int = 2000
+    PARQUET_COMPRESSION: str = "zstd"
     WINDOW_LOG_PATH: Path = LOGS_DIR / "window_log.csv"
     REQUEST_LOG_PATH: Path = LOGS_DIR / "request_log.csv"
+    DRIVER_LOG_PATH: Path = LOGS_DIR / "driver_log.csv"
     RUN_SUMMARY_PATH: Path = LOGS_DIR / "run_summary.json"
 
+    # Spans por etapa (src/utils/spans.py): request_log siempre trae t_<etapa>_sec
+    # por intento; con TRACE_ENABLED (o --trace) además se exporta la corrida en
+    # formato Chrome trace (abrir en ui.perfetto.dev), hasta TRACE_MAX_EVENTS eventos.
+    TRACE_ENABLED: bool = False
+    TRACE_PATH: Path = LOGS_DIR / "trace.json"
+    TRACE_MAX_EVENTS: int = 500_000
+
+    # Endpoint local de métricas en vivo (src/utils/live_metrics.py, formato Prometheus):
+    # http://METRICS_HOST:METRICS_PORT/metrics con intentos, tweets, histogramas de
+    # latencia y p50/p95/p99 por mirror y canal, tweets/min (ventana de
+    # METRICS_RATE_WINDOW_MIN minutos), páginas por intento y backlog del writer.
+    METRICS_ENABLED: bool = False
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 9108
+    METRICS_RATE_WINDOW_MIN: int = 5
+
+    # Archivo de HTML crudo (src/utils/archive.py): cada página parseada se guarda
+    # comprimida y direccionada por contenido, para re-extraer sin re-scrapear
+    # (python -m src.scraping.replay). Codec: "auto" (zstd si está zstandard), "zstd", "gzip".
+    # Requiere EXTRACTION_MODE="page_source" (en modo "js" no se transfiere el HTML).
+    ARCHIVE_ENABLED: bool = False
+    ARCHIVE_DIR: Path = DATA_RAW_DIR / "html_archive"
+    ARCHIVE_CODEC: str = "auto"
+
+    # Ledger de progreso (subventana x canal) para reanudar estudios interrumpidos.
+    # RESUME=True (o --resume): salta unidades completas y reintenta failed/short.
+    LEDGER_PATH: Path = LOGS_DIR / "progress_ledger.sqlite"
+    LEDGER_ENABLED: bool = True
+    RESUME: bool = False
+    RESUME_MAX_ATTEMPTS: int = 3
+
+    # Dedup persistente de status_id (entre canales y entre corridas).
+    # Bloom en memoria (~DEDUP_CAPACITY * 1.2 bytes con fp=1%) + store exacto SQLite.
+    # Con DEDUP_RECORD_MEMBERSHIP, un tweet repetido en otro canal se registra en
+    # la tabla memberships en lugar de duplicar la fila del dataset.
+    DEDUP_ENABLED: bool = False
+    DEDUP_DB_PATH: Path = LOGS_DIR / "status_ids.sqlite"
+    DEDUP_BLOOM_PATH: Path = LOGS_DIR / "status_ids.bloom"
+    DEDUP_CAPACITY: int = 20_000_000
+    DEDUP_FP_RATE: float = 0.01
+    DEDUP_RECORD_MEMBERSHIP: bool = True
+
+    # Escritura a disco en un hilo de fondo (handles abiertos + cola acotada);
+    # False = escritura síncrona en el hilo del scraper.
+    BACKGROUND_WRITER: bool = True
+    WRITER_QUEUE_MAX: int = 10_000
+
     FLUSH_EVERY_N_ROWS: int = 50
     WRITE_HEADER_IF_NEW: bool = True
     REQUEST_LOG_FLUSH_EVERY: int = 25
@@ -5,45 +5,137 @@
 
 from __future__ import annotations
 
+import argparse
+import time
+from dataclasses import replace
 from datetime import datetime
 
+# Presupuesto de arranque: los imports de src.* no deben cargar Chrome/selenium/bs4/pandas
+# (ver `python -m src.bench.startup`). Se reporta en run_summary["startup"].
+_IMPORT_T0 = time.perf_counter()
+
 from src.config.settings import Settings, TZ_LOCAL, ensure_project_dirs
 from src.queries.mirrors import MIRRORS
-from src.scraping.browser import build_driver
-from src.scraping.orchestrator import run_study
-from src.utils.logging import Telemetry
-
+from src.scraping.browser import LazyDriver, driver_factory_from_settings
+from src.scraping.orchestrator import build_run_components, run_study
+from src.utils.live_metrics import LiveMetrics, MetricsServer, register_run_gauges
+from src.utils.logging import Telemetry, start_background_writer, stop_background_writer, writer_backlog
+from src.utils.spans import start_trace, stop_trace
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m src.main", description="Sismógrafo TDA")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Número de drivers en paralelo (override de Settings.WORKERS).")
+    parser.add_argument("--backend", choices=["selenium", "http"], default=None,
+                        help="Backend de fetch (override de Settings.FETCH_BACKEND).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reanuda el estudio: salta unidades completas según el ledger de progreso.")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Activa el índice persistente de status_id (override de Settings.DEDUP_ENABLED).")
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None,
+                        help="Formato del dataset (override de Settings.DATASET_FORMAT).")
+    parser.add_argument("--subwindows", choices=["fixed", "adaptive"], default=None,
+                        help="Tamaño de subventanas (override de Settings.SUBWINDOW_MODE).")
+    parser.add_argument("--browser", choices=["full", "lean"], default=None,
+                        help="Perfil de Chrome (override de Settings.BROWSER_PROFILE).")
+    parser.add_argument("--archive", action="store_true",
+                        help="Guarda el HTML crudo de cada página (override de Settings.ARCHIVE_ENABLED).")
+    parser.add_argument("--planner", action="store_true",
+                        help="Deriva localmente los canales contenidos en otros (override de Settings.QUERY_PLANNER).")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Activa /metrics (Prometheus) en ese puerto (override de Settings.METRICS_PORT).")
+    parser.add_argument("--trace", action="store_true",
+                        help="Exporta spans por etapa en formato Chrome trace (override de Settings.TRACE_ENABLED).")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    import_sec = time.perf_counter() - _IMPORT_T0
+    args = parse_args(argv)
 
-def main() -> None:
     settings = Settings()
+    if args.workers is not None:
+        settings = replace(settings, WORKERS=max(1, args.workers))
+    if args.backend is not None:
+        settings = replace(settings, FETCH_BACKEND=args.backend)
+    if args.resume:
+        settings = replace(settings, RESUME=True)
+    if args.dedup:
+        settings = replace(settings, DEDUP_ENABLED=True)
+    if args.format is not None:
+        settings = replace(settings, DATASET_FORMAT=args.format)
+    if args.subwindows is not None:
+        settings = replace(settings, SUBWINDOW_MODE=args.subwindows)
+    if args.planner:
+        settings = replace(settings, QUERY_PLANNER=True)
+    if args.archive:
+        settings = replace(settings, ARCHIVE_ENABLED=True)
+    if args.browser is not None:
+        settings = replace(settings, BROWSER_PROFILE=args.browser)
+    if args.trace:
+        settings = replace(settings, TRACE_ENABLED=True)
+    if args.metrics_port is not None:
+        settings = replace(settings, METRICS_ENABLED=True, METRICS_PORT=args.metrics_port)
 
     ensure_project_dirs()
 
+    if settings.TRACE_ENABLED:
+        start_trace(settings.TRACE_PATH, max_events=settings.TRACE_MAX_EVENTS)
+
+    if settings.BACKGROUND_WRITER:
+        start_background_writer(max_queue=settings.WRITER_QUEUE_MAX)
+
+    live_metrics = None
+    if settings.METRICS_ENABLED:
+        live_metrics = LiveMetrics(rate_window_min=settings.METRICS_RATE_WINDOW_MIN, max_pages=settings.MAX_LOAD_MORE)
+
     telemetry = Telemetry(
         request_log_path=settings.REQUEST_LOG_PATH,
         run_summary_path=settings.RUN_SUMMARY_PATH,
         write_header_if_new=settings.WRITE_HEADER_IF_NEW,
         request_log_flush_every=settings.REQUEST_LOG_FLUSH_EVERY,
+        process_t0=_IMPORT_T0,
+        driver_log_path=settings.DRIVER_LOG_PATH,
+        live_metrics=live_metrics,
     )
+    telemetry.startup["import_sec"] = import_sec
+
+    make_driver = driver_factory_from_settings(settings)
+    driver = LazyDriver(make_driver)
 
-    driver = build_driver(headless=False)
+    # Ledger, engine HTTP, scheduler / rate limiter de mirrors, planner, dedup, archivo y writer
+    components = build_run_components(settings, telemetry, MIRRORS)
+    writer = components.writer
+    mirror_scheduler = components.mirror_scheduler
+    rate_limiter = components.rate_limiter
 
     # --- RANGO DEL ESTUDIO (LOCAL Bogotá) ---
     # Pre y Post: 4 Jun 2025 00:00 hasta 11 Jun 2025 00:00 (Bogotá)
     start_study = datetime(2025, 6, 4, 0, 0, tzinfo=TZ_LOCAL)
     end_study = datetime(2025, 6, 11, 0, 0, tzinfo=TZ_LOCAL)
-
-    writer = None
     stopped_by_keyboard = False
 
+    metrics_server = None
+    if live_metrics is not None:
+        register_run_gauges(live_metrics, telemetry, writer=writer, mirror_scheduler=mirror_scheduler,
+                            rate_limiter=rate_limiter, backlog=writer_backlog)
+        try:
+            metrics_server = MetricsServer(live_metrics, settings.METRICS_HOST, settings.METRICS_PORT).start()
+            print(f"📈 Métricas en vivo: {metrics_server.url}")
+        except OSError as e:
+            print(f"⚠️ No se pudo abrir el endpoint de métricas en {settings.METRICS_HOST}:{settings.METRICS_PORT}: {e}")
+
     try:
-        writer = run_study(
+        run_study(
             driver=driver,
             mirrors=MIRRORS,
             settings=settings,
             telemetry=telemetry,
             start_study=start_study,
             end_study=end_study,
+            driver_factory=make_driver,
+            **components.run_kwargs(),
         )
 
     except KeyboardInterrupt:
@@ -51,33 +143,46 @@ def main() -> None:
         print("\n🛑 Detenido manualmente por teclado (Ctrl + C). Guardando progreso y cerrando...")
 
     finally:
-        # Flush final dataset buffer
-        if writer is not None:
-            writer.flush()
+        # Flush final dataset buffer (también tras Ctrl + C: el ledger marca esas unidades)
+        writer.flush()
 
         # Flush final request_log
         telemetry.flush_request_log()
 
+        # Drena el writer de fondo (dataset + logs en disco, callbacks de ledger/dedup ejecutados)
+        stop_background_writer()
+
         # run_summary final
         telemetry.write_run_summary(
-            dataset_path=settings.DATASET_PATH,
+            dataset_path=writer.dataset_path,
             window_log_path=settings.WINDOW_LOG_PATH,
+            extra=components.summary_extra() or None,
         )
 
         print(f"✅ run_summary.json guardado en: {settings.RUN_SUMMARY_PATH}")
         print(f"✅ request_log.csv guardado en: {settings.REQUEST_LOG_PATH}")
         print(f"✅ window_log.csv guardado en:  {settings.WINDOW_LOG_PATH}")
+        trace_path = stop_trace()
+        if trace_path is not None:
+            print(f"✅ trace.json (Chrome/Perfetto) guardado en: {trace_path}")
 
         try:
             driver.quit()
         except Exception:
             pass
 
+        if metrics_server is not None:
+            metrics_server.close()
+
+        if components.ledger is not None:
+            print(f"📒 Ledger de progreso: {components.ledger.summary()} -> {settings.LEDGER_PATH}")
+        components.close()
+
         if stopped_by_keyboard:
             print("✅ Cierre limpio tras Ctrl + C (sin errores).")
 
         print("\n✅ Proceso finalizado.")
-        print(f"   - Dataset RAW:  {settings.DATASET_PATH}")
+        print(f"   - Dataset RAW:  {writer.dataset_path}")
         print(f"   - window_log:   {settings.WINDOW_LOG_PATH}")
         print(f"   - request_log:  {settings.REQUEST_LOG_PATH}")
         print(f"   - run_summary:  {settings.RUN_SUMMARY_PATH}")
@@ -8,6 +8,11 @@
 
 from __future__ import annotations
 
+import random
+import threading
+import time
+from dataclasses import dataclass
+
 MIRRORS: list[str] = [
     "https://xcancel.com",
     "https://nitter.poast.org",
@@ -19,3 +24,128 @@ MIRRORS: list[str] = [
     # "https://nuku.trabun.org",
     # "https://nitter.catsarch.com",
 ]
+
+
+# ============================================================
+# SELECCIÓN ADAPTATIVA DE MIRRORS (MirrorScheduler)
+# ============================================================
+# Puntaje por mirror con medias móviles exponenciales (decaen con cada intento):
+#   score = éxito_ewma / (1 + latencia_ewma / latency_ref_sec)
+#   éxito: ok=1, empty=0.3 (la página cargó, pero pudo ser bloqueo silencioso), error=0
+# Circuit breaker: tras N errores seguidos el mirror queda fuera durante un
+# cooldown que se duplica en cada nueva apertura (hasta un máximo). Al vencer,
+# vuelve a la lista (half-open) para un solo worker a la vez (la prueba se
+# libera en report() o, si ese worker no llega a intentarlo, tras cooldown_base_sec):
+# un error más lo reabre, un ok lo cierra.
+# Exploración: con probabilidad explore_rate se adelanta un mirror al azar
+# (distinto del mejor) para no congelar el ranking.
+# ============================================================
+
+_OUTCOME_SUCCESS = {"ok": 1.0, "empty": 0.3, "error": 0.0}
+
+
+@dataclass
+class MirrorHealth:
+    success_ewma: float = 0.7   # prior optimista: un mirror nuevo se prueba pronto
+    latency_ewma: float = 0.0
+    attempts: int = 0
+    consecutive_errors: int = 0
+    trips: int = 0              # aperturas del circuito desde el último ok
+    open_until: float = 0.0     # time.monotonic(); 0 = circuito cerrado
+    probing_until: float = 0.0  # half-open: prueba en vuelo (otro worker no lo recibe hasta report())
+    skipped: int = 0            # veces que quedó fuera de order() por circuito abierto o prueba en vuelo
+
+
+class MirrorScheduler:
+    """
+    Ordena los mirrors para cada subventana según su salud reciente.
+    Thread-safe: los workers del pool comparten una instancia.
+    """
+    def __init__(self, mirrors: list[str], alpha: float = 0.2, explore_rate: float = 0.1,
+                 fail_threshold: int = 3, cooldown_base_sec: float = 60.0, cooldown_max_sec: float = 1800.0,
+                 latency_ref_sec: float = 10.0, rng: random.Random | None = None, clock=time.monotonic):
+        self.alpha = float(alpha)
+        self.explore_rate = float(explore_rate)
+        self.fail_threshold = max(1, int(fail_threshold))
+        self.cooldown_base_sec = float(cooldown_base_sec)
+        self.cooldown_max_sec = float(cooldown_max_sec)
+        self.latency_ref_sec = float(latency_ref_sec)
+        self._rng = rng or random.Random()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.health: dict[str, MirrorHealth] = {m: MirrorHealth() for m in mirrors}
+
+    def _score(self, h: MirrorHealth) -> float:
+        return h.success_ewma / (1.0 + h.latency_ewma / self.latency_ref_sec)
+
+    def order(self, mirrors: list[str]) -> list[str]:
+        """
+        Mirrors a intentar, del mejor al peor; excluye los de circuito abierto y los
+        half-open que ya está probando otro worker.
+        """
+        now = self._clock()
+        with self._lock:
+            for m in mirrors:
+                self.health.setdefault(m, MirrorHealth())
+            closed = [m for m in mirrors if max(self.health[m].open_until, self.health[m].probing_until) <= now]
+            opened = [m for m in mirrors if m not in closed]
+
+            if not closed:
+                # Todos abiertos: se prueba primero el que antes vuelve (no se pierde la subventana).
+                # Los half-open en prueba solo se repiten si no queda otro.
+                idle = [m for m in opened if self.health[m].probing_until <= now]
+                return sorted(idle or opened, key=lambda m: max(self.health[m].open_until,
+                                                                self.health[m].probing_until))
+
+            for m in opened:
+                self.health[m].skipped += 1
+            for m in closed:
+                h = self.health[m]
+                if h.trips > 0:
+                    h.probing_until = now + self.cooldown_base_sec
+
+            ranked = sorted(closed, key=lambda m: self._score(self.health[m]), reverse=True)
+            if len(ranked) > 1 and self._rng.random() < self.explore_rate:
+                pick = self._rng.randrange(1, len(ranked))
+                ranked.insert(0, ranked.pop(pick))
+            return ranked
+
+    def report(self, mirror: str, outcome: str, latency_sec: float) -> None:
+        """outcome: "ok" | "empty" | "error" (mismo criterio que Telemetry.update_after_request)."""
+        with self._lock:
+            h = self.health.setdefault(mirror, MirrorHealth())
+            h.probing_until = 0.0
+            a = self.alpha
+            h.attempts += 1
+            h.success_ewma = (1 - a) * h.success_ewma + a * _OUTCOME_SUCCESS[outcome]
+            h.latency_ewma = float(latency_sec) if h.attempts == 1 else (1 - a) * h.latency_ewma + a * float(latency_sec)
+
+            if outcome == "error":
+                h.consecutive_errors += 1
+                half_open = h.trips > 0
+                if half_open or h.consecutive_errors >= self.fail_threshold:
+                    h.trips += 1
+                    cooldown = min(self.cooldown_base_sec * (2 ** (h.trips - 1)), self.cooldown_max_sec)
+                    h.open_until = self._clock() + cooldown
+                    h.consecutive_errors = 0
+                    print(f"   🔌 Circuito abierto para {mirror}: {cooldown:.0f}s (apertura #{h.trips})")
+            else:
+                h.consecutive_errors = 0
+                if outcome == "ok":
+                    h.trips = 0
+
+    def snapshot(self) -> dict:
+        now = self._clock()
+        with self._lock:
+            return {
+                m: {
+                    "score": round(self._score(h), 4),
+                    "success_ewma": round(h.success_ewma, 4),
+                    "latency_ewma_sec": round(h.latency_ewma, 3),
+                    "attempts": h.attempts,
+                    "trips": h.trips,
+                    "circuit_open_sec_left": round(max(0.0, h.open_until - now), 1),
+                    "skipped": h.skipped,
+                }
+                for m, h in self.health.items()
+            }
@@ -0,0 +1,300 @@
+# src/queries/planner.py
+# ============================================================
+# PLANNER DE QUERIES (canales derivables de otros canales)
+# ============================================================
+# Nota:
+# - Parsea las expresiones OR/AND de QUERY_CORE (términos, "frases", paréntesis;
+#   dos términos seguidos sin operador = AND, como en la búsqueda de X/Nitter).
+# - Un canal C es derivable si su query implica la de otro canal S (todo tweet
+#   que matchea C también matchea S): p.ej. TIPO_C_MIXTA ⊂ TIPO_A_ACTORES y
+#   ⊂ TIPO_B_FRAMES. Entonces C se evalúa localmente sobre las filas ya bajadas
+#   para S en la misma subventana, sin query remota.
+# - El chequeo de implicación es sintáctico (sound, no completo): si no puede
+#   probarla, el canal sigue siendo remoto.
+# - El match local es una aproximación de la búsqueda remota: texto + usuario +
+#   menciones + hashtags, sin mayúsculas ni tildes. Solo puede quedarse corto
+#   (no ve citas/URLs); ante un faltante el orquestador completa remotamente.
+# ============================================================
+
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Sequence, Union
+
+_TOKEN_RE = re.compile(r'"([^"]*)"|(\()|(\))|([^\s()"]+)')
+_WORD_RE = re.compile(r"[a-z0-9_]+")
+
+
+@dataclass(frozen=True)
+class Term:
+    words: tuple[str, ...]
+
+    def __str__(self) -> str:
+        return " ".join(self.words) if len(self.words) == 1 else f'"{" ".join(self.words)}"'
+
+
+@dataclass(frozen=True)
+class Or:
+    children: tuple["Node", ...]
+
+
+@dataclass(frozen=True)
+class And:
+    children: tuple["Node", ...]
+
+
+Node = Union[Term, Or, And]
+
+
+def fold_words(text: str) -> list[str]:
+    """Minúsculas, sin tildes, palabras [a-z0-9_]."""
+    t = unicodedata.normalize("NFKD", text or "")
+    t = "".join(ch for ch in t if not unicodedata.combining(ch)).lower()
+    return _WORD_RE.findall(t)
+
+
+# -----------------------------
+# Parser
+# -----------------------------
+def _lex(query: str) -> list[tuple[str, object]]:
+    out: list[tuple[str, object]] = []
+    for m in _TOKEN_RE.finditer(query):
+        phrase, lpar, rpar, word = m.groups()
+        if phrase is not None:
+            out.append(("TERM", tuple(fold_words(phrase))))
+        elif lpar:
+            out.append(("(", None))
+        elif rpar:
+            out.append((")", None))
+        elif word in ("OR", "AND"):
+            out.append((word, None))
+        else:
+            out.append(("TERM", tuple(fold_words(word))))
+    return out
+
+
+def _make(kind, children: list[Node]) -> Node:
+    flat: list[Node] = []
+    for c in children:
+        flat.extend(c.children if isinstance(c, kind) else (c,))
+    return flat[0] if len(flat) == 1 else kind(tuple(flat))
+
+
+def parse_query(query: str) -> Node:
+    """
+    Gramática: expr := and_expr (OR and_expr)*; and_expr := atom ((AND)? atom)*;
+    atom := término | "frase" | ( expr ). OR liga más débil que AND.
+    """
+    toks = _lex(query)
+    pos = 0
+
+    def peek():
+        return toks[pos][0] if pos < len(toks) else None
+
+    def expr() -> Node:
+        nonlocal pos
+        parts = [and_expr()]
+        while peek() == "OR":
+            pos += 1
+            parts.append(and_expr())
+        return _make(Or, parts)
+
+    def and_expr() -> Node:
+        nonlocal pos
+        parts = [atom()]
+        while peek() in ("AND", "TERM", "("):
+            if peek() == "AND":
+                pos += 1
+            parts.append(atom())
+        return _make(And, parts)
+
+    def atom() -> Node:
+        nonlocal pos
+        kind = peek()
+        if kind == "(":
+            pos += 1
+            node = expr()
+            if peek() != ")":
+                raise ValueError(f"Query mal formada (falta ')'): {query[:60]!r}")
+            pos += 1
+            return node
+        if kind == "TERM":
+            words = toks[pos][1]
+            pos += 1
+            if not words:
+                raise ValueError(f"Término vacío en query: {query[:60]!r}")
+            return Term(words)
+        raise ValueError(f"Query mal formada cerca del token {pos}: {query[:60]!r}")
+
+    node = expr()
+    if pos != len(toks):
+        raise ValueError(f"Query mal formada (tokens sobrantes): {query[:60]!r}")
+    return node
+
+
+# -----------------------------
+# Implicación y evaluación
+# -----------------------------
+def implies(a: Node, b: Node) -> bool:
+    """True si todo tweet que matchea 'a' matchea 'b' (chequeo sintáctico)."""
+    if isinstance(a, Or):
+        return all(implies(c, b) for c in a.children)
+    if isinstance(b, And):
+        return all(implies(a, c) for c in b.children)
+    if isinstance(a, And) and any(implies(c, b) for c in a.children):
+        return True
+    if isinstance(b, Or):
+        return any(implies(a, c) for c in b.children)
+    return isinstance(a, Term) and isinstance(b, Term) and a == b
+
+
+def _contains(words: Sequence[str], phrase: tuple[str, ...]) -> bool:
+    n = len(phrase)
+    if n == 1:
+        return phrase[0] in words
+    first = phrase[0]
+    return any(words[i] == first and tuple(words[i:i + n]) == phrase for i in range(len(words) - n + 1))
+
+
+def matches(node: Node, words: Sequence[str]) -> bool:
+    if isinstance(node, Term):
+        return _contains(words, node.words)
+    if isinstance(node, Or):
+        return any(matches(c, words) for c in node.children)
+    return all(matches(c, words) for c in node.children)
+
+
+def row_words(row: dict) -> list[str]:
+    """Palabras buscables de una fila del dataset (texto + autor + menciones + hashtags)."""
+    return fold_words(" ".join((
+        row.get("texto_norm") or row.get("texto_raw") or "",
+        row.get("usuario") or "",
+        (row.get("menciones") or "").replace("|", " "),
+        (row.get("hashtags") or "").replace("|", " "),
+    )))
+
+
+# -----------------------------
+# Plan
+# -----------------------------
+@dataclass(frozen=True)
+class QueryPlan:
+    """remote: canales con query propia; derived: canal -> canales fuente (remotos)."""
+    remote: tuple[str, ...]
+    derived: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    queries: dict[str, Node] = field(default_factory=dict)
+
+    @property
+    def sources(self) -> frozenset[str]:
+        return frozenset(s for ss in self.derived.values() for s in ss)
+
+    def ordered(self, channels: Sequence[str]) -> list[str]:
+        """Mismo orden, con los canales derivados al final (sus fuentes corren antes)."""
+        return [c for c in channels if c not in self.derived] + [c for c in channels if c in self.derived]
+
+    def derive_rows(self, channel: str, source_rows: list[dict], query_hash: str) -> list[dict]:
+        """Filas de las fuentes que matchean la query de 'channel', re-etiquetadas (sin duplicados)."""
+        node = self.queries[channel]
+        out: list[dict] = []
+        seen: set[str] = set()
+        for r in source_rows:
+            sid = r.get("status_id") or ""
+            if sid in seen or not matches(node, row_words(r)):
+                continue
+            seen.add(sid)
+            out.append({**r, "query_type": channel, "query_hash": query_hash, "mode_used": "derived"})
+        return out
+
+
+def plan_queries(query_core: dict[str, str], channels: Sequence[str] | None = None) -> QueryPlan:
+    """
+    Marca como derivado todo canal cuya query implica estrictamente la de otro;
+    sus fuentes son los canales no derivados que lo contienen.
+    """
+    channels = list(channels if channels is not None else query_core)
+    nodes = {c: parse_query(query_core[c]) for c in channels}
+
+    supersets = {
+        c: [s for s in channels if s != c and implies(nodes[c], nodes[s]) and not implies(nodes[s], nodes[c])]
+        for c in channels
+    }
+    derived_set = {c for c, sups in supersets.items() if sups}
+    derived = {c: tuple(s for s in supersets[c] if s not in derived_set) for c in channels if c in derived_set}
+    derived = {c: ss for c, ss in derived.items() if ss}
+    remote = tuple(c for c in channels if c not in derived)
+    return QueryPlan(remote=remote, derived=derived, queries=nodes)
+
+
+# -----------------------------
+# Filas de fuentes por subventana (compartidas entre workers)
+# -----------------------------
+@dataclass
+class _SourceEntry:
+    event: threading.Event = field(default_factory=threading.Event)
+    rows: list[dict] = field(default_factory=list)
+    claims: int = 0
+    closed: bool = False
+
+
+class SourcePool:
+    """
+    Filas (incluidas las sobrantes de páginas ya bajadas) de cada unidad fuente
+    (window_id, window_end, canal), hasta que las consumen sus canales derivados.
+    - expect(): la unidad fuente fue planificada (va a publicar).
+    - claim(): un canal derivado la va a usar; take() espera el publish y libera.
+    - close(): ya no habrá más claims; se libera al publicar si nadie la reclamó.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, str, str], _SourceEntry] = {}
+
+    def expect(self, key: tuple[str, str, str]) -> None:
+        with self._lock:
+            self._entries.setdefault(key, _SourceEntry())
+
+    def claim(self, key: tuple[str, str, str]) -> bool:
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None or e.closed:
+                return False
+            e.claims += 1
+            return True
+
+    def close(self, key: tuple[str, str, str]) -> None:
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None:
+                return
+            e.closed = True
+            if e.claims == 0 and e.event.is_set():
+                del self._entries[key]
+
+    def publish(self, key: tuple[str, str, str], rows: list[dict]) -> None:
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None:
+                return
+            e.rows = rows
+            e.event.set()
+            if e.closed and e.claims == 0:
+                del self._entries[key]
+
+    def take(self, key: tuple[str, str, str], timeout: float | None = None) -> list[dict] | None:
+        """Filas publicadas por la fuente (None si no llegó a tiempo)."""
+        with self._lock:
+            e = self._entries.get(key)
+        if e is None:
+            return None
+        ok = e.event.wait(timeout)
+        with self._lock:
+            e.claims -= 1
+            if e.closed and e.claims <= 0 and e.event.is_set():
+                self._entries.pop(key, None)
+        return e.rows if ok else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
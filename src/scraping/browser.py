@@ -1,13 +1,189 @@
 # src/scraping/browser.py
 from __future__ import annotations
 
-import undetected_chromedriver as uc
+import os
+import threading
 
 
-def build_driver(headless: bool = False):
+# Perfil "lean": sin imágenes, autoplay ni servicios de fondo de Chrome.
+_LEAN_ARGS: tuple[str, ...] = (
+    "--blink-settings=imagesEnabled=false",
+    "--autoplay-policy=user-gesture-required",
+    "--mute-audio",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+    "--window-size=1366,900",
+)
+
+
+def build_driver(headless: bool = False, lean: bool = False,
+                 blocked_url_patterns: tuple[str, ...] = ()):
+    """
+    Chrome vía undetected_chromedriver.
+    lean=True: headless, page_load_strategy="eager" (no espera imágenes/fuentes;
+    el pager ya espera los timeline-item), features de fondo desactivadas y
+    bloqueo por CDP (Network.setBlockedURLs) de blocked_url_patterns.
+    """
+    # Import diferido: undetected_chromedriver + selenium cuestan ~0.3 s y parchean
+    # chromedriver; solo se pagan cuando de verdad se abre Chrome.
+    import undetected_chromedriver as uc
+
     options = uc.ChromeOptions()
     options.add_argument("--disable-popup-blocking")
-    if headless:
+    if headless or lean:
         options.add_argument("--headless=new")
+    if lean:
+        options.page_load_strategy = "eager"
+        for arg in _LEAN_ARGS:
+            options.add_argument(arg)
     driver = uc.Chrome(options=options)
+
+    if lean and blocked_url_patterns:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(blocked_url_patterns)})
+        except Exception as e:
+            # Sin CDP sigue valiendo imagesEnabled=false; fuentes/media se descargan.
+            print(f"⚠️ No se pudo activar el bloqueo de recursos por CDP: {e}")
     return driver
+
+
+def driver_factory_from_settings(settings):
+    """Factory de drivers según BROWSER_PROFILE ("full" | "lean")."""
+    lean = settings.BROWSER_PROFILE == "lean"
+    patterns = tuple(settings.BROWSER_BLOCKED_URL_PATTERNS)
+    return lambda: build_driver(headless=lean, lean=lean, blocked_url_patterns=patterns)
+
+
+def browser_pid(driver) -> int | None:
+    """PID del proceso raíz de Chrome (o de chromedriver) de un driver ya construido."""
+    pid = getattr(driver, "browser_pid", None)  # undetected_chromedriver
+    if pid:
+        return pid
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    return getattr(process, "pid", None)
+
+
+def process_tree_rss_mb(root_pid: int | None) -> float | None:
+    """RSS total (MB) de un proceso y sus descendientes: psutil si está, si no /proc (Linux)."""
+    if not root_pid:
+        return None
+    try:
+        import psutil  # opcional
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        try:
+            root = psutil.Process(root_pid)
+            procs = [root, *root.children(recursive=True)]
+            return sum(p.memory_info().rss for p in procs) / 1e6
+        except psutil.Error:
+            return None
+
+    if not os.path.isdir("/proc"):
+        return None
+    children: dict[int, list[int]] = {}
+    for d in os.listdir("/proc"):
+        if not d.isdigit():
+            continue
+        try:
+            with open(f"/proc/{d}/stat", "r") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(d))
+
+    total_kb, stack, found = 0, [root_pid], False
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        found = True
+                        break
+        except OSError:
+            continue
+    return total_kb / 1000 if found else None
+
+
+class LazyDriver:
+    """
+    Proxy que construye el driver real en el primer uso.
+    main siempre lo usa: Chrome arranca con el primer fetch (no al importar ni
+    al iniciar), y con FETCH_BACKEND="http" solo si algún mirror exige JS.
+    Lleva la cuenta de páginas (SeleniumPager llama note_page) para que el
+    orquestador lo recicle entre subventanas: recycle() cierra Chrome y el
+    próximo uso lo reconstruye con la misma factory. quit() es definitivo: un
+    acceso posterior (p.ej. un worker que no alcanzó a salir) lanza RuntimeError
+    en vez de arrancar un Chrome huérfano.
+    """
+    def __init__(self, factory):
+        self._factory = factory
+        self._driver = None
+        self._lock = threading.Lock()
+        self.closed = False
+        self.pages = 0              # páginas desde el último (re)arranque
+        self.page_sec = 0.0         # latencia acumulada de esas páginas
+        self.recycles = 0
+        self.sampled_at = 0.0       # monotonic de la última muestra de RSS (la fija el orquestador)
+        self._window_pages = 0
+        self._window_sec = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self._driver is not None
+
+    def note_page(self, latency_sec: float) -> None:
+        self.pages += 1
+        self.page_sec += latency_sec
+        self._window_pages += 1
+        self._window_sec += latency_sec
+
+    def take_window_latency(self) -> tuple[int, float | None]:
+        """(páginas, latencia media) desde la llamada anterior."""
+        n, sec = self._window_pages, self._window_sec
+        self._window_pages, self._window_sec = 0, 0.0
+        return n, (sec / n if n else None)
+
+    def rss_mb(self) -> float | None:
+        return process_tree_rss_mb(browser_pid(self._driver)) if self._driver is not None else None
+
+    def recycle(self) -> None:
+        self._close_driver()
+        self.recycles += 1
+
+    def _get(self):
+        if self._driver is None:
+            with self._lock:
+                if self.closed:
+                    raise RuntimeError("LazyDriver cerrado: no se reconstruye Chrome tras quit()")
+                if self._driver is None:
+                    self._driver = self._factory()
+        return self._driver
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def quit(self) -> None:
+        with self._lock:
+            self.closed = True
+        self._close_driver()
+
+    def _close_driver(self) -> None:
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            finally:
+                self._driver = None
+                self.pages = 0
+                self.page_sec = 0.0
@@ -8,20 +8,21 @@ from __future__ import annotations
 import hashlib
 import random
 import re
+import threading
 import time
 import urllib.parse
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
-from bs4 import BeautifulSoup
-from selenium.webdriver.common.by import By
-
 from src.config.settings import Settings, TZ_LOCAL, TZ_UTC
 from src.queries.query_core import QUERY_CORE
-from src.utils.dates import parse_date_any_utc, to_epoch_utc
-from src.utils.metrics import parse_stats_best_effort
+from src.scraping.fetchers import JsChallengeRequired, SeleniumPager, build_pager
+from src.utils.dates import parse_date_fields_utc, to_epoch_utc
+from src.utils.metrics import parse_stats_texts
 from src.utils.text import normalize_whitespace
 from src.utils.logging import _short_err, log_window_row, append_csv_rows
+from src.utils.spans import SpanTimer
 
 
 def query_hash(q: str) -> str:
@@ -43,207 +44,338 @@ def build_search_path_epoch(query_raw: str, sub_start_local, sub_end_local) -> s
     return f"/search?f=tweets&q={urllib.parse.quote(full_query)}"
 
 
-def extraer_subventana_epoch(
-    driver,
-    mirrors: list[str],
-    settings: Settings,
-    telemetry,
-    sub_start_local,
-    sub_end_local,
-    etapa: str,
-    target: int,
-    window_log_path: Path,
-    write_header_if_new: bool,
-) -> list[dict]:
+class SubwindowCollector:
     """
-    Pide tweets usando since_time/until_time (epoch) para la subventana,
-    filtra por dt_tweet convertido a hora local (Bogotá) y recolecta hasta 'target'.
+    Acumula las filas válidas de 1 intento (mirror x subventana) y los
+    contadores de auditoría. Consume items crudos (ver src/scraping/parsers.py),
+    así el mismo armado de filas sirve para cualquier backend de parseo.
+    keep_spare: al llegar al target se siguen armando las filas de la página ya
+    bajada en 'sobrantes' (sin pedir más páginas), para derivar otros canales.
+    exclude_ids: status_id ya escritos (reintento de resume); se saltan sin ocupar
+    lugar del target ni contar como items distintos.
     """
-    query_raw = QUERY_CORE[etapa]
-    qh = query_hash(query_raw)
-    path = build_search_path_epoch(query_raw, sub_start_local, sub_end_local)
-
-    mirrors_local = mirrors[:]
-    random.shuffle(mirrors_local)
+    def __init__(self, etapa: str, mirror: str, qh: str, sub_start_local, sub_end_local,
+                 target: int, debug: bool = False, mode_used: str = "epoch", keep_spare: bool = False,
+                 exclude_ids: frozenset[str] = frozenset()):
+        self.etapa = etapa
+        self.mirror = mirror
+        self.qh = qh
+        self.sub_start_local = sub_start_local
+        self.sub_end_local = sub_end_local
+        self.target = target
+        self.debug = debug
+        self.mode_used = mode_used
+        self.keep_spare = keep_spare
+        self.exclude_ids = exclude_ids
+        self.window_id = sub_start_local.strftime("%Y-%m-%d %H:%M")
+
+        self.recolectados: list[dict] = []
+        self.sobrantes: list[dict] = []
+        self.ids_vistos: set[str] = set()
+
+        self.seen_items_total = 0
+        self.dates_ok = 0
+        self.dates_fail = 0
+        self.outside_window = 0
+        self.no_link = 0
+        self.no_content = 0
+        self.stop_reason = "finished_loop"
+
+        # Por página consumida (para el corte temprano): fracción de items nuevos
+        # anteriores a sub_start y filas nuevas dentro de la ventana.
+        self.page_past_fraction: list[float | None] = []
+        self.page_yield: list[int] = []
+
+    @property
+    def done(self) -> bool:
+        return len(self.recolectados) >= self.target
+
+    def early_stop(self, need_raw: int, past_fraction: float, past_pages: int,
+                   min_yield: float, min_pages: int) -> str | None:
+        """
+        Política de corte de paginación (resultados del más nuevo al más viejo):
+        - "past_window_start": las últimas 'past_pages' páginas (o la última, si
+          entera) no rindieron filas y traen casi solo items anteriores al inicio
+          de la ventana (retweets viejos intercalados no cortan mientras haya filas).
+        - "low_yield": ya se vieron need_raw items distintos (status_id únicos: en
+          paginación click cada página re-entrega el DOM acumulado, así que
+          seen_items_total cuenta de más) y las últimas 'min_pages' páginas
+          rindieron menos de 'min_yield' filas por página.
+        """
+        pages = list(zip(self.page_past_fraction, self.page_yield))
+        if pages and pages[-1][1] == 0 and pages[-1][0] is not None and pages[-1][0] >= 1.0:
+            return "past_window_start"
+        recent = pages[-past_pages:]
+        if len(recent) == past_pages and all(y == 0 and f is not None and f >= past_fraction for f, y in recent):
+            return "past_window_start"
+
+        if len(self.page_yield) >= min_pages and len(self.ids_vistos) >= need_raw:
+            if sum(self.page_yield[-min_pages:]) / min_pages < min_yield:
+                return "low_yield"
+        return None
+
+    def consume(self, items: list[dict]) -> None:
+        sub_start_local, sub_end_local = self.sub_start_local, self.sub_end_local
+        n_rows0 = len(self.recolectados) + len(self.sobrantes)
+        page_dated = 0
+        page_before_start = 0
+
+        for item in items:
+            if len(self.recolectados) >= self.target:
+                self.stop_reason = "meta_reached"
+                if not self.keep_spare:
+                    break
+            if item["show_more"]:
+                continue
+
+            self.seen_items_total += 1
+
+            t_link = item["href"]
+            if not t_link:
+                self.no_link += 1
+                continue
+
+            status_id = extract_status_id(t_link)
+            if not status_id or status_id in self.ids_vistos or status_id in self.exclude_ids:
+                continue
+            self.ids_vistos.add(status_id)
+
+            dt_utc = parse_date_fields_utc(item["title"], item["datetime"])
+            if dt_utc is None:
+                self.dates_fail += 1
+                continue
+            self.dates_ok += 1
+            dt_local = dt_utc.astimezone(TZ_LOCAL)
+            page_dated += 1
+
+            if not (sub_start_local <= dt_local < sub_end_local):
+                self.outside_window += 1
+                if dt_local < sub_start_local:
+                    page_before_start += 1
+                continue
+
+            raw_text = item["text"]
+            if raw_text is None:
+                self.no_content += 1
+                continue
+
+            st = parse_stats_texts(item["stats"])
+
+            links = item["links"]
+            hashtags = [x for x in links if x.startswith("#")]
+            mentions = [x for x in links if x.startswith("@")]
+
+            norm_text = normalize_whitespace(raw_text)
+
+            out = self.recolectados if len(self.recolectados) < self.target else self.sobrantes
+            out.append({
+                "window_id": self.window_id,
+                "timestamp_local": dt_local.isoformat(),
+                "timestamp_utc": dt_utc.astimezone(TZ_UTC).isoformat(),
+                "query_type": self.etapa,
+                "usuario": item["username"],
+                "texto_raw": raw_text,
+                "texto_norm": norm_text,
+                "hashtags": "|".join(hashtags),
+                "menciones": "|".join(mentions),
+                "replies": st["replies"],
+                "retweets": st["retweets"],
+                "quotes": st["quotes"],
+                "likes": st["likes"],
+                "stats_raw": st["stats_raw"],
+                "stats_len": st["stats_len"],
+                "stats_suspect": st["stats_suspect"],
+                "status_id": status_id,
+                "mirror_used": self.mirror,
+                "mode_used": self.mode_used,
+                "query_hash": self.qh,
+            })
 
-    need_raw = max(target * settings.OVERSAMPLE_FACTOR, target)
+            if self.debug and len(self.recolectados) <= 2:
+                print(f"   🧪 dt_local={dt_local} | subwindow=[{sub_start_local}, {sub_end_local})")
+
+        self.page_past_fraction.append(page_before_start / page_dated if page_dated else None)
+        self.page_yield.append(len(self.recolectados) + len(self.sobrantes) - n_rows0)
+
+
+@dataclass
+class MirrorAttempt:
+    """Estado de 1 intento mirror x subventana (compartido con el hilo que lo ejecuta en modo hedging)."""
+    mirror: str
+    col: SubwindowCollector
+    cancel: threading.Event | None = None
+    cancel_reason: str = "hedge_cancelled"  # stop_reason si 'cancel' corta el intento
+    progressed: bool = False     # ya produjo filas dentro de la ventana
+    pages_used: int = 0
+    had_error: bool = False
+    error_type: str = ""
+    error_msg: str = ""
+    backend: str = ""
+    t_total: float = 0.0
+    spans: SpanTimer | None = None  # tiempos por etapa (request_log t_<etapa>_sec)
+
+    @property
+    def ok(self) -> bool:
+        return len(self.col.recolectados) > 0 and not self.had_error
+
+
+def _pause_between_mirrors(settings: Settings, rate_limiter=None) -> None:
+    # Con rate limiter (PACING_MODE="adaptive") el ritmo lo pone el token bucket de cada mirror.
+    if rate_limiter is None:
+        time.sleep(random.uniform(*settings.SLEEP_BETWEEN_MIRRORS))
 
-    for mirror in mirrors_local:
-        recolectados: list[dict] = []
-        ids_vistos: set[str] = set()
-
-        seen_items_total = 0
-        dates_ok = 0
-        dates_fail = 0
-        outside_window = 0
-        no_link = 0
-        no_content = 0
-        pages_used = 0
-        stop_reason = "finished_loop"
-
-        t0 = time.time()
-        had_error = False
-        error_type = ""
-        error_msg = ""
 
+def _run_mirror_attempt(att: MirrorAttempt, driver, path: str, settings: Settings,
+                        sub_start_local, sub_end_local, etapa: str, target: int, need_raw: int,
+                        window_log_path: Path, write_header_if_new: bool,
+                        http_engine=None, rate_limiter=None, on_window_row=None,
+                        on_progress=None, archive=None, on_request=None) -> MirrorAttempt:
+    """
+    Abre la búsqueda en 1 mirror y pagina hasta target / fin de páginas / cancelación.
+    Escribe la fila de window_log; la telemetría del intento la reporta el llamador.
+    Con archive (PageArchive) guarda el HTML de cada página parseada.
+    Los tiempos por etapa quedan en att.spans (ver src/utils/spans.py).
+    on_request: callback de los pagers antes de cada fetch (Telemetry.note_request_start).
+    """
+    mirror, col = att.mirror, att.col
+    t0 = time.time()
+    span_t0 = time.perf_counter()
+    spans = att.spans = SpanTimer(channel=etapa, mirror=mirror, window=col.window_id)
+    attempt_utc = datetime.now(TZ_UTC).isoformat()
+    # click + page_source: el DOM acumulado se guarda una vez, cuando deja de crecer
+    # (click que navegó a otra página o fin del intento): (página, html, 1er href, n items).
+    pending: tuple[int, str, str | None, int] | None = None
+
+    def archive_page(page_index: int, html: str, accumulated: bool) -> None:
+        with spans.span("archive"):
+            archive.put_page(window_id=col.window_id, window_end=sub_end_local.strftime("%Y-%m-%d %H:%M"),
+                             channel=etapa, mirror=mirror, query_hash=col.qh, attempt_utc=attempt_utc,
+                             page_index=page_index, html=html, target=target, accumulated=accumulated)
+    pager = build_pager(driver, mirror, settings, http_engine, limiter=rate_limiter)
+    pager.cancel = att.cancel
+    pager.spans = spans
+    pager.on_request = on_request
+    att.backend = pager.backend
+
+    try:
+        url = f"{mirror}{path}"
         try:
-            url = f"{mirror}{path}"
-            driver.get(url)
-            time.sleep(random.uniform(2.8, 4.2))
-
-            print(
-                f"📡 Canal: {etapa} | Mirror: {mirror} | Mode: epoch | Subventana: "
-                f"{sub_start_local.strftime('%Y-%m-%d %H:%M')} -> {sub_end_local.strftime('%H:%M')} | "
-                f"target={target} | need_raw={need_raw}"
-            )
-
-            for page in range(settings.MAX_LOAD_MORE):
-                pages_used = page + 1
-                time.sleep(random.uniform(*settings.SLEEP_BETWEEN_PAGES))
-
-                soup = BeautifulSoup(driver.page_source, "html.parser")
-                items = soup.find_all("div", class_="timeline-item")
-
-                if settings.DEBUG and page == 0:
-                    print(f"   🔎 timeline-item encontrados: {len(items)}")
-                    if items:
-                        first = items[0]
-                        print("   🔎 first.tweet-content?", first.find("div", class_="tweet-content") is not None)
-                        print("   🔎 first.tweet-link?", first.find("a", class_="tweet-link") is not None)
-                        td = first.find("span", class_="tweet-date")
-                        print("   🔎 first.tweet-date?", td is not None)
-                        if td and td.find("a"):
-                            a = td.find("a")
-                            print("   🕒 date.title:", a.get("title"))
-                            print("   🕒 date.datetime:", a.get("datetime"))
-                            print("   🕒 date.href:", a.get("href"))
-
-                for item in items:
-                    if len(recolectados) >= target:
-                        stop_reason = "meta_reached"
-                        break
-                    if "show-more" in (item.get("class") or []):
-                        continue
-
-                    seen_items_total += 1
-
-                    a_link = item.find("a", class_="tweet-link")
-                    if not a_link or not a_link.get("href"):
-                        no_link += 1
-                        continue
-
-                    t_link = a_link["href"]
-                    status_id = extract_status_id(t_link)
-                    if not status_id or status_id in ids_vistos:
-                        continue
-                    ids_vistos.add(status_id)
-
-                    dt_utc = parse_date_any_utc(item)
-                    if dt_utc is None:
-                        dates_fail += 1
-                        continue
-                    dates_ok += 1
-                    dt_local = dt_utc.astimezone(TZ_LOCAL)
-
-                    if not (sub_start_local <= dt_local < sub_end_local):
-                        outside_window += 1
-                        continue
-
-                    content = item.find("div", class_="tweet-content")
-                    if content is None:
-                        no_content += 1
-                        continue
-
-                    st = parse_stats_best_effort(item)
-
-                    links = content.find_all("a")
-                    hashtags = [x.get_text() for x in links if x.get_text().startswith("#")]
-                    mentions = [x.get_text() for x in links if x.get_text().startswith("@")]
-
-                    user_a = item.find("a", class_="username")
-                    usuario = user_a.get_text(strip=True) if user_a else ""
-
-                    raw_text = content.get_text(separator=" ", strip=True)
-                    norm_text = normalize_whitespace(raw_text)
-
-                    recolectados.append({
-                        "window_id": sub_start_local.strftime("%Y-%m-%d %H:%M"),
-                        "timestamp_local": dt_local.isoformat(),
-                        "timestamp_utc": dt_utc.astimezone(TZ_UTC).isoformat(),
-                        "query_type": etapa,
-                        "usuario": usuario,
-                        "texto_raw": raw_text,
-                        "texto_norm": norm_text,
-                        "hashtags": "|".join(hashtags),
-                        "menciones": "|".join(mentions),
-                        "replies": st["replies"],
-                        "retweets": st["retweets"],
-                        "quotes": st["quotes"],
-                        "likes": st["likes"],
-                        "stats_raw": st["stats_raw"],
-                        "stats_len": st["stats_len"],
-                        "stats_suspect": st["stats_suspect"],
-                        "status_id": status_id,
-                        "mirror_used": mirror,
-                        "mode_used": "epoch",
-                        "query_hash": qh,
-                    })
-
-                    if settings.DEBUG and len(recolectados) <= 2:
-                        print(f"   🧪 dt_local={dt_local} | subwindow=[{sub_start_local}, {sub_end_local})")
-
-                if len(recolectados) >= target:
-                    break
-
-                try:
-                    btn = driver.find_element(By.PARTIAL_LINK_TEXT, "Load more")
-                    driver.execute_script("arguments[0].scrollIntoView();", btn)
-                    btn.click()
-                except Exception:
-                    stop_reason = "no_more_pages"
+            pager.open(url)
+        except JsChallengeRequired as e:
+            http_engine.mark_requires_browser(mirror)
+            print(f"   🧩 {e} -> fallback a Selenium para {mirror}")
+            if driver is None:
+                raise RuntimeError("fallback a Selenium sin driver propio para este intento") from e
+            pager = SeleniumPager(driver, settings, mirror=mirror, limiter=rate_limiter)
+            pager.cancel = att.cancel
+            pager.spans = spans
+            pager.on_request = on_request
+            att.backend = pager.backend
+            pager.open(url)
+
+        print(
+            f"📡 Canal: {etapa} | Mirror: {mirror} | Mode: epoch | Backend: {pager.backend} | Subventana: "
+            f"{sub_start_local.strftime('%Y-%m-%d %H:%M')} -> {sub_end_local.strftime('%H:%M')} | "
+            f"target={target} | need_raw={need_raw}"
+        )
+
+        for page in range(settings.MAX_LOAD_MORE):
+            if att.cancel is not None and att.cancel.is_set():
+                col.stop_reason = att.cancel_reason
+                break
+
+            att.pages_used = page + 1
+            spans.page = page
+            pager.wait_between_pages()
+
+            items = pager.items()
+            if archive is not None and pager.last_html is not None:
+                if pager.accumulates:
+                    first = next((it["href"] for it in items if not it["show_more"]), None)
+                    if pending is not None and not (pending[2] == first and len(items) >= pending[3]):
+                        archive_page(pending[0], pending[1], True)
+                    pending = (page, pager.last_html, first, len(items))
+                else:
+                    archive_page(page, pager.last_html, False)
+
+            if settings.DEBUG and page == 0:
+                print(f"   🔎 timeline-item encontrados: {len(items)} | parser={pager.parser}")
+                if items:
+                    first = items[0]
+                    print("   🔎 first.tweet-content?", first["text"] is not None)
+                    print("   🔎 first.tweet-link?", first["href"] is not None)
+                    print("   🔎 first.tweet-date?", (first["title"] or first["datetime"]) is not None)
+                    print("   🕒 date.title:", first["title"])
+                    print("   🕒 date.datetime:", first["datetime"])
+
+            with spans.span("rows"):
+                col.consume(items)
+
+            if col.recolectados and not att.progressed:
+                att.progressed = True
+                if on_progress is not None:
+                    on_progress()
+
+            if col.done:
+                # (si el target se completó justo con el último item de la página, consume no lo marcó)
+                col.stop_reason = "meta_reached"
+                break
+
+            if settings.EARLY_STOP:
+                reason = col.early_stop(need_raw, settings.EARLY_STOP_PAST_FRACTION, settings.EARLY_STOP_PAST_PAGES,
+                                        settings.EARLY_STOP_MIN_YIELD, settings.EARLY_STOP_MIN_PAGES)
+                if reason is not None:
+                    col.stop_reason = reason
                     break
 
-            # window_log incremental (1 fila por intento mirror+subventana)
-            append_csv_rows(
-                path=window_log_path,
-                rows=[log_window_row(
-                    sub_start_local=sub_start_local,
-                    sub_end_local=sub_end_local,
-                    etapa=etapa,
-                    mirror=mirror,
-                    mode_used="epoch",
-                    requested_target=target,
-                    need_raw=need_raw,
-                    obtained_n=len(recolectados),
-                    pages_used=pages_used,
-                    items_seen=seen_items_total,
-                    dates_ok=dates_ok,
-                    dates_fail=dates_fail,
-                    outside_window=outside_window,
-                    no_link=no_link,
-                    no_content=no_content,
-                    stop_reason=stop_reason,
-                )],
-                write_header_if_new=write_header_if_new,
-            )
-
-            if len(recolectados) > 0:
-                print(f"   ✅ obtenido {len(recolectados)}/{target} | pages={pages_used} | stop={stop_reason}")
-            else:
-                if settings.DEBUG:
-                    print(
-                        f"   🧾 resumen mirror={mirror}: seen={seen_items_total}, dates_ok={dates_ok}, "
-                        f"dates_fail={dates_fail}, outside_window={outside_window}, no_link={no_link}, no_content={no_content}"
-                    )
+            if not pager.next_page():
+                # Sin "Load more" en una página que nunca estuvo lista: no es el fin real.
+                col.stop_reason = "page_timeout" if pager.timed_out else "no_more_pages"
+                break
+
+        # window_log incremental (1 fila por intento mirror+subventana)
+        window_row = log_window_row(
+            sub_start_local=sub_start_local,
+            sub_end_local=sub_end_local,
+            etapa=etapa,
+            mirror=mirror,
+            mode_used="epoch",
+            requested_target=target,
+            need_raw=need_raw,
+            obtained_n=len(col.recolectados),
+            pages_used=att.pages_used,
+            items_seen=col.seen_items_total,
+            dates_ok=col.dates_ok,
+            dates_fail=col.dates_fail,
+            outside_window=col.outside_window,
+            no_link=col.no_link,
+            no_content=col.no_content,
+            stop_reason=col.stop_reason,
+        )
+        with spans.span("log"):
+            append_csv_rows(path=window_log_path, rows=[window_row], write_header_if_new=write_header_if_new)
+        if on_window_row is not None:
+            on_window_row(window_row)
+
+        if len(col.recolectados) > 0:
+            print(f"   ✅ obtenido {len(col.recolectados)}/{target} | pages={att.pages_used} | stop={col.stop_reason}")
+        else:
+            if settings.DEBUG:
+                print(
+                    f"   🧾 resumen mirror={mirror}: seen={col.seen_items_total}, dates_ok={col.dates_ok}, "
+                    f"dates_fail={col.dates_fail}, outside_window={col.outside_window}, "
+                    f"no_link={col.no_link}, no_content={col.no_content}"
+                )
 
-        except Exception as e:
-            had_error = True
-            error_type = type(e).__name__
-            error_msg = _short_err(e)
+    except Exception as e:
+        att.had_error = True
+        att.error_type = type(e).__name__
+        att.error_msg = _short_err(e)
 
-            if settings.DEBUG:
-                print(f"   ⚠️ Error en mirror {mirror}: {e}")
+        if settings.DEBUG:
+            print(f"   ⚠️ Error en mirror {mirror}: {e}")
 
+        with spans.span("log"):
             append_csv_rows(
                 path=window_log_path,
                 rows=[log_window_row(
@@ -262,55 +394,348 @@ def extraer_subventana_epoch(
                     outside_window=0,
                     no_link=0,
                     no_content=0,
-                    stop_reason=f"error:{error_type}",
+                    stop_reason=f"error:{att.error_type}",
                 )],
                 write_header_if_new=write_header_if_new,
             )
 
-            time.sleep(random.uniform(*settings.SLEEP_BETWEEN_MIRRORS))
+        if att.cancel is None:
+            with spans.span("wait"):
+                _pause_between_mirrors(settings, rate_limiter)
+
+    finally:
+        if pending is not None:
+            archive_page(pending[0], pending[1], True)
+        att.t_total = time.time() - t0
+        spans.close("attempt", span_t0, pages=att.pages_used,
+                    stop=col.stop_reason if not att.had_error else f"error:{att.error_type}")
+
+    return att
+
+
+def _report_attempt(att: MirrorAttempt, telemetry, mirror_scheduler, sub_start_local, sub_end_local,
+                    etapa: str, target: int, need_raw: int,
+                    hedge_role: str = "", hedge_outcome: str = "") -> None:
+    col, had_error = att.col, att.had_error
+    ok = att.ok
+
+    telemetry.update_after_request(
+        channel=etapa,
+        mirror=att.mirror,
+        ok=ok,
+        obtained=len(col.recolectados) if not had_error else 0,
+        pages_used=att.pages_used,
+        t_total_sec=att.t_total,
+        had_error=had_error,
+    )
+    if mirror_scheduler is not None:
+        # Un perdedor cancelado cuenta como "empty": fue más lento que el otro mirror.
+        outcome = "error" if had_error else ("ok" if ok and hedge_outcome != "cancelled" else "empty")
+        mirror_scheduler.report(att.mirror, outcome, att.t_total)
+
+    telemetry.append_request_log({
+        "ts_utc": datetime.utcnow().isoformat(),
+        "window_id": sub_start_local.strftime("%Y-%m-%d %H:%M"),
+        "window_end": sub_end_local.strftime("%Y-%m-%d %H:%M"),
+        "channel": etapa,
+        "mirror": att.mirror,
+        "mode_used": "epoch",
+        "fetch_backend": att.backend,
+        "target": target,
+        "need_raw": need_raw,
+        "obtained": len(col.recolectados) if not had_error else 0,
+        "pages_used": att.pages_used,
+        "stop_reason": col.stop_reason if not had_error else f"error:{att.error_type}",
+        "items_seen": col.seen_items_total,
+        "dates_ok": col.dates_ok,
+        "dates_fail": col.dates_fail,
+        "outside_window": col.outside_window,
+        "no_link": col.no_link,
+        "no_content": col.no_content,
+        "t_total_sec": round(att.t_total, 3),
+        **(att.spans.row() if att.spans is not None else {}),
+        "had_error": int(had_error),
+        "error_type": att.error_type,
+        "error_msg": att.error_msg,
+        "hedge_role": hedge_role,
+        "hedge_outcome": hedge_outcome,
+    })
 
-        finally:
-            t_total = time.time() - t0
-            ok = (len(recolectados) > 0) and (not had_error)
-
-            telemetry.update_after_request(
-                channel=etapa,
-                mirror=mirror,
-                ok=ok,
-                obtained=len(recolectados) if not had_error else 0,
-                pages_used=pages_used,
-                t_total_sec=t_total,
-                had_error=had_error,
-            )
 
-            telemetry.append_request_log({
-                "ts_utc": datetime.utcnow().isoformat(),
-                "window_id": sub_start_local.strftime("%Y-%m-%d %H:%M"),
-                "window_end": sub_end_local.strftime("%Y-%m-%d %H:%M"),
-                "channel": etapa,
-                "mirror": mirror,
-                "mode_used": "epoch",
-                "target": target,
-                "need_raw": need_raw,
-                "obtained": len(recolectados) if not had_error else 0,
-                "pages_used": pages_used,
-                "stop_reason": stop_reason if not had_error else f"error:{error_type}",
-                "items_seen": seen_items_total,
-                "dates_ok": dates_ok,
-                "dates_fail": dates_fail,
-                "outside_window": outside_window,
-                "no_link": no_link,
-                "no_content": no_content,
-                "t_total_sec": round(t_total, 3),
-                "had_error": int(had_error),
-                "error_type": error_type,
-                "error_msg": error_msg,
-            })
+def extraer_subventana_epoch(
+    driver,
+    mirrors: list[str],
+    settings: Settings,
+    telemetry,
+    sub_start_local,
+    sub_end_local,
+    etapa: str,
+    target: int,
+    window_log_path: Path,
+    write_header_if_new: bool,
+    http_engine=None,
+    mirror_scheduler=None,
+    hedge_drivers: HedgeDriverPair | None = None,
+    rate_limiter=None,
+    spare_out: list[dict] | None = None,
+    on_window_row=None,
+    archive=None,
+    stop: threading.Event | None = None,
+    exclude_ids: frozenset[str] = frozenset(),
+) -> list[dict]:
+    """
+    Pide tweets usando since_time/until_time (epoch) para la subventana,
+    filtra por dt_tweet convertido a hora local (Bogotá) y recolecta hasta 'target'.
+    Con settings.FETCH_BACKEND == "http" y un http_engine, las páginas se piden por
+    HTTP directo; los mirrors con challenge JS caen al driver Selenium.
+    Con un mirror_scheduler (MirrorScheduler) los mirrors se prueban por salud
+    reciente y se saltan los de circuito abierto; sin él, orden aleatorio.
+    Con settings.HEDGE_ENABLED y hedge_drivers (HedgeDriverPair; reemplaza a 'driver'),
+    si el mirror no produce filas en HEDGE_AFTER_SEC se lanza el siguiente en
+    paralelo (driver libre del par o HTTP) y gana el primero en entregar.
+    Con un rate_limiter (MirrorRateLimiter) cada carga de página espera su token
+    por mirror y no hay pausas fijas entre páginas ni entre mirrors.
+    Con spare_out (planner de queries) se agregan ahí las filas de la ventana que
+    sobraron en las páginas ya bajadas por el intento ganador.
+    on_window_row: callback con cada fila de window_log de intentos terminados
+    (p.ej. DensityModel.observe_row para subventanas adaptativas).
+    archive: PageArchive opcional; guarda el HTML crudo de cada página (ver
+    src/scraping/replay.py para re-extraer sin navegador).
+    stop: evento de parada del pool (Ctrl + C); corta pausas y paginación del
+    intento en curso (stop_reason=interrupted) y no prueba más mirrors.
+    exclude_ids: status_id ya escritos (resume / top-up del planner); no cuentan
+    para el target, así el intento junta 'target' filas nuevas.
+    """
+    query_raw = QUERY_CORE[etapa]
+    qh = query_hash(query_raw)
+    path = build_search_path_epoch(query_raw, sub_start_local, sub_end_local)
 
-        if len(recolectados) > 0:
-            time.sleep(random.uniform(*settings.SLEEP_BETWEEN_MIRRORS))
-            return recolectados
+    if mirror_scheduler is not None:
+        mirrors_local = mirror_scheduler.order(mirrors)
+    else:
+        mirrors_local = mirrors[:]
+        random.shuffle(mirrors_local)
 
-        time.sleep(random.uniform(*settings.SLEEP_BETWEEN_MIRRORS))
+    need_raw = max(target * settings.OVERSAMPLE_FACTOR, target)
+
+    def new_attempt(mirror: str, cancellable: bool = False) -> MirrorAttempt:
+        col = SubwindowCollector(etapa, mirror, qh, sub_start_local, sub_end_local, target, debug=settings.DEBUG,
+                                 keep_spare=spare_out is not None, exclude_ids=exclude_ids)
+        if cancellable:
+            return MirrorAttempt(mirror=mirror, col=col, cancel=threading.Event())
+        return MirrorAttempt(mirror=mirror, col=col, cancel=stop, cancel_reason="interrupted")
+
+    def result(att: MirrorAttempt | None) -> list[dict]:
+        if att is None:
+            return []
+        if spare_out is not None:
+            spare_out.extend(att.col.sobrantes)
+        return att.col.recolectados
+
+    attempt_args = dict(path=path, settings=settings, sub_start_local=sub_start_local, sub_end_local=sub_end_local,
+                        etapa=etapa, target=target, need_raw=need_raw, window_log_path=window_log_path,
+                        write_header_if_new=write_header_if_new, http_engine=http_engine,
+                        rate_limiter=rate_limiter, on_window_row=on_window_row, archive=archive,
+                        on_request=telemetry.note_request_start)
+    report_args = dict(telemetry=telemetry, mirror_scheduler=mirror_scheduler, sub_start_local=sub_start_local,
+                       sub_end_local=sub_end_local, etapa=etapa, target=target, need_raw=need_raw)
+
+    if settings.HEDGE_ENABLED and hedge_drivers is not None:
+        return result(_extraer_hedged(hedge_drivers, mirrors_local, settings, http_engine,
+                                      new_attempt, attempt_args, report_args, stop=stop))
+
+    for mirror in mirrors_local:
+        if stop is not None and stop.is_set():
+            break
+        att = _run_mirror_attempt(new_attempt(mirror), driver, **attempt_args)
+        _report_attempt(att, **report_args)
+
+        if len(att.col.recolectados) > 0:
+            _pause_between_mirrors(settings, rate_limiter)
+            return result(att)
+
+        _pause_between_mirrors(settings, rate_limiter)
 
     return []
+
+
+class HedgeDriverPair:
+    """
+    Los 2 drivers de un worker en modo hedging (principal + extra).
+    El perdedor de una carrera se cancela pero termina su carga en curso en
+    segundo plano: su driver queda ocupado hasta entonces y la siguiente
+    subventana usa el que esté libre (nunca 2 hilos sobre el mismo driver).
+    """
+    def __init__(self, driver, hedge_driver):
+        self._free = [d for d in (driver, hedge_driver) if d is not None]
+        self._busy = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, block: bool = True):
+        with self._cond:
+            while not self._free:
+                if not block:
+                    return None
+                self._cond.wait()
+            self._busy += 1
+            return self._free.pop(0)
+
+    def release(self, driver) -> None:
+        with self._cond:
+            self._free.append(driver)
+            self._busy -= 1
+            self._cond.notify_all()
+
+    def hold(self) -> None:
+        """Trabajo en segundo plano sin driver (p.ej. reporte del perdedor) que wait_idle debe esperar."""
+        with self._cond:
+            self._busy += 1
+
+    def unhold(self) -> None:
+        with self._cond:
+            self._busy -= 1
+            self._cond.notify_all()
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self._busy == 0, timeout=timeout)
+
+
+def _start_attempt(att: MirrorAttempt, pair: HedgeDriverPair, driver, changed: threading.Event,
+                   attempt_args: dict) -> threading.Event:
+    """
+    Corre el intento en un hilo daemon; libera el driver y avisa por 'changed' al terminar.
+    Sin driver (HttpPager) el hilo se cuenta con hold()/unhold() para que wait_idle lo espere.
+    """
+    done = threading.Event()
+    if driver is None:
+        pair.hold()
+
+    def run():
+        try:
+            _run_mirror_attempt(att, driver, on_progress=changed.set, **attempt_args)
+        finally:
+            if driver is not None:
+                pair.release(driver)
+            else:
+                pair.unhold()
+            done.set()
+            changed.set()
+
+    threading.Thread(target=run, name=f"sismografo-hedge-{att.mirror}", daemon=True).start()
+    return done
+
+
+def _uses_http(settings: Settings, http_engine, mirror: str) -> bool:
+    """True si build_pager va a devolver un HttpPager para 'mirror' (el intento no ocupa driver)."""
+    return (settings.FETCH_BACKEND == "http" and http_engine is not None
+            and not http_engine.requires_browser(mirror))
+
+
+def _interrupt(stop: threading.Event | None, *atts: MirrorAttempt) -> bool:
+    """Con el pool detenido (stop), cancela los intentos en carrera; True si hay que parar."""
+    if stop is None or not stop.is_set():
+        return False
+    for att in atts:
+        if not att.cancel.is_set():
+            att.cancel_reason = "interrupted"
+            att.cancel.set()
+    return True
+
+
+def _extraer_hedged(pair: HedgeDriverPair, mirrors_local: list[str], settings: Settings, http_engine,
+                    new_attempt, attempt_args: dict, report_args: dict,
+                    stop: threading.Event | None = None) -> MirrorAttempt | None:
+    """
+    Hedging: el mirror primario corre en un hilo; si en HEDGE_AFTER_SEC no produjo
+    filas dentro de la ventana, el siguiente mirror arranca en paralelo.
+    Gana el primero que entrega filas; el otro se cancela y se reporta solo cuando
+    termina (no se lo espera: eso es lo que recorta la cola de latencia).
+    Devuelve el intento ganador (None si ningún mirror entregó filas).
+    Con 'stop' activado, cancela los intentos en curso y no lanza más mirrors.
+    """
+    telemetry = report_args["telemetry"]
+    pending = list(mirrors_local)
+
+    while pending and not (stop is not None and stop.is_set()):
+        changed = threading.Event()
+        primary = new_attempt(pending.pop(0), cancellable=True)
+        # Con backend HTTP no se espera un driver libre (puede tenerlo un perdedor anterior).
+        primary_drv = None if _uses_http(settings, http_engine, primary.mirror) else pair.acquire(block=True)
+        done_p = _start_attempt(primary, pair, primary_drv, changed, attempt_args)
+
+        # Espera progreso del primario hasta el deadline
+        deadline = time.monotonic() + float(settings.HEDGE_AFTER_SEC)
+        while not (primary.progressed or done_p.is_set()):
+            left = deadline - time.monotonic()
+            if left <= 0 or _interrupt(stop, primary):
+                break
+            changed.wait(min(left, 1.0))
+            changed.clear()
+
+        hedge_drv = None
+        can_hedge = bool(pending) and not (primary.progressed or done_p.is_set() or _interrupt(stop, primary))
+        if can_hedge and not _uses_http(settings, http_engine, pending[0]):
+            hedge_drv = pair.acquire(block=False)
+            can_hedge = hedge_drv is not None
+
+        if not can_hedge:
+            done_p.wait()
+            _report_attempt(primary, **report_args)
+            _pause_between_mirrors(settings, attempt_args["rate_limiter"])
+            if primary.col.recolectados:
+                return primary
+            continue
+
+        hedge = new_attempt(pending.pop(0), cancellable=True)
+        print(f"   🏁 Hedge: {primary.mirror} sin filas en {settings.HEDGE_AFTER_SEC:.0f}s -> "
+              f"lanzando {hedge.mirror} en paralelo")
+        telemetry.add_hedge_started()
+        done_h = _start_attempt(hedge, pair, hedge_drv, changed, attempt_args)
+
+        racers = ((primary, done_p, "primary"), (hedge, done_h, "hedge"))
+        winner = None
+        while True:
+            changed.clear()
+            for att, done, _ in racers:
+                if att.progressed or (done.is_set() and att.col.recolectados):
+                    winner = att
+                    break
+            if winner is not None or (done_p.is_set() and done_h.is_set()):
+                break
+            _interrupt(stop, primary, hedge)
+            changed.wait(1.0)
+
+        if winner is None:
+            for att, _, role in racers:
+                _report_attempt(att, hedge_role=role, hedge_outcome="failed", **report_args)
+            _pause_between_mirrors(settings, attempt_args["rate_limiter"])
+            continue
+
+        for att, done, role in racers:
+            if att is winner:
+                continue
+            att.cancel.set()
+            # El perdedor se reporta cuando su hilo termine (puede seguir en una carga).
+            def report_loser(a=att, d=done, r=role):
+                try:
+                    d.wait()
+                    outcome = "cancelled" if a.col.stop_reason == "hedge_cancelled" else "lost"
+                    _report_attempt(a, hedge_role=r, hedge_outcome=outcome, **report_args)
+                finally:
+                    pair.unhold()
+
+            pair.hold()
+            threading.Thread(target=report_loser, daemon=True).start()
+
+        winner_done = done_p if winner is primary else done_h
+        winner_done.wait()
+        _report_attempt(winner, hedge_role="primary" if winner is primary else "hedge", hedge_outcome="won",
+                        **report_args)
+        if winner is hedge:
+            telemetry.add_hedge_win()
+        print(f"   🏆 Hedge: gana {winner.mirror} ({'hedge' if winner is hedge else 'primario'})")
+        _pause_between_mirrors(settings, attempt_args["rate_limiter"])
+        return winner
+
+    return None
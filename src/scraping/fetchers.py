@@ -0,0 +1,505 @@
+# src/scraping/fetchers.py
+# ============================================================
+# BACKENDS DE FETCH: Selenium (Chrome) o HTTP asyncio (aiohttp)
+# ============================================================
+# Nota:
+# - Las páginas de búsqueda de Nitter/XCancel son HTML server-rendered:
+#   con HTTP directo no hace falta un Chrome por request.
+# - El engine HTTP corre un event loop asyncio en un hilo propio, con una
+#   ClientSession (pool keep-alive) por mirror y un semáforo global que
+#   acota las requests en vuelo. Los workers (threads) lo usan vía fetch().
+# - Si un mirror responde con un challenge JS, se marca y se sirve con
+#   Selenium (fallback) el resto de la corrida.
+# ============================================================
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Callable
+
+from src.config.settings import Settings
+from src.scraping.parsers import ParsedPage, parse_timeline_page, resolve_backend
+from src.utils.spans import NULL_SPANS
+
+
+# Marcadores típicos de páginas anti-bot que requieren ejecutar JS.
+JS_CHALLENGE_MARKERS: tuple[str, ...] = (
+    "cf-challenge",
+    "challenge-platform",
+    "just a moment...",
+    "verifying your browser",
+    "anubis",
+    "enable javascript",
+)
+
+# Páginas de "rate limited" de Nitter/XCancel (panel de error, sin timeline-item).
+RATE_LIMIT_MARKERS: tuple[str, ...] = (
+    "rate limited",
+    "rate limit exceeded",
+    "too many requests",
+)
+
+
+# Extracción en el navegador (EXTRACTION_MODE="js"): devuelve solo los
+# timeline-item aún no vistos (se marcan con data-tda-seen) como dicts con
+# la misma forma que src/scraping/parsers.py, más el href del siguiente cursor.
+# Replica la semántica de get_text de bs4: textos recortados y unidos.
+JS_EXTRACT_ITEMS = r"""
+const strings = (node) => {
+  const out = [];
+  const w = document.createTreeWalker(node, NodeFilter.SHOW_TEXT);
+  while (w.nextNode()) out.push(w.currentNode.nodeValue);
+  return out;
+};
+const joinStripped = (node, sep) => strings(node).map(s => s.trim()).filter(s => s.length > 0).join(sep);
+const items = [];
+for (const el of document.querySelectorAll("div.timeline-item:not([data-tda-seen])")) {
+  el.setAttribute("data-tda-seen", "1");
+  const it = {show_more: el.classList.contains("show-more"), href: null, title: null, datetime: null,
+              text: null, links: [], username: "", stats: []};
+  if (!it.show_more) {
+    const link = el.querySelector("a.tweet-link");
+    if (link) it.href = link.getAttribute("href");
+    const td = el.querySelector("span.tweet-date");
+    const a = td ? td.querySelector("a") : null;
+    if (a) { it.title = a.getAttribute("title"); it.datetime = a.getAttribute("datetime"); }
+    const content = el.querySelector("div.tweet-content");
+    if (content) {
+      it.text = joinStripped(content, " ");
+      it.links = Array.from(content.querySelectorAll("a"), x => x.textContent);
+    }
+    const user = el.querySelector("a.username");
+    if (user) it.username = joinStripped(user, "");
+    it.stats = Array.from(el.querySelectorAll("span.tweet-stat"), x => joinStripped(x, ""));
+  }
+  items.push(it);
+}
+let cursor = null;
+for (const a of document.querySelectorAll("div.show-more a")) {
+  const h = a.getAttribute("href");
+  if (h && h.includes("cursor=")) cursor = h;
+}
+return {items: items, next_cursor: cursor};
+"""
+
+# Sonda de "página lista" (SeleniumPager._wait_ready). arguments[0] es la marca
+# puesta antes de un click: si ya no está, el click navegó a un documento nuevo.
+JS_PAGE_READY = r"""
+const d = document, root = d.documentElement;
+return {
+  state: d.readyState,
+  n: d.querySelectorAll("div.timeline-item:not(.show-more)").length,
+  none: !!d.querySelector(".timeline-none, .timeline-end"),
+  error: !!d.querySelector(".error-panel"),
+  fresh: !arguments[0] || !root || root.dataset.tdaMark !== arguments[0],
+};
+"""
+
+JS_MARK_DOCUMENT = "document.documentElement.dataset.tdaMark = arguments[0];"
+
+
+class JsChallengeRequired(Exception):
+    """El mirror exige un challenge JS: hay que servirlo con Selenium."""
+
+
+class HttpStatusError(Exception):
+    """Respuesta HTTP no exitosa (4xx/5xx) sin challenge JS."""
+
+
+class RateLimited(HttpStatusError):
+    """El mirror respondió 429 o un panel de rate limit."""
+
+
+@dataclass
+class HttpPage:
+    url: str
+    status: int
+    html: str
+    elapsed_sec: float
+
+
+def _pause(bounds: tuple[float, float], cancel: threading.Event | None = None) -> None:
+    """Pausa aleatoria; con 'cancel' (hedging) se corta en cuanto se cancela el intento."""
+    sec = random.uniform(*bounds)
+    if cancel is None:
+        time.sleep(sec)
+    else:
+        cancel.wait(sec)
+
+
+def looks_like_rate_limited(status: int, html: str) -> bool:
+    if status == 429:
+        return True
+    head = html[:20000].lower()
+    if "timeline-item" in head:
+        return False
+    return any(m in head for m in RATE_LIMIT_MARKERS)
+
+
+def looks_like_js_challenge(status: int, html: str) -> bool:
+    head = html[:20000].lower()
+    if "timeline-item" in head or 'class="timeline' in head:
+        return False
+    if status in (403, 503) or len(html) < 20000:
+        return any(m in head for m in JS_CHALLENGE_MARKERS)
+    return False
+
+
+class HttpFetchEngine:
+    """
+    Cliente HTTP asyncio con pools por mirror, keep-alive y concurrencia acotada.
+    Thread-safe: fetch() se puede llamar desde cualquier worker.
+    """
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._sem: asyncio.Semaphore | None = None
+        self._sessions: dict = {}
+        self._browser_only: set[str] = set(settings.HTTP_BROWSER_ONLY_MIRRORS)
+        self._lock = threading.Lock()
+
+    def start(self) -> "HttpFetchEngine":
+        # asyncio/aiohttp se importan aquí: el modo selenium no paga su import.
+        import asyncio
+
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("FETCH_BACKEND='http' requiere aiohttp (pip install aiohttp)") from e
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="sismografo-http", daemon=True)
+        self._thread.start()
+        self._sem = self._run(self._make_semaphore())
+        return self
+
+    def _run(self, coro):
+        import asyncio
+
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _make_semaphore(self) -> asyncio.Semaphore:
+        import asyncio
+
+        return asyncio.Semaphore(max(1, int(self.settings.HTTP_MAX_IN_FLIGHT)))
+
+    def _session_for(self, mirror: str):
+        # Solo se llama desde el hilo del loop: no hace falta lock.
+        import aiohttp
+
+        session = self._sessions.get(mirror)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=max(1, int(self.settings.HTTP_POOL_PER_MIRROR)),
+                keepalive_timeout=60.0,
+                ttl_dns_cache=300,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.settings.HTTP_TIMEOUT_SEC),
+                headers={
+                    "User-Agent": self.settings.HTTP_USER_AGENT,
+                    "Accept": "text/html,application/xhtml+xml",
+                    "Accept-Language": "es-CO,es;q=0.9,en;q=0.8",
+                },
+            )
+            self._sessions[mirror] = session
+        return session
+
+    async def fetch_async(self, mirror: str, url: str) -> HttpPage:
+        session = self._session_for(mirror)
+        async with self._sem:
+            t0 = time.perf_counter()
+            async with session.get(url, allow_redirects=True) as resp:
+                html = await resp.text(errors="replace")
+                return HttpPage(url=str(resp.url), status=resp.status, html=html,
+                                elapsed_sec=time.perf_counter() - t0)
+
+    def fetch(self, mirror: str, url: str) -> HttpPage:
+        if self._loop is None:
+            raise RuntimeError("HttpFetchEngine no iniciado (llamar start())")
+        return self._run(self.fetch_async(mirror, url))
+
+    def requires_browser(self, mirror: str) -> bool:
+        with self._lock:
+            return mirror in self._browser_only
+
+    def mark_requires_browser(self, mirror: str) -> None:
+        with self._lock:
+            self._browser_only.add(mirror)
+
+    async def _close_sessions(self) -> None:
+        for s in list(self._sessions.values()):
+            await s.close()
+        self._sessions.clear()
+
+    def close(self) -> None:
+        if self._loop is None:
+            return
+        try:
+            self._run(self._close_sessions())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if self._thread is not None:
+                self._thread.join(timeout=5.0)
+            self._loop.close()
+            self._loop = None
+
+
+class SeleniumPager:
+    """
+    Paginación vía Chrome, según settings.PAGINATION_MODE:
+    - "click": click en "Load more"; items() devuelve TODOS los timeline-item acumulados.
+    - "cursor": driver.get del href cursor=; items() devuelve solo la página actual.
+    items() devuelve dicts crudos (src/scraping/parsers.py):
+    - EXTRACTION_MODE="page_source": se transfiere el DOM y se parsea con PARSER_BACKEND.
+    - EXTRACTION_MODE="js": un execute_script devuelve JSON compacto solo de los items
+      no vistos (en modo click no se re-transfieren las páginas anteriores).
+    cancel: threading.Event opcional (hedging / parada del pool) que corta las pausas;
+    una carga cancelada no se lanza (el intento lo ve en su chequeo de cancel).
+    limiter: MirrorRateLimiter opcional (PACING_MODE="adaptive"): cada carga pide
+    un token y items() le devuelve el feedback; sin limiter, pausas fijas entre páginas.
+    Tras cada get/click se espera a que la página esté lista (JS_PAGE_READY) hasta
+    PAGE_READY_TIMEOUT_SEC; timed_out indica que la última carga no llegó a estarlo.
+    last_html: HTML parseado en el último items() (None con EXTRACTION_MODE="js");
+    accumulates: en modo click ese HTML es el DOM acumulado de todas las páginas.
+    spans: SpanTimer del intento (src/utils/spans.py) para los tiempos por etapa.
+    on_request: callback opcional justo antes de cada get/click (p.ej.
+    Telemetry.note_request_start para time_to_first_request_sec).
+    """
+    backend = "selenium"
+
+    def __init__(self, driver, settings: Settings, mirror: str = "", limiter=None):
+        self.driver = driver
+        self.settings = settings
+        self.mirror = mirror
+        self.limiter = limiter
+        self.js_extraction = settings.EXTRACTION_MODE == "js"
+        self.parser = "js" if self.js_extraction else resolve_backend(settings.PARSER_BACKEND)
+        self._page: ParsedPage | None = None
+        self.cancel: threading.Event | None = None
+        self._latency: float | None = None
+        self._n_prev = 0
+        self._marks = 0
+        self.timed_out = False
+        self.last_html: str | None = None
+        self.accumulates = settings.PAGINATION_MODE == "click" and not self.js_extraction
+        self.spans = NULL_SPANS
+        self.on_request: Callable[[], None] | None = None
+
+    def _probe(self, mark: str | None) -> dict | None:
+        try:
+            res = self.driver.execute_script(JS_PAGE_READY, mark)
+        except Exception:
+            return None
+        return res if isinstance(res, dict) else None
+
+    def _wait_ready(self, mark: str | None = None, n_before: int | None = None) -> None:
+        """
+        Espera a que la carga esté lista:
+        - documento nuevo (get, o click que navegó): readyState "complete", items, o marcador.
+        - mismo documento (click que agrega items): cambia el número de timeline-item.
+        "No items found" / fin de timeline / panel de error cuentan como listos.
+        Sin sonda disponible (driver sin JS) se asume lista.
+        """
+        deadline = time.monotonic() + self.settings.PAGE_READY_TIMEOUT_SEC
+        self.timed_out = False
+        while True:
+            st = self._probe(mark)
+            if st is None:
+                return
+            if st.get("none") or st.get("error"):
+                return
+            if st.get("fresh", True):
+                if st.get("state") == "complete" or (st.get("state") == "interactive" and st.get("n", 0) > 0):
+                    return
+            elif n_before is not None and st.get("n", 0) != n_before:
+                return
+            if time.monotonic() >= deadline:
+                self.timed_out = True
+                print(f"   ⏳ Página no lista en {self.settings.PAGE_READY_TIMEOUT_SEC:.0f}s ({self.mirror or 'selenium'})")
+                return
+            if self.cancel is None:
+                time.sleep(self.settings.PAGE_READY_POLL_SEC)
+            elif self.cancel.wait(self.settings.PAGE_READY_POLL_SEC):
+                return
+
+    def _request(self, fn, mark: str | None = None, n_before: int | None = None) -> None:
+        if self.limiter is not None:
+            with self.spans.span("wait"):
+                self.limiter.acquire(self.mirror, self.cancel)
+        if self.cancel is not None and self.cancel.is_set():
+            return  # acquire salió sin token: no se pega al mirror
+        if self.on_request is not None:
+            self.on_request()
+        t0 = time.perf_counter()
+        try:
+            with self.spans.span("fetch"):
+                fn()
+            with self.spans.span("ready"):
+                self._wait_ready(mark, n_before)
+        except Exception:
+            if self.limiter is not None:
+                self.limiter.feedback(self.mirror, "error")
+            raise
+        self._latency = time.perf_counter() - t0
+        note_page = getattr(self.driver, "note_page", None)  # LazyDriver: cuenta para reciclar
+        if note_page is not None:
+            note_page(self._latency)
+
+    def open(self, url: str) -> None:
+        self._request(lambda: self.driver.get(url))
+
+    def wait_between_pages(self) -> None:
+        if self.limiter is None:
+            with self.spans.span("wait"):
+                _pause(self.settings.SLEEP_BETWEEN_PAGES, self.cancel)
+
+    def items(self) -> list[dict]:
+        html = None
+        if self.js_extraction:
+            with self.spans.span("source"):
+                res = self.driver.execute_script(JS_EXTRACT_ITEMS) or {}
+            self._page = ParsedPage(items=res.get("items") or [], next_cursor=res.get("next_cursor"))
+        else:
+            with self.spans.span("source"):
+                html = self.driver.page_source
+            with self.spans.span("parse"):
+                self._page = parse_timeline_page(html, self.parser)
+        self.last_html = html
+
+        # Items nuevos de esta carga (en modo click+page_source items() trae los acumulados).
+        n_new = len(self._page.items) - (self._n_prev if self.accumulates else 0)
+        self._n_prev = len(self._page.items)
+
+        if n_new <= 0:
+            if html is None:
+                with self.spans.span("source"):
+                    html = self.driver.page_source
+            if looks_like_rate_limited(200, html):
+                if self.limiter is not None:
+                    self.limiter.feedback(self.mirror, "rate_limited")
+                raise RateLimited(f"rate limit en {self.mirror or self.driver.current_url}")
+        if self.limiter is not None:
+            self.limiter.feedback(self.mirror, "ok" if n_new > 0 else "empty", self._latency)
+        return self._page.items
+
+    def next_page(self) -> bool:
+        if self.settings.PAGINATION_MODE == "cursor":
+            return self._next_page_cursor()
+        from selenium.webdriver.common.by import By
+
+        try:
+            btn = self.driver.find_element(By.PARTIAL_LINK_TEXT, "Load more")
+            self.driver.execute_script("arguments[0].scrollIntoView();", btn)
+        except Exception:
+            return False
+        # Marca el documento actual: si tras el click sigue ahí, se espera a que crezca el timeline.
+        self._marks += 1
+        mark = f"m{id(self)}-{self._marks}"
+        try:
+            self.driver.execute_script(JS_MARK_DOCUMENT, mark)
+            n_before = (self._probe(mark) or {}).get("n")
+        except Exception:
+            mark, n_before = None, None
+        try:
+            self._request(btn.click, mark=mark, n_before=n_before)
+            return True
+        except Exception:
+            return False
+
+    def _next_page_cursor(self) -> bool:
+        href = self._page.next_cursor if self._page is not None else None
+        if not href:
+            return False
+        self._request(lambda: self.driver.get(urllib.parse.urljoin(self.driver.current_url, href)))
+        return True
+
+
+class HttpPager:
+    """
+    Paginación vía HTTP directo: cada página se pide por su URL (cursor=).
+    items() devuelve solo los items (dicts crudos) de la página actual;
+    last_html es el HTML de esa página. spans: como en SeleniumPager.
+    """
+    backend = "http"
+    accumulates = False
+
+    def __init__(self, engine: HttpFetchEngine, mirror: str, settings: Settings, limiter=None):
+        self.engine = engine
+        self.mirror = mirror
+        self.settings = settings
+        self.limiter = limiter
+        self.parser = resolve_backend(settings.PARSER_BACKEND)
+        self._page: ParsedPage | None = None
+        self._url = ""
+        self.cancel: threading.Event | None = None
+        self._latency: float | None = None
+        self.timed_out = False  # (sin espera de DOM; el timeout es el del engine)
+        self.last_html: str | None = None
+        self.spans = NULL_SPANS
+        self.on_request: Callable[[], None] | None = None
+
+    def _load(self, url: str) -> None:
+        if self.limiter is not None:
+            with self.spans.span("wait"):
+                self.limiter.acquire(self.mirror, self.cancel)
+        if self.cancel is not None and self.cancel.is_set():
+            return  # acquire salió sin token: no se pega al mirror
+        if self.on_request is not None:
+            self.on_request()
+        try:
+            with self.spans.span("fetch"):
+                page = self.engine.fetch(self.mirror, url)
+        except Exception:
+            if self.limiter is not None:
+                self.limiter.feedback(self.mirror, "error")
+            raise
+        self._latency = page.elapsed_sec
+        if looks_like_js_challenge(page.status, page.html):
+            raise JsChallengeRequired(f"HTTP {page.status} challenge en {self.mirror}")
+        if looks_like_rate_limited(page.status, page.html):
+            if self.limiter is not None:
+                self.limiter.feedback(self.mirror, "rate_limited")
+            raise RateLimited(f"HTTP {page.status} rate limit en {url}")
+        if page.status >= 400:
+            if self.limiter is not None:
+                self.limiter.feedback(self.mirror, "error")
+            raise HttpStatusError(f"HTTP {page.status} en {url}")
+        self._url = page.url
+        self.last_html = page.html
+        with self.spans.span("parse"):
+            self._page = parse_timeline_page(page.html, self.parser)
+        if self.limiter is not None:
+            self.limiter.feedback(self.mirror, "ok" if self._page.items else "empty", self._latency)
+
+    def open(self, url: str) -> None:
+        self._load(url)
+
+    def wait_between_pages(self) -> None:
+        if self.limiter is None:
+            with self.spans.span("wait"):
+                _pause(self.settings.HTTP_SLEEP_BETWEEN_PAGES, self.cancel)
+
+    def items(self) -> list[dict]:
+        return self._page.items if self._page is not None else []
+
+    def next_page(self) -> bool:
+        href = self._page.next_cursor if self._page is not None else None
+        if not href:
+            return False
+        self._load(urllib.parse.urljoin(self._url, href))
+        return True
+
+
+def build_pager(driver, mirror: str, settings: Settings, http_engine: HttpFetchEngine | None = None,
+                limiter=None):
+    """Elige backend por mirror: HTTP si está activo y el mirror no exige JS; si no, Selenium."""
+    if settings.FETCH_BACKEND == "http" and http_engine is not None and not http_engine.requires_browser(mirror):
+        return HttpPager(http_engine, mirror, settings, limiter=limiter)
+    return SeleniumPager(driver, settings, mirror=mirror, limiter=limiter)
@@ -1,18 +1,36 @@
 # src/scraping/orchestrator.py
 # ============================================================
 # ORQUESTADOR: por día -> por hora -> por subventana 10 min
+# (serial con 1 driver, o pool de N drivers vía Settings.WORKERS)
 # ============================================================
 
 from __future__ import annotations
 
+import queue
 import random
+import threading
 import time
-from datetime import datetime, timedelta
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Callable, Iterator
 
 from src.config.settings import Settings
-from src.queries.query_core import CHANNELS
-from src.utils.logging import print_block_dashboard, append_csv_rows, Heartbeat
-from src.scraping.extractor import extraer_subventana_epoch
+from src.queries.mirrors import MirrorScheduler
+from src.queries.planner import QueryPlan, SourcePool, plan_queries
+from src.queries.query_core import CHANNELS, QUERY_CORE
+from src.utils.archive import PageArchive
+from src.utils.dataset_parquet import append_parquet_rows, require_pyarrow
+from src.utils.dedup import StatusIdIndex
+from src.utils.ledger import ProgressLedger
+from src.utils.logging import (
+    _short_err, print_block_dashboard, append_csv_rows, run_write_job, log_window_row, Heartbeat,
+)
+from src.scraping.browser import LazyDriver, build_driver
+from src.scraping.extractor import HedgeDriverPair, extraer_subventana_epoch, query_hash
+from src.scraping.fetchers import HttpFetchEngine
+from src.scraping.ratelimit import MirrorRateLimiter
+from src.scraping.subwindows import DensityModel
 
 
 def is_weekend_local(d: datetime) -> bool:
@@ -80,38 +98,135 @@ def allocate_targets_for_day_by_hour(total_per_day: int, is_weekend: bool) -> li
 
 
 class IncrementalWriter:
-    def __init__(self, dataset_path, flush_every: int, write_header_if_new: bool, telemetry):
+    """
+    Buffer del dataset con flush cada 'flush_every' filas.
+    Thread-safe: los workers del pool hacen append en paralelo.
+    on_flushed: callbacks que corren cuando esas filas ya están en disco, con las
+    filas del lote que sobrevivieron al dedup (p.ej. ProgressLedger.record).
+    dedup: StatusIdIndex opcional; se consulta antes de bufferizar y los ids se
+    confirman en el índice después del flush (o se liberan si el flush falla).
+    dataset_format: "csv" (append a dataset_path) o "parquet" (dataset_path es el
+    directorio raíz particionado day=/query_type=, ver src/utils/dataset_parquet.py).
+    """
+    def __init__(self, dataset_path, flush_every: int, write_header_if_new: bool, telemetry,
+                 dedup: StatusIdIndex | None = None, record_membership: bool = True,
+                 dataset_format: str = "csv", parquet_compression: str = "zstd"):
+        if dataset_format not in ("csv", "parquet"):
+            raise ValueError(f"DATASET_FORMAT desconocido: {dataset_format!r} (opciones: csv, parquet)")
+        if dataset_format == "parquet":
+            require_pyarrow()
         self.dataset_path = dataset_path
+        self.dataset_format = dataset_format
+        self.parquet_compression = parquet_compression
         self.flush_every = flush_every
         self.write_header_if_new = write_header_if_new
         self.telemetry = telemetry
+        self.dedup = dedup
+        self.record_membership = record_membership
         self.buffer: list[dict] = []
-
-    def append_rows(self, rows: list[dict]) -> None:
-        self.buffer.extend(rows)
-        if len(self.buffer) >= self.flush_every:
-            self.flush()
+        self._on_flushed: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def append_rows(self, rows: list[dict],
+                    on_flushed: Callable[[list[dict]], None] | None = None) -> list[dict]:
+        """Bufferiza el lote; devuelve las filas que se van a escribir (sin duplicados del dedup)."""
+        with self._lock:
+            if self.dedup is not None and rows:
+                rows, dups = self.dedup.reserve(rows)
+                if dups:
+                    if self.record_membership:
+                        self.dedup.record_memberships(dups)
+                    self.telemetry.add_rows_deduped(len(dups))
+            self.buffer.extend(rows)
+            if on_flushed is not None:
+                self._on_flushed.append(partial(on_flushed, rows))
+            if len(self.buffer) >= self.flush_every:
+                self._flush_locked()
+        return rows
 
     def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
         if not self.buffer:
+            if self._on_flushed:
+                # Lotes que el dedup dejó vacíos: nada que escribir, pero su unidad se registra
+                # (por la misma cola, después de lo ya encolado).
+                callbacks, self._on_flushed = self._on_flushed, []
+                run_write_job(lambda: None, on_written=partial(self._run_callbacks, callbacks))
             return
-        append_csv_rows(self.dataset_path, self.buffer, write_header_if_new=self.write_header_if_new)
-        self.telemetry.add_rows_written(len(self.buffer))
-        print(f"💾 Flush dataset: +{len(self.buffer)} filas -> {self.dataset_path}")
-        self.buffer = []
-
-
-def run_study(driver, mirrors: list[str], settings: Settings, telemetry,
-              start_study: datetime, end_study: datetime) -> IncrementalWriter:
-    writer = IncrementalWriter(
-        dataset_path=settings.DATASET_PATH,
-        flush_every=settings.FLUSH_EVERY_N_ROWS,
-        write_header_if_new=settings.WRITE_HEADER_IF_NEW,
-        telemetry=telemetry,
-    )
-
-    hb = Heartbeat(every_sec=30.0)
-
+        rows, self.buffer = self.buffer, []
+        callbacks, self._on_flushed = self._on_flushed, []
+        done = partial(self._after_write, rows, callbacks)
+        failed = partial(self._after_failed, rows)
+
+        # Con el writer de fondo activo esto solo encola; 'done' corre cuando las filas están en disco.
+        if self.dataset_format == "parquet":
+            run_write_job(partial(append_parquet_rows, self.dataset_path, rows,
+                                  compression=self.parquet_compression), on_written=done, on_failed=failed)
+        else:
+            append_csv_rows(self.dataset_path, rows, write_header_if_new=self.write_header_if_new,
+                            on_written=done, on_failed=failed)
+
+    def _after_write(self, rows: list[dict], callbacks: list[Callable[[], None]]) -> None:
+        if self.dedup is not None:
+            self.dedup.commit(rows)
+        self.telemetry.add_rows_written(len(rows))
+        print(f"💾 Flush dataset: +{len(rows)} filas -> {self.dataset_path}")
+        self._run_callbacks(callbacks)
+
+    def _after_failed(self, rows: list[dict]) -> None:
+        # Filas que no llegaron a disco: sin commit ni ledger (el resume reintenta la unidad)
+        # y sus ids dejan de estar reservados en el dedup.
+        if self.dedup is not None:
+            self.dedup.release(rows)
+        print(f"   ⚠️ Flush dataset fallido: {len(rows)} filas sin escribir")
+
+    @staticmethod
+    def _run_callbacks(callbacks: list[Callable[[], None]]) -> None:
+        for cb in callbacks:
+            try:
+                cb()
+            except Exception as e:
+                print(f"   ⚠️ Error post-flush (ledger): {_short_err(e)}")
+
+
+@dataclass(frozen=True)
+class SubwindowTask:
+    """Unidad de trabajo: 1 subventana x 1 canal."""
+    sub_start: datetime
+    sub_end: datetime
+    etapa: str
+    target: int
+    # Resume: status_id ya escritos para esta unidad (reintento de una unidad "short")
+    exclude_ids: frozenset[str] = frozenset()
+    # Resume: reintento de una unidad "failed"/"short" del ledger (suma a su fila)
+    resumed: bool = False
+    # Planner de queries: canales fuente de los que se deriva esta unidad (vacío = query remota)
+    derive_from: tuple[str, ...] = ()
+    # Planner de queries: la unidad es fuente; publica también sus filas sobrantes
+    collect_spare: bool = False
+
+    @property
+    def unit_key(self) -> tuple[str, str, str]:
+        """Clave (window_id, window_end, canal), mismo formato que window_log/request_log."""
+        return (self.sub_start.strftime("%Y-%m-%d %H:%M"), self.sub_end.strftime("%Y-%m-%d %H:%M"), self.etapa)
+
+
+def iter_subwindow_tasks(settings: Settings, start_study: datetime, end_study: datetime,
+                         hb: Heartbeat | None = None,
+                         channels: list[str] | None = None,
+                         density: DensityModel | None = None) -> Iterator[SubwindowTask]:
+    """
+    Recorre día -> hora -> canal -> subventana (mismo orden que el modo serial)
+    y emite las tareas con target > 0. Imprime los encabezados de día/hora/canal.
+    channels: orden de canales dentro de la hora (default CHANNELS).
+    density: con SUBWINDOW_MODE="adaptive", fusiona/bisecta la grilla de la hora
+    según la densidad observada (la suma de targets de la hora se conserva).
+    El primer día arranca en la hora de start_study (truncada), no a medianoche.
+    """
+    first_hour = start_study.replace(minute=0, second=0, microsecond=0)
     day_cursor = start_study
     while day_cursor < end_study:
         day_start = day_cursor.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -127,9 +242,10 @@ def run_study(driver, mirrors: list[str], settings: Settings, telemetry,
         print(f"📅 DÍA LOCAL: {day_start.strftime('%Y-%m-%d')} | weekend={weekend} | total_per_day_per_channel={total_per_day}")
         print("#" * 94)
 
-        hour_cursor = day_start
+        hour_cursor = max(day_start, first_hour)
         while hour_cursor < day_end:
-            hb.tick("💓 Heartbeat: scraper running (no freeze detected)...")
+            if hb is not None:
+                hb.tick("💓 Heartbeat: scraper running (no freeze detected)...")
 
             hour_end = hour_cursor + timedelta(hours=1)
 
@@ -147,59 +263,547 @@ def run_study(driver, mirrors: list[str], settings: Settings, telemetry,
             print(f"🕒 Hora local: {hour_cursor.strftime('%Y-%m-%d %H:00')} -> {hour_end.strftime('%H:00')} | hour_target={hour_target}")
             print("=" * 78)
 
-            for etapa in CHANNELS:
+            for etapa in (channels or CHANNELS):
                 print("\n" + "-" * 86)
                 print(f"📌 CANAL: {etapa} | objetivo hora={hour_target} | subtargets={sub_targets}")
                 print("-" * 86)
 
-                for i in range(6):
-                    hb.tick("💓 Heartbeat: still running...")
+                if density is not None:
+                    spans = density.plan_hour(etapa, hour_cursor, sub_targets, settings.SUBWINDOW_MINUTES)
+                    if len(spans) != len(sub_targets):
+                        print(f"📐 Subventanas adaptativas: {len(spans)} x "
+                              f"{'/'.join(sorted({str(m) for _, m, _ in spans}))} min | targets={[t for _, _, t in spans]}")
+                else:
+                    spans = [(i * settings.SUBWINDOW_MINUTES, settings.SUBWINDOW_MINUTES, t)
+                             for i, t in enumerate(sub_targets)]
 
-                    sub_start = hour_cursor + timedelta(minutes=i * settings.SUBWINDOW_MINUTES)
-                    sub_end = sub_start + timedelta(minutes=settings.SUBWINDOW_MINUTES)
-                    target = sub_targets[i]
+                for offset, minutes, target in spans:
+                    sub_start = hour_cursor + timedelta(minutes=offset)
+                    sub_end = sub_start + timedelta(minutes=minutes)
 
                     if target <= 0:
                         if settings.DEBUG:
                             print(f"⏩ Subventana {sub_start.strftime('%H:%M')}->{sub_end.strftime('%H:%M')} target=0 (skip)")
                         continue
 
-                    print("\n" + "-" * 86)
-                    print(f"⏱️  Subventana {sub_start.strftime('%Y-%m-%d %H:%M')} -> {sub_end.strftime('%H:%M')} | {etapa} | target={target}")
-                    print("-" * 86)
-
-                    block_t0 = time.time()
+                    yield SubwindowTask(sub_start=sub_start, sub_end=sub_end, etapa=etapa, target=target)
 
-                    lote = extraer_subventana_epoch(
-                        driver=driver,
-                        mirrors=mirrors,
-                        settings=settings,
-                        telemetry=telemetry,
-                        sub_start_local=sub_start,
-                        sub_end_local=sub_end,
-                        etapa=etapa,
-                        target=target,
-                        window_log_path=settings.WINDOW_LOG_PATH,
-                        write_header_if_new=settings.WRITE_HEADER_IF_NEW,
-                    )
+            hour_cursor = hour_end
 
-                    attempts = 1
-                    ok_requests = 1 if lote else 0
-                    obtained_total = len(lote) if lote else 0
+        day_cursor = day_start + timedelta(days=1)
 
-                    if lote:
-                        writer.append_rows(lote)
-                        print(f"   ✅ Append+flush OK | +{len(lote)} rows | buffer={len(writer.buffer)}")
-                    else:
-                        print("   ⚠️  Subventana sin datos (ningún mirror entregó tweets válidos).")
 
-                    block_dt = time.time() - block_t0
-                    print_block_dashboard(sub_start, sub_end, etapa, target, obtained_total, attempts, ok_requests, block_dt)
+def resume_tasks(tasks: Iterator[SubwindowTask], ledger: ProgressLedger,
+                 settings: Settings) -> Iterator[SubwindowTask]:
+    """
+    Modo resume: salta unidades "done" (o con RESUME_MAX_ATTEMPTS agotados) y
+    reintenta "failed"/"short" pidiendo solo lo que falta y excluyendo lo ya escrito.
+    """
+    skipped = 0
+    for task in tasks:
+        prev = ledger.get(*task.unit_key)
+        if prev is None:
+            yield task
+            continue
+
+        if prev["status"] == "done" or prev["attempts"] >= settings.RESUME_MAX_ATTEMPTS:
+            skipped += 1
+            if settings.DEBUG:
+                print(f"⏭️  Resume: {task.etapa} {task.unit_key[0]} ya registrada ({prev['status']}, "
+                      f"{prev['obtained']}/{prev['target']}, intentos={prev['attempts']})")
+            continue
+
+        remaining = max(1, prev["target"] - prev["obtained"])
+        exclude = ledger.known_ids(*task.unit_key) if prev["obtained"] else frozenset()
+        print(f"🔁 Resume: reintento {prev['status']} {task.etapa} {task.unit_key[0]} | faltan={remaining}")
+        yield replace(task, target=remaining, exclude_ids=exclude, resumed=True)
+
+    print(f"⏭️  Resume: {skipped} unidades saltadas (ya completadas en el ledger)")
+
+
+def plan_tasks(tasks: Iterator[SubwindowTask], plan: QueryPlan,
+               source_pool: SourcePool) -> Iterator[SubwindowTask]:
+    """
+    Planner de queries: las unidades fuente publican sus filas (más las sobrantes)
+    en source_pool; las derivadas reclaman las fuentes planificadas de su misma
+    subventana y se evalúan localmente. Sin fuentes (resume, target 0) van remotas.
+    Requiere los canales derivados al final de cada hora (QueryPlan.ordered).
+    """
+    open_keys: list[tuple[str, str, str]] = []
+    hour = None
+    for task in tasks:
+        task_hour = task.sub_start.replace(minute=0, second=0, microsecond=0)
+        if task_hour != hour:
+            # Las derivadas de una hora ya pasaron: lo no reclamado se libera al publicarse.
+            for key in open_keys:
+                source_pool.close(key)
+            open_keys, hour = [], task_hour
+
+        if task.etapa in plan.sources:
+            source_pool.expect(task.unit_key)
+            open_keys.append(task.unit_key)
+            yield replace(task, collect_spare=True)
+        elif task.etapa in plan.derived:
+            window_id, window_end, _ = task.unit_key
+            claimed = tuple(s for s in plan.derived[task.etapa] if source_pool.claim((window_id, window_end, s)))
+            yield replace(task, derive_from=claimed)
+        else:
+            yield task
+
+    for key in open_keys:
+        source_pool.close(key)
+
+
+def _derive_subwindow(task: SubwindowTask, planner: QueryPlan, source_pool: SourcePool,
+                      settings: Settings, worker_tag: str = "") -> list[dict]:
+    """Evalúa la query del canal derivado sobre las filas de sus fuentes (sin request remota)."""
+    window_id, window_end, _ = task.unit_key
+    pool_rows: list[dict] = []
+    for src in task.derive_from:
+        rows = source_pool.take((window_id, window_end, src), timeout=settings.PLANNER_SOURCE_TIMEOUT_SEC)
+        pool_rows.extend(rows or [])
+
+    derived = planner.derive_rows(task.etapa, pool_rows, query_hash(QUERY_CORE[task.etapa]))
+    if task.exclude_ids:
+        derived = [r for r in derived if r["status_id"] not in task.exclude_ids]
+    derived = derived[:task.target]
+
+    stop = "derived" if len(derived) >= task.target else "derived_short"
+    print(f"   🧠 {worker_tag}Derivado local de {'+'.join(task.derive_from)}: "
+          f"{len(derived)}/{task.target} de {len(pool_rows)} filas fuente")
+    append_csv_rows(
+        path=settings.WINDOW_LOG_PATH,
+        rows=[log_window_row(
+            sub_start_local=task.sub_start,
+            sub_end_local=task.sub_end,
+            etapa=task.etapa,
+            mirror="local",
+            mode_used="derived",
+            requested_target=task.target,
+            need_raw=0,
+            obtained_n=len(derived),
+            pages_used=0,
+            items_seen=len(pool_rows),
+            dates_ok=0,
+            dates_fail=0,
+            outside_window=0,
+            no_link=0,
+            no_content=0,
+            stop_reason=stop,
+        )],
+        write_header_if_new=settings.WRITE_HEADER_IF_NEW,
+    )
+    return derived
+
+
+def run_subwindow_task(driver, task: SubwindowTask, mirrors: list[str], settings: Settings,
+                       telemetry, writer: IncrementalWriter, worker_tag: str = "",
+                       http_engine=None, ledger: ProgressLedger | None = None,
+                       mirror_scheduler: MirrorScheduler | None = None,
+                       hedge_drivers: HedgeDriverPair | None = None,
+                       rate_limiter: MirrorRateLimiter | None = None,
+                       planner: QueryPlan | None = None,
+                       source_pool: SourcePool | None = None,
+                       density: DensityModel | None = None,
+                       archive: PageArchive | None = None,
+                       stop: threading.Event | None = None) -> int:
+    """
+    Ejecuta 1 tarea (subventana x canal) con el driver dado y escribe el lote.
+    Con planner: una unidad derivada se evalúa localmente y solo pide remoto lo
+    que falte (QUERY_PLANNER_TOPUP); una unidad fuente publica sus filas.
+    stop (modo pool): corta el intento en curso; lo ya recolectado se escribe igual.
+    Reintento de resume: task.exclude_ids llega al collector, así lo ya escrito no
+    ocupa lugar del target (la búsqueda vuelve a entregar primero lo más nuevo).
+    Devuelve el número de filas obtenidas.
+    """
+    sub_start, sub_end, etapa, target = task.sub_start, task.sub_end, task.etapa, task.target
+
+    print("\n" + "-" * 86)
+    print(f"⏱️  {worker_tag}Subventana {sub_start.strftime('%Y-%m-%d %H:%M')} -> {sub_end.strftime('%H:%M')} | {etapa} | target={target}")
+    print("-" * 86)
+
+    block_t0 = time.time()
+
+    def fetch_remote(n: int, spare_out: list[dict] | None = None,
+                     exclude: frozenset[str] = task.exclude_ids) -> list[dict]:
+        return extraer_subventana_epoch(
+            driver=driver,
+            mirrors=mirrors,
+            settings=settings,
+            telemetry=telemetry,
+            sub_start_local=sub_start,
+            sub_end_local=sub_end,
+            etapa=etapa,
+            target=n,
+            window_log_path=settings.WINDOW_LOG_PATH,
+            write_header_if_new=settings.WRITE_HEADER_IF_NEW,
+            http_engine=http_engine,
+            mirror_scheduler=mirror_scheduler,
+            hedge_drivers=hedge_drivers,
+            rate_limiter=rate_limiter,
+            spare_out=spare_out,
+            on_window_row=density.observe_row if density is not None else None,
+            archive=archive,
+            stop=stop,
+            exclude_ids=exclude,
+        )
+
+    if task.derive_from and planner is not None and source_pool is not None:
+        lote = _derive_subwindow(task, planner, source_pool, settings, worker_tag)
+        missing = target - len(lote)
+        topup = missing > 0 and settings.QUERY_PLANNER_TOPUP
+        telemetry.add_planner_derived(etapa, len(lote), topup=topup)
+        if topup:
+            lote = lote + fetch_remote(missing, exclude=task.exclude_ids | {r["status_id"] for r in lote})
+    elif task.collect_spare and source_pool is not None:
+        spare: list[dict] = []
+        lote = []
+        try:
+            lote = fetch_remote(target, spare_out=spare)
+        finally:
+            source_pool.publish(task.unit_key, lote + spare)
+    else:
+        lote = fetch_remote(target)
+
+    attempts = 1
+    ok_requests = 1 if lote else 0
+    obtained_total = len(lote) if lote else 0
+
+    # El ledger se actualiza recién cuando las filas están en disco (post-flush)
+    on_flushed = None
+    if ledger is not None:
+        # Recibe las filas que quedan tras el dedup: solo esas cuentan para la unidad.
+        on_flushed = partial(ledger.record, *task.unit_key, task.target, resumed=task.resumed)
+
+    if lote:
+        kept = writer.append_rows(lote, on_flushed=on_flushed)
+        print(f"   ✅ {worker_tag}Append+flush OK | +{len(kept)} rows | buffer={len(writer.buffer)}")
+    else:
+        print(f"   ⚠️  {worker_tag}Subventana sin datos (ningún mirror entregó tweets válidos).")
+        if on_flushed is not None:
+            on_flushed([])
+
+    block_dt = time.time() - block_t0
+    print_block_dashboard(sub_start, sub_end, etapa, target, obtained_total, attempts, ok_requests, block_dt)
+
+    if rate_limiter is None:
+        time.sleep(random.uniform(0.8, 1.6))
+    return obtained_total
+
+
+def _driver_watchdog(drivers: list[tuple[str, object]], settings: Settings, telemetry,
+                     worker_tag: str = "", hedge_pair: HedgeDriverPair | None = None) -> None:
+    """
+    Entre subventanas: muestrea el RSS de cada LazyDriver arrancado (cada
+    DRIVER_RSS_SAMPLE_SEC) y lo recicla tras DRIVER_RECYCLE_PAGES páginas o por
+    encima de DRIVER_RECYCLE_RSS_MB; el próximo uso reconstruye Chrome.
+    Con hedging se espera a que ningún perdedor siga cargando en esos drivers.
+    """
+    if hedge_pair is not None and not hedge_pair.wait_idle(timeout=0):
+        return
+    now = time.monotonic()
+    for role, d in drivers:
+        if not isinstance(d, LazyDriver) or not d.started:
+            continue
+        over_pages = settings.DRIVER_RECYCLE_PAGES > 0 and d.pages >= settings.DRIVER_RECYCLE_PAGES
+        if not over_pages and now - d.sampled_at < settings.DRIVER_RSS_SAMPLE_SEC:
+            continue
+
+        rss = d.rss_mb()
+        d.sampled_at = now
+        n_pages, avg_page_sec = d.take_window_latency()
+        reason = ""
+        if over_pages:
+            reason = "pages"
+        elif settings.DRIVER_RECYCLE_RSS_MB > 0 and rss is not None and rss >= settings.DRIVER_RECYCLE_RSS_MB:
+            reason = "rss"
+
+        row = {
+            "ts_utc": datetime.now(timezone.utc).isoformat(),
+            "worker": worker_tag.strip(),
+            "role": role,
+            "event": "recycle" if reason else "sample",
+            "reason": reason,
+            "pages_since_start": d.pages,
+            "pages_since_sample": n_pages,
+            "avg_page_sec": round(avg_page_sec, 3) if avg_page_sec is not None else "",
+            "rss_mb": round(rss, 1) if rss is not None else None,
+            "recycles": d.recycles + (1 if reason else 0),
+        }
+        if reason:
+            rss_txt = f"{rss:.0f} MB" if rss is not None else "n/d"
+            print(f"   ♻️ {worker_tag}Reciclando Chrome ({role}, {reason}): {d.pages} páginas | RSS={rss_txt}")
+            try:
+                d.recycle()
+            except Exception as e:
+                print(f"   ⚠️ {worker_tag}Error cerrando Chrome al reciclar: {_short_err(e)}")
+        telemetry.log_driver_event(row)
+
+
+def _run_worker_pool(driver, driver_factory: Callable[[], object], tasks: Iterator[SubwindowTask],
+                     mirrors: list[str], settings: Settings, telemetry,
+                     writer: IncrementalWriter, hb: Heartbeat, http_engine=None,
+                     ledger: ProgressLedger | None = None,
+                     mirror_scheduler: MirrorScheduler | None = None,
+                     rate_limiter: MirrorRateLimiter | None = None,
+                     planner: QueryPlan | None = None,
+                     source_pool: SourcePool | None = None,
+                     density: DensityModel | None = None,
+                     archive: PageArchive | None = None) -> None:
+    """
+    Pool de N workers (threads), cada uno con su propio driver.
+    - El worker 0 reutiliza el driver recibido; el resto usa un LazyDriver(driver_factory),
+      que solo arranca Chrome en el primer uso (con backend HTTP puede no arrancar nunca).
+    - Con HEDGE_ENABLED cada worker tiene además un LazyDriver para el intento paralelo.
+    - Entre subventanas cada worker pasa por _driver_watchdog (reciclaje de Chrome).
+    - El hilo principal produce tareas en una cola acotada (backpressure) y atiende Ctrl + C.
+    - Ctrl + C activa 'stop': corta pausas y paginación del intento en curso (es el
+      cancel de los pagers), cada worker escribe lo ya recolectado y sale; el hilo
+      principal los espera (POOL_STOP_TIMEOUT_SEC) antes de cerrar los drivers extra,
+      así main hace flush del writer y cierra el ledger con los workers ya detenidos.
+    """
+    n_workers = max(1, int(settings.WORKERS))
+    task_q: queue.Queue = queue.Queue(maxsize=n_workers * 2)
+    stop = threading.Event()
+    extra_drivers = [LazyDriver(driver_factory) for _ in range(n_workers - 1)]
+    hedge_pairs: list[HedgeDriverPair | None] = [None] * n_workers
+    hedge_extra = [LazyDriver(driver_factory) for _ in range(n_workers)] if settings.HEDGE_ENABLED else []
+
+    def worker(idx: int) -> None:
+        tag = f"[w{idx}] "
+        drv = driver if idx == 0 else extra_drivers[idx - 1]
+        if hedge_extra:
+            hedge_pairs[idx] = HedgeDriverPair(drv, hedge_extra[idx])
+        try:
+            while not stop.is_set():
+                try:
+                    task = task_q.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if task is None:
+                    break
+                try:
+                    run_subwindow_task(drv, task, mirrors, settings, telemetry, writer, worker_tag=tag,
+                                       http_engine=http_engine, ledger=ledger,
+                                       mirror_scheduler=mirror_scheduler, hedge_drivers=hedge_pairs[idx],
+                                       rate_limiter=rate_limiter, planner=planner, source_pool=source_pool,
+                                       density=density, archive=archive, stop=stop)
+                except Exception as e:
+                    # extraer_subventana_epoch ya captura errores por mirror; esto es un fallo del worker
+                    print(f"   ⚠️ {tag}Error inesperado en {task.etapa} {task.sub_start}: {_short_err(e)}")
+                _driver_watchdog([("main", drv), ("hedge", hedge_extra[idx] if hedge_extra else None)],
+                                 settings, telemetry, worker_tag=tag, hedge_pair=hedge_pairs[idx])
+        except Exception as e:
+            print(f"   ⚠️ {tag}Worker detenido: {_short_err(e)}")
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"sismografo-w{i}", daemon=True)
+               for i in range(n_workers)]
+    for t in threads:
+        t.start()
+
+    def put(item) -> bool:
+        # put con timeout para seguir atendiendo heartbeat / Ctrl + C / workers muertos
+        while True:
+            if not any(t.is_alive() for t in threads):
+                return False
+            try:
+                task_q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                hb.tick("💓 Heartbeat: still running...")
+
+    try:
+        for task in tasks:
+            if not put(task):
+                print("   ⚠️ Todos los workers se detuvieron; abortando el estudio.")
+                break
+        for _ in threads:
+            if not put(None):
+                break
+        while any(t.is_alive() for t in threads):
+            hb.tick("💓 Heartbeat: still running...")
+            for t in threads:
+                t.join(timeout=0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        raise
+    finally:
+        stop.set()
+        deadline = time.monotonic() + float(settings.POOL_STOP_TIMEOUT_SEC)
+        for t in threads:
+            t.join(timeout=max(0.0, deadline - time.monotonic()))
+        alive = [t.name for t in threads if t.is_alive()]
+        if alive:
+            print(f"   ⚠️ Workers sin terminar tras {settings.POOL_STOP_TIMEOUT_SEC:.0f}s: {', '.join(alive)}")
+        for pair in hedge_pairs:
+            if pair is not None:
+                pair.wait_idle(timeout=max(0.0, deadline - time.monotonic()))  # perdedores de hedge aún en carga
+        for d in extra_drivers + hedge_extra:
+            try:
+                d.quit()
+            except Exception:
+                pass
 
-                    time.sleep(random.uniform(0.8, 1.6))
 
-            hour_cursor = hour_end
+def run_study(driver, mirrors: list[str], settings: Settings, telemetry,
+              start_study: datetime, end_study: datetime,
+              driver_factory: Callable[[], object] | None = None,
+              http_engine=None, ledger: ProgressLedger | None = None,
+              writer: IncrementalWriter | None = None,
+              mirror_scheduler: MirrorScheduler | None = None,
+              rate_limiter: MirrorRateLimiter | None = None,
+              planner: QueryPlan | None = None,
+              archive: PageArchive | None = None) -> IncrementalWriter:
+    # Si main pasa el writer, puede hacer flush aunque run_study salga por Ctrl + C.
+    if writer is None:
+        writer = IncrementalWriter(
+            dataset_path=settings.DATASET_PATH,
+            flush_every=settings.FLUSH_EVERY_N_ROWS,
+            write_header_if_new=settings.WRITE_HEADER_IF_NEW,
+            telemetry=telemetry,
+        )
 
-        day_cursor = day_start + timedelta(days=1)
+    hb = Heartbeat(every_sec=30.0)
+    density = None
+    if settings.SUBWINDOW_MODE == "adaptive":
+        density = DensityModel(settings)
+        n_rows = density.load_window_log(settings.WINDOW_LOG_PATH)
+        print(f"📐 Subventanas adaptativas: densidad inicial desde {n_rows} filas de window_log")
+    channels = planner.ordered(CHANNELS) if planner is not None else None
+    tasks = iter_subwindow_tasks(settings, start_study, end_study, hb=hb, channels=channels, density=density)
+    if settings.RESUME and ledger is not None:
+        tasks = resume_tasks(tasks, ledger, settings)
+    source_pool = None
+    if planner is not None:
+        source_pool = SourcePool()
+        tasks = plan_tasks(tasks, planner, source_pool)
+
+    if settings.WORKERS > 1:
+        print(f"🧵 Modo pool: {settings.WORKERS} workers (drivers independientes) | backend={settings.FETCH_BACKEND}")
+        _run_worker_pool(driver, driver_factory or build_driver, tasks, mirrors, settings, telemetry,
+                         writer, hb, http_engine=http_engine, ledger=ledger,
+                         mirror_scheduler=mirror_scheduler, rate_limiter=rate_limiter,
+                         planner=planner, source_pool=source_pool, density=density, archive=archive)
+        return writer
+
+    hedge_driver = LazyDriver(driver_factory or build_driver) if settings.HEDGE_ENABLED else None
+    hedge_pair = HedgeDriverPair(driver, hedge_driver) if hedge_driver is not None else None
+    try:
+        for task in tasks:
+            hb.tick("💓 Heartbeat: still running...")
+            run_subwindow_task(driver, task, mirrors, settings, telemetry, writer,
+                               http_engine=http_engine, ledger=ledger, mirror_scheduler=mirror_scheduler,
+                               hedge_drivers=hedge_pair, rate_limiter=rate_limiter,
+                               planner=planner, source_pool=source_pool, density=density, archive=archive)
+            _driver_watchdog([("main", driver), ("hedge", hedge_driver)], settings, telemetry,
+                             hedge_pair=hedge_pair)
+    finally:
+        if hedge_pair is not None:
+            hedge_pair.wait_idle(timeout=60.0)
+            try:
+                hedge_driver.quit()
+            except Exception:
+                pass
 
     return writer
+
+
+@dataclass
+class RunComponents:
+    """Objetos de una corrida armados desde Settings (build_run_components)."""
+    writer: IncrementalWriter
+    ledger: ProgressLedger | None = None
+    dedup: StatusIdIndex | None = None
+    archive: PageArchive | None = None
+    planner: QueryPlan | None = None
+    mirror_scheduler: MirrorScheduler | None = None
+    rate_limiter: MirrorRateLimiter | None = None
+    http_engine: HttpFetchEngine | None = None
+
+    def run_kwargs(self) -> dict:
+        """Argumentos de run_study."""
+        return dict(writer=self.writer, ledger=self.ledger, archive=self.archive, planner=self.planner,
+                    mirror_scheduler=self.mirror_scheduler, rate_limiter=self.rate_limiter,
+                    http_engine=self.http_engine)
+
+    def summary_extra(self) -> dict:
+        """Secciones extra de run_summary.json (salud/ritmo de mirrors, archivo HTML)."""
+        extra = {}
+        if self.mirror_scheduler is not None:
+            extra["mirror_health"] = self.mirror_scheduler.snapshot()
+        if self.rate_limiter is not None:
+            extra["mirror_rate"] = self.rate_limiter.snapshot()
+        if self.archive is not None:
+            extra["archive"] = self.archive.summary()
+        return extra
+
+    def close(self) -> None:
+        """Cierra dedup, archivo, engine HTTP y ledger (después de drenar el writer de fondo)."""
+        for obj in (self.dedup, self.archive, self.http_engine, self.ledger):
+            if obj is not None:
+                try:
+                    obj.close()
+                except Exception as e:
+                    print(f"   ⚠️ Error al cerrar {type(obj).__name__}: {_short_err(e)}")
+
+
+def build_run_components(settings: Settings, telemetry, mirrors: list[str]) -> RunComponents:
+    """
+    Arma ledger, engine HTTP, scheduler y rate limiter de mirrors, planner, dedup,
+    archivo HTML y writer del dataset según Settings. Lo usan main y
+    src/bench/e2e.py, así cada flag tiene el mismo efecto en los dos.
+    """
+    ledger = ProgressLedger(settings.LEDGER_PATH) if (settings.LEDGER_ENABLED or settings.RESUME) else None
+
+    # Chrome arranca con el primer fetch (con backend http, solo si algún mirror exige challenge JS)
+    http_engine = HttpFetchEngine(settings).start() if settings.FETCH_BACKEND == "http" else None
+
+    mirror_scheduler = None
+    if settings.MIRROR_SELECTION == "adaptive":
+        mirror_scheduler = MirrorScheduler(
+            mirrors,
+            alpha=settings.MIRROR_EWMA_ALPHA,
+            explore_rate=settings.MIRROR_EXPLORE_RATE,
+            fail_threshold=settings.MIRROR_FAIL_THRESHOLD,
+            cooldown_base_sec=settings.MIRROR_COOLDOWN_BASE_SEC,
+            cooldown_max_sec=settings.MIRROR_COOLDOWN_MAX_SEC,
+            latency_ref_sec=settings.MIRROR_LATENCY_REF_SEC,
+        )
+
+    planner = None
+    if settings.QUERY_PLANNER:
+        planner = plan_queries(QUERY_CORE)
+        for channel, sources in planner.derived.items():
+            print(f"🧠 Planner: {channel} se deriva localmente de {' + '.join(sources)}")
+
+    # Ritmo por mirror según su feedback (reemplaza las pausas fijas)
+    rate_limiter = MirrorRateLimiter(settings) if settings.PACING_MODE == "adaptive" else None
+
+    dedup = None
+    if settings.DEDUP_ENABLED:
+        dedup = StatusIdIndex(
+            db_path=settings.DEDUP_DB_PATH,
+            bloom_path=settings.DEDUP_BLOOM_PATH,
+            capacity=settings.DEDUP_CAPACITY,
+            fp_rate=settings.DEDUP_FP_RATE,
+        )
+        print(f"🧮 Dedup activo: {len(dedup)} status_id conocidos")
+
+    archive = None
+    if settings.ARCHIVE_ENABLED:
+        archive = PageArchive(settings.ARCHIVE_DIR, codec=settings.ARCHIVE_CODEC)
+        print(f"🗄️ Archivo HTML activo ({archive.codec}): {settings.ARCHIVE_DIR}")
+
+    parquet = settings.DATASET_FORMAT == "parquet"
+    writer = IncrementalWriter(
+        dataset_path=settings.DATASET_PARQUET_DIR if parquet else settings.DATASET_PATH,
+        flush_every=settings.PARQUET_FLUSH_EVERY_N_ROWS if parquet else settings.FLUSH_EVERY_N_ROWS,
+        write_header_if_new=settings.WRITE_HEADER_IF_NEW,
+        telemetry=telemetry,
+        dedup=dedup,
+        record_membership=settings.DEDUP_RECORD_MEMBERSHIP,
+        dataset_format=settings.DATASET_FORMAT,
+        parquet_compression=settings.PARQUET_COMPRESSION,
+    )
+    return RunComponents(writer=writer, ledger=ledger, dedup=dedup, archive=archive, planner=planner,
+                         mirror_scheduler=mirror_scheduler, rate_limiter=rate_limiter, http_engine=http_engine)
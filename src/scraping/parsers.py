@@ -0,0 +1,265 @@
+# src/scraping/parsers.py
+# ============================================================
+# PARSEO DE TIMELINE (1 pasada por página, backend seleccionable)
+# ============================================================
+# Nota:
+# - Cada timeline-item se reduce a un dict "crudo" con los campos que usa
+#   extraer_subventana_epoch (mismo contenido que las llamadas item.find):
+#     show_more, href, title, datetime, text, links, username, stats
+# - "bs4" es la ruta de referencia (BeautifulSoup + html.parser, find por campo).
+# - "lxml" y "selectolax" recorren el subárbol de cada item UNA vez y son
+#   mucho más rápidos; deben producir exactamente los mismos dicts
+#   (paridad verificada en `python -m src.bench.parsers`).
+# - "auto" elige el más rápido instalado.
+# ============================================================
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+PARSER_BACKENDS: tuple[str, ...] = ("bs4", "lxml", "selectolax")
+
+
+@dataclass
+class ParsedPage:
+    items: list[dict] = field(default_factory=list)
+    next_cursor: str | None = None
+
+
+def _raw_item(show_more: bool = False) -> dict:
+    return {
+        "show_more": show_more,
+        "href": None,
+        "title": None,
+        "datetime": None,
+        "text": None,
+        "links": [],
+        "username": "",
+        "stats": [],
+    }
+
+
+def _pick_cursor(hrefs: list[str | None]) -> str | None:
+    # Último "Load more" con cursor=; el "Load newest" superior no lleva cursor.
+    for h in reversed(hrefs):
+        if h and "cursor=" in h:
+            return h
+    return None
+
+
+# -----------------------------
+# bs4 (referencia)
+# -----------------------------
+def _parse_bs4(html: str) -> ParsedPage:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    out: list[dict] = []
+
+    for item in soup.find_all("div", class_="timeline-item"):
+        if "show-more" in (item.get("class") or []):
+            out.append(_raw_item(show_more=True))
+            continue
+
+        it = _raw_item()
+
+        a_link = item.find("a", class_="tweet-link")
+        if a_link is not None:
+            it["href"] = a_link.get("href")
+
+        td = item.find("span", class_="tweet-date")
+        a = td.find("a") if td else None
+        if a is not None:
+            it["title"] = a.get("title")
+            it["datetime"] = a.get("datetime")
+
+        content = item.find("div", class_="tweet-content")
+        if content is not None:
+            it["text"] = content.get_text(separator=" ", strip=True)
+            it["links"] = [x.get_text() for x in content.find_all("a")]
+
+        user_a = item.find("a", class_="username")
+        if user_a is not None:
+            it["username"] = user_a.get_text(strip=True)
+
+        it["stats"] = [s.get_text(strip=True) for s in item.find_all("span", class_="tweet-stat")]
+        out.append(it)
+
+    hrefs = []
+    for div in soup.find_all("div", class_="show-more"):
+        a = div.find("a")
+        hrefs.append(a.get("href") if a is not None else None)
+
+    return ParsedPage(items=out, next_cursor=_pick_cursor(hrefs))
+
+
+# -----------------------------
+# lxml (1 pasada por item)
+# -----------------------------
+_XP_TIMELINE_ITEM = "//div[contains(concat(' ', normalize-space(@class), ' '), ' timeline-item ')]"
+_XP_SHOW_MORE_A = "//div[contains(concat(' ', normalize-space(@class), ' '), ' show-more ')]"
+
+
+def _lxml_strings(node):
+    # Mismos strings que recorre get_text() (itertext omite comentarios y PIs).
+    return node.itertext()
+
+
+def _lxml_item(el) -> dict:
+    classes = (el.get("class") or "").split()
+    if "show-more" in classes:
+        return _raw_item(show_more=True)
+
+    it = _raw_item()
+    got_link = got_date = got_content = got_user = False
+
+    for node in el.iterdescendants():
+        tag = node.tag
+        if not isinstance(tag, str):
+            continue
+        cls = node.get("class")
+        if not cls:
+            continue
+        cl = cls.split()
+
+        if tag == "a":
+            if not got_link and "tweet-link" in cl:
+                it["href"] = node.get("href")
+                got_link = True
+            if not got_user and "username" in cl:
+                it["username"] = "".join(s.strip() for s in _lxml_strings(node))
+                got_user = True
+        elif tag == "span":
+            if not got_date and "tweet-date" in cl:
+                got_date = True
+                a = next(node.iterdescendants("a"), None)
+                if a is not None:
+                    it["title"] = a.get("title")
+                    it["datetime"] = a.get("datetime")
+            if "tweet-stat" in cl:
+                it["stats"].append("".join(s.strip() for s in _lxml_strings(node)))
+        elif tag == "div":
+            if not got_content and "tweet-content" in cl:
+                got_content = True
+                it["text"] = " ".join(s for s in (t.strip() for t in _lxml_strings(node)) if s)
+                it["links"] = ["".join(_lxml_strings(a)) for a in node.iterdescendants("a")]
+
+    return it
+
+
+def _parse_lxml(html: str) -> ParsedPage:
+    import lxml.html
+
+    if not html or not html.strip():
+        return ParsedPage()
+    root = lxml.html.fromstring(html)
+    items = [_lxml_item(el) for el in root.xpath(_XP_TIMELINE_ITEM)]
+
+    hrefs = []
+    for div in root.xpath(_XP_SHOW_MORE_A):
+        a = next(div.iterdescendants("a"), None)
+        hrefs.append(a.get("href") if a is not None else None)
+
+    return ParsedPage(items=items, next_cursor=_pick_cursor(hrefs))
+
+
+# -----------------------------
+# selectolax / lexbor (1 pasada por item)
+# -----------------------------
+def _slx_strings(node) -> list[str]:
+    return [n.text_content for n in node.traverse(include_text=True) if n.tag == "-text"]
+
+
+def _slx_item(el) -> dict:
+    classes = (el.attributes.get("class") or "").split()
+    if "show-more" in classes:
+        return _raw_item(show_more=True)
+
+    it = _raw_item()
+    got_link = got_date = got_content = got_user = False
+
+    nodes = el.traverse()
+    next(nodes, None)  # traverse() emite primero el propio item
+    for node in nodes:
+        cls = node.attributes.get("class")
+        if not cls:
+            continue
+        cl = cls.split()
+        tag = node.tag
+
+        if tag == "a":
+            if not got_link and "tweet-link" in cl:
+                it["href"] = node.attributes.get("href")
+                got_link = True
+            if not got_user and "username" in cl:
+                it["username"] = "".join(s.strip() for s in _slx_strings(node))
+                got_user = True
+        elif tag == "span":
+            if not got_date and "tweet-date" in cl:
+                got_date = True
+                a = node.css_first("a")
+                if a is not None:
+                    it["title"] = a.attributes.get("title")
+                    it["datetime"] = a.attributes.get("datetime")
+            if "tweet-stat" in cl:
+                it["stats"].append("".join(s.strip() for s in _slx_strings(node)))
+        elif tag == "div":
+            if not got_content and "tweet-content" in cl:
+                got_content = True
+                it["text"] = " ".join(s for s in (t.strip() for t in _slx_strings(node)) if s)
+                it["links"] = ["".join(_slx_strings(a)) for a in node.css("a")]
+
+    return it
+
+
+def _parse_selectolax(html: str) -> ParsedPage:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html or "")
+    items = [_slx_item(el) for el in tree.css("div.timeline-item")]
+
+    hrefs = []
+    for div in tree.css("div.show-more"):
+        a = div.css_first("a")
+        hrefs.append(a.attributes.get("href") if a is not None else None)
+
+    return ParsedPage(items=items, next_cursor=_pick_cursor(hrefs))
+
+
+_PARSERS = {
+    "bs4": _parse_bs4,
+    "lxml": _parse_lxml,
+    "selectolax": _parse_selectolax,
+}
+
+
+def available_backends() -> list[str]:
+    out = ["bs4"]
+    try:
+        import lxml.html  # noqa: F401
+        out.append("lxml")
+    except ImportError:
+        pass
+    try:
+        import selectolax.lexbor  # noqa: F401
+        out.append("selectolax")
+    except ImportError:
+        pass
+    return out
+
+
+def resolve_backend(name: str) -> str:
+    """Traduce "auto" al backend más rápido instalado; valida el resto."""
+    if name == "auto":
+        avail = available_backends()
+        for pref in ("selectolax", "lxml", "bs4"):
+            if pref in avail:
+                return pref
+    if name not in _PARSERS:
+        raise ValueError(f"PARSER_BACKEND desconocido: {name!r} (opciones: auto, {', '.join(PARSER_BACKENDS)})")
+    return name
+
+
+def parse_timeline_page(html: str, backend: str = "bs4") -> ParsedPage:
+    """Parsea una página de búsqueda: items crudos + href del siguiente cursor."""
+    return _PARSERS[resolve_backend(backend)](html)
@@ -0,0 +1,128 @@
+# src/scraping/ratelimit.py
+# ============================================================
+# RATE LIMITER ADAPTATIVO POR MIRROR (token bucket + AIMD)
+# ============================================================
+# Nota:
+# - Reemplaza las pausas fijas (post driver.get, entre páginas, entre mirrors y
+#   entre bloques) cuando PACING_MODE="adaptive".
+# - Cada mirror tiene su bucket (compartido por todos los workers): cada carga
+#   de página (driver.get / click "Load more" / GET HTTP) consume 1 token.
+# - La tasa se ajusta con el feedback de cada página:
+#     ok          -> +RATE_INCREASE_RPS (aditivo, hasta RATE_MAX_RPS)
+#     empty       -> x RATE_EMPTY_FACTOR (posible bloqueo silencioso)
+#     error       -> x RATE_ERROR_FACTOR
+#     rate_limited-> x RATE_DECREASE_FACTOR (el mirror nos frenó: 429 / panel)
+#     latencia > RATE_LATENCY_TARGET_SEC -> x RATE_EMPTY_FACTOR
+# ============================================================
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+
+from src.config.settings import Settings
+
+
+@dataclass
+class _Bucket:
+    rate: float
+    burst: float
+    tokens: float
+    last: float = field(default_factory=time.monotonic)
+    requests: int = 0
+    first_ts: float | None = None
+    last_ts: float | None = None
+    waited_sec: float = 0.0
+    backoffs: int = 0
+    rate_limited: int = 0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+
+class MirrorRateLimiter:
+    """
+    Token bucket por mirror con ajuste AIMD de la tasa.
+    Thread-safe: los workers del pool (y los intentos de hedging) comparten instancia.
+    """
+    def __init__(self, settings: Settings, clock=time.monotonic):
+        self.settings = settings
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: dict[str, _Bucket] = {}
+
+    def _bucket(self, mirror: str) -> _Bucket:
+        b = self._buckets.get(mirror)
+        if b is None:
+            s = self.settings
+            # Arranca con 1 token: la primera carga no espera.
+            b = self._buckets[mirror] = _Bucket(rate=s.RATE_INITIAL_RPS, burst=max(1.0, s.RATE_BURST),
+                                                tokens=1.0, last=self._clock())
+        return b
+
+    def acquire(self, mirror: str, cancel: threading.Event | None = None) -> float:
+        """Bloquea hasta tener 1 token para 'mirror'. Devuelve los segundos esperados."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                b = self._bucket(mirror)
+                now = self._clock()
+                b.refill(now)
+                if b.tokens >= 1.0:
+                    b.tokens -= 1.0
+                    b.requests += 1
+                    b.waited_sec += waited
+                    b.first_ts = now if b.first_ts is None else b.first_ts
+                    b.last_ts = now
+                    return waited
+                need = (1.0 - b.tokens) / b.rate
+
+            # Jitter leve: evita que varios workers despierten en fila sobre el mismo mirror.
+            pause = need * random.uniform(1.0, 1.15)
+            if cancel is None:
+                time.sleep(pause)
+            elif cancel.wait(pause):
+                return waited
+            waited += pause
+
+    def feedback(self, mirror: str, outcome: str, latency_sec: float | None = None) -> None:
+        """outcome: "ok" | "empty" | "error" | "rate_limited"."""
+        s = self.settings
+        with self._lock:
+            b = self._bucket(mirror)
+            old = b.rate
+            if outcome == "ok":
+                b.rate += s.RATE_INCREASE_RPS
+            elif outcome == "empty":
+                b.rate *= s.RATE_EMPTY_FACTOR
+            elif outcome == "error":
+                b.rate *= s.RATE_ERROR_FACTOR
+            elif outcome == "rate_limited":
+                b.rate *= s.RATE_DECREASE_FACTOR
+                b.rate_limited += 1
+                b.tokens = min(b.tokens, 0.0)  # además, pausa inmediata
+            if latency_sec is not None and latency_sec > s.RATE_LATENCY_TARGET_SEC and outcome == "ok":
+                b.rate = old * s.RATE_EMPTY_FACTOR
+            b.rate = min(max(b.rate, s.RATE_MIN_RPS), s.RATE_MAX_RPS)
+            if b.rate < old:
+                b.backoffs += 1
+                if outcome == "rate_limited":
+                    print(f"   🐢 Rate limit en {mirror}: {old:.2f} -> {b.rate:.2f} req/s")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {}
+            for m, b in self._buckets.items():
+                span = (b.last_ts - b.first_ts) if (b.first_ts is not None and b.last_ts is not None) else 0.0
+                out[m] = {
+                    "rate_rps": round(b.rate, 4),
+                    "effective_rps": round((b.requests - 1) / span, 4) if span > 0 else None,
+                    "requests": b.requests,
+                    "waited_sec": round(b.waited_sec, 2),
+                    "backoffs": b.backoffs,
+                    "rate_limited": b.rate_limited,
+                }
+            return out
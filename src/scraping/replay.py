@@ -0,0 +1,165 @@
+# src/scraping/replay.py
+# ============================================================
+# REPLAY: re-extracción offline desde el archivo de HTML crudo
+# ============================================================
+# Uso:
+#   python -m src.scraping.replay --out data/raw/replay.csv [--archive data/raw/html_archive]
+#                                 [--workers N] [--parser auto] [--channels A,B]
+#                                 [--since "2025-06-04"] [--until "2025-06-05"]
+#                                 [--no-cap] [--log logs/replay_log.csv] [--overwrite]
+#
+# - Recorre las unidades (subventana x canal) del índice del archivo
+#   (ARCHIVE_ENABLED / --archive en main) y vuelve a armar las filas con
+#   SubwindowCollector, igual que extraer_subventana_epoch, sin navegador.
+# - Los intentos de una unidad se reprocesan en orden (mirror que falló,
+#   hedge, reintentos de --resume); las filas se unen sin status_id repetidos
+#   y, salvo --no-cap, hasta el target registrado de la unidad.
+# - Paraleliza por unidad en N procesos (parseo = CPU).
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from itertools import groupby
+from pathlib import Path
+
+from src.config.settings import Settings, TZ_LOCAL
+from src.scraping.extractor import SubwindowCollector
+from src.scraping.parsers import parse_timeline_page, resolve_backend
+from src.utils.archive import PageArchive, read_blob
+from src.utils.logging import append_csv_rows
+
+_FMT = "%Y-%m-%d %H:%M"
+_COUNTERS = ("items_seen", "dates_ok", "dates_fail", "outside_window", "no_link", "no_content")
+
+
+def replay_unit(unit: dict, archive_root: str, parser: str, cap: bool = True) -> tuple[list[dict], dict]:
+    """Filas y contadores de 1 unidad del archivo (corre en un proceso del pool)."""
+    sub_start = datetime.strptime(unit["window_id"], _FMT).replace(tzinfo=TZ_LOCAL)
+    sub_end = datetime.strptime(unit["window_end"], _FMT).replace(tzinfo=TZ_LOCAL)
+    target = unit["target"] if cap else sys.maxsize
+
+    rows: list[dict] = []
+    seen: set[str] = set()
+    stats: Counter = Counter()
+    attempts = groupby(unit["pages"], key=lambda p: (p["attempt_utc"], p["mirror"], p["query_hash"]))
+    for (_, mirror, qh), pages in attempts:
+        col = SubwindowCollector(unit["channel"], mirror, qh, sub_start, sub_end, target)
+        for p in pages:
+            html = read_blob(archive_root, p["sha256"], p["codec"])
+            col.consume(parse_timeline_page(html, parser).items)
+            stats["pages"] += 1
+            if col.done:
+                break
+        stats["attempts"] += 1
+        stats["items_seen"] += col.seen_items_total
+        for k in _COUNTERS[1:]:
+            stats[k] += getattr(col, k)
+        for r in col.recolectados:
+            if len(rows) >= target:
+                break
+            if r["status_id"] in seen:
+                continue
+            seen.add(r["status_id"])
+            rows.append(r)
+
+    return rows, {
+        "window_id": unit["window_id"],
+        "window_end": unit["window_end"],
+        "channel": unit["channel"],
+        "target": unit["target"],
+        "obtained": len(rows),
+        "attempts": stats["attempts"],
+        "pages": stats["pages"],
+        **{k: stats[k] for k in _COUNTERS},
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    settings = Settings()
+    ap = argparse.ArgumentParser(prog="python -m src.scraping.replay")
+    ap.add_argument("--archive", type=Path, default=settings.ARCHIVE_DIR)
+    ap.add_argument("--out", type=Path, required=True, help="CSV de salida (mismas columnas que el dataset).")
+    ap.add_argument("--log", type=Path, default=None, help="CSV opcional con contadores por unidad.")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--parser", default=settings.PARSER_BACKEND)
+    ap.add_argument("--channels", default="", help="Canales separados por coma (default: todos).")
+    ap.add_argument("--since", default=None, help='window_id mínimo, p.ej. "2025-06-04" o "2025-06-04 13:00".')
+    ap.add_argument("--until", default=None, help="window_id máximo (exclusivo).")
+    ap.add_argument("--no-cap", action="store_true", help="Todas las filas de la ventana, sin cortar en el target.")
+    ap.add_argument("--overwrite", action="store_true")
+    args = ap.parse_args(argv)
+
+    if not (args.archive / "index.sqlite").exists():
+        print(f"❌ No hay archivo HTML en {args.archive} (activar ARCHIVE_ENABLED o --archive en main)")
+        return 1
+    for path in (args.out, args.log):
+        if path is not None and path.exists():
+            if not args.overwrite:
+                print(f"❌ {path} ya existe (usar --overwrite)")
+                return 1
+            path.unlink()
+
+    archive = PageArchive(args.archive)
+    channels = [c.strip() for c in args.channels.split(",") if c.strip()] or None
+    units = archive.units(channels=channels, since=args.since, until=args.until)
+    archive.close()
+
+    parser = resolve_backend(args.parser)
+    workers = max(1, min(args.workers, len(units) or 1))
+    print(f"🔁 Replay: {len(units)} unidades | parser={parser} | workers={workers} | {args.archive}")
+
+    fn = partial(replay_unit, archive_root=str(args.archive), parser=parser, cap=not args.no_cap)
+    totals: Counter = Counter()
+    t0 = time.perf_counter()
+    rows_buf: list[dict] = []
+    log_buf: list[dict] = []
+
+    def flush() -> None:
+        append_csv_rows(args.out, rows_buf)
+        rows_buf.clear()
+        if args.log is not None:
+            append_csv_rows(args.log, log_buf)
+        log_buf.clear()
+
+    if workers == 1:
+        results = map(fn, units)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(fn, units, chunksize=max(1, len(units) // (workers * 8)))
+    try:
+        for rows, unit_stats in results:
+            rows_buf.extend(rows)
+            log_buf.append(unit_stats)
+            totals["units"] += 1
+            totals["rows"] += len(rows)
+            for k in ("pages", *_COUNTERS):
+                totals[k] += unit_stats[k]
+            if len(rows_buf) >= settings.FLUSH_EVERY_N_ROWS:
+                flush()
+        flush()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - t0
+    print(f"✅ Replay: {totals['units']} unidades | {totals['pages']} páginas | {totals['rows']} filas | "
+          f"{elapsed:.1f} s ({totals['pages'] / elapsed if elapsed > 0 else 0:.0f} páginas/s)")
+    print(f"   dates_ok={totals['dates_ok']} dates_fail={totals['dates_fail']} "
+          f"outside_window={totals['outside_window']} no_link={totals['no_link']} no_content={totals['no_content']}")
+    print(f"   - Filas: {args.out}")
+    if args.log is not None:
+        print(f"   - Log por unidad: {args.log}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
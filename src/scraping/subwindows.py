@@ -0,0 +1,157 @@
+# src/scraping/subwindows.py
+# ============================================================
+# SUBVENTANAS ADAPTATIVAS (densidad observada en window_log)
+# ============================================================
+# Nota:
+# - SUBWINDOW_MODE="adaptive": la grilla base de 6 x SUBWINDOW_MINUTES por hora
+#   se fusiona donde la densidad es baja y se bisecta donde satura, respetando
+#   los targets horarios (la suma de targets de la hora no cambia).
+# - Densidad por (canal, finde, hora local): media móvil exponencial de
+#   tweets/min dentro de la ventana, desde filas de window_log (corridas
+#   previas al arrancar + las de esta corrida a medida que se escriben).
+# - La búsqueda usa since_time/until_time y las páginas vienen de la más nueva
+#   a la más vieja:
+#     no_more_pages / past_window_start -> el intento vio toda la ventana: tasa exacta (agotada).
+#     meta_reached / low_yield          -> cortó antes (target o rendimiento): cota inferior.
+#     finished_loop -> agotó MAX_LOAD_MORE sin llegar al target ni al inicio de
+#                      la ventana: saturada (se pierden tweets de la parte vieja).
+# - Filas sin items (bloqueo silencioso o ventana vacía: no se distinguen),
+#   con error, canceladas o derivadas no aportan.
+# ============================================================
+
+from __future__ import annotations
+
+import csv
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from src.config.settings import Settings
+
+_EXHAUSTED = ("no_more_pages", "past_window_start")
+_LOWER_BOUND = ("meta_reached", "low_yield")
+_SATURATED = ("finished_loop",)
+
+
+@dataclass
+class _Density:
+    rate: float = 0.0          # tweets/min dentro de la ventana (EWMA)
+    exhausted: float = 0.0     # fracción de intentos que vieron toda la ventana (EWMA)
+    saturation: float = 0.0    # fracción de intentos que agotaron MAX_LOAD_MORE (EWMA)
+    n: int = 0
+
+
+def _int(v) -> int:
+    try:
+        return int(float(v))
+    except (TypeError, ValueError):
+        return 0
+
+
+class DensityModel:
+    """Tweets/min y saturación por (canal, finde, hora local). Thread-safe."""
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._by_key: dict[tuple[str, bool, int], _Density] = {}
+
+    @staticmethod
+    def _key(channel: str, start: datetime) -> tuple[str, bool, int]:
+        return (channel, start.weekday() >= 5, start.hour)
+
+    def observe_row(self, row: dict) -> None:
+        """Actualiza con 1 fila de window_log (dict de log_window_row o leída del CSV)."""
+        stop = row.get("stop_reason") or ""
+        if row.get("mode_used", "epoch") != "epoch" or stop not in _EXHAUSTED + _LOWER_BOUND + _SATURATED:
+            return
+        items_seen = _int(row.get("items_seen"))
+        if items_seen <= 0:
+            return
+        try:
+            start = datetime.strptime(row["window_id"], "%Y-%m-%d %H:%M")
+            end = datetime.strptime(row["window_end"], "%Y-%m-%d %H:%M")
+        except (KeyError, TypeError, ValueError):
+            return
+        minutes = (end - start).total_seconds() / 60.0
+        if minutes <= 0:
+            return
+
+        in_window = max(0, _int(row.get("dates_ok")) - _int(row.get("outside_window")))
+        rate = in_window / minutes
+        exhausted = 1.0 if stop in _EXHAUSTED else 0.0
+        saturated = 1.0 if stop in _SATURATED else 0.0
+
+        alpha = self.settings.ADAPTIVE_EWMA_ALPHA
+        with self._lock:
+            d = self._by_key.setdefault(self._key(row.get("query_type", ""), start), _Density())
+            if d.n == 0:
+                d.rate, d.exhausted, d.saturation = rate, exhausted, saturated
+            else:
+                # Si no se vio toda la ventana la tasa es cota inferior: no se deja bajar el estimado.
+                new_rate = rate if exhausted else max(rate, d.rate)
+                d.rate = (1 - alpha) * d.rate + alpha * new_rate
+                d.exhausted = (1 - alpha) * d.exhausted + alpha * exhausted
+                d.saturation = (1 - alpha) * d.saturation + alpha * saturated
+            d.n += 1
+
+    def load_window_log(self, path: Path) -> int:
+        """Carga filas de window_log de corridas previas. Devuelve cuántas se leyeron."""
+        path = Path(path)
+        if not path.exists():
+            return 0
+        n = 0
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                self.observe_row(row)
+                n += 1
+        return n
+
+    def estimate(self, channel: str, hour_start: datetime) -> _Density | None:
+        with self._lock:
+            d = self._by_key.get(self._key(channel, hour_start))
+            if d is None or d.n < self.settings.ADAPTIVE_MIN_OBS:
+                return None
+            return _Density(d.rate, d.exhausted, d.saturation, d.n)
+
+    def plan_hour(self, channel: str, hour_start: datetime, sub_targets: list[int],
+                  base_minutes: int) -> list[tuple[int, int, int]]:
+        """
+        Layout de la hora como [(offset_min, minutos, target)]; la suma de targets
+        es la de sub_targets. Sin datos suficientes: grilla base.
+        - Denso (saturación >= ADAPTIVE_SPLIT_SATURATION): cada subventana con
+          target >= 2 se parte en 2 (hasta ADAPTIVE_MIN_MINUTES), con el target repartido.
+        - Ralo (la mayoría de las ventanas se agotan): se fusionan k subventanas
+          consecutivas (k divide la hora) mientras los tweets esperados quepan en
+          ADAPTIVE_MERGE_PAGES páginas.
+        """
+        base = [(i * base_minutes, base_minutes, t) for i, t in enumerate(sub_targets)]
+        d = self.estimate(channel, hour_start)
+        if d is None:
+            return base
+        s = self.settings
+
+        if d.saturation >= s.ADAPTIVE_SPLIT_SATURATION and base_minutes // 2 >= s.ADAPTIVE_MIN_MINUTES:
+            half = base_minutes // 2
+            out = []
+            for off, length, t in base:
+                if t < 2:
+                    out.append((off, length, t))
+                    continue
+                out.append((off, half, (t + 1) // 2))
+                out.append((off + half, base_minutes - half, t // 2))
+            return out
+
+        if d.exhausted >= 0.5:
+            n = len(base)
+            cap = s.ADAPTIVE_PAGE_ITEMS * s.ADAPTIVE_MERGE_PAGES
+            best = 1
+            for k in range(2, n + 1):
+                if n % k == 0 and k * base_minutes <= s.ADAPTIVE_MAX_MINUTES and d.rate * k * base_minutes <= cap:
+                    best = k
+            if best > 1:
+                return [
+                    (base[i][0], best * base_minutes, sum(t for _, _, t in base[i:i + best]))
+                    for i in range(0, n, best)
+                ]
+        return base
@@ -0,0 +1,186 @@
+# src/utils/archive.py
+# ============================================================
+# ARCHIVO DE HTML CRUDO (blobs comprimidos + índice SQLite)
+# ============================================================
+# Nota:
+# - src/scraping/replay.py re-parsea las páginas ya bajadas sin navegador ni red.
+# ============================================================
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    window_id   TEXT    NOT NULL,
+    window_end  TEXT    NOT NULL,
+    channel     TEXT    NOT NULL,
+    mirror      TEXT    NOT NULL,
+    query_hash  TEXT    NOT NULL,
+    attempt_utc TEXT    NOT NULL,
+    page_index  INTEGER NOT NULL,
+    accumulated INTEGER NOT NULL,
+    target      INTEGER NOT NULL,
+    sha256      TEXT    NOT NULL,
+    codec       TEXT    NOT NULL,
+    n_bytes     INTEGER NOT NULL,
+    PRIMARY KEY (window_id, window_end, channel, mirror, query_hash, attempt_utc, page_index)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256   TEXT    PRIMARY KEY,
+    codec    TEXT    NOT NULL,
+    n_bytes  INTEGER NOT NULL,
+    n_stored INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+_SUFFIX = {"zstd": ".html.zst", "gzip": ".html.gz"}
+
+
+def resolve_codec(codec: str = "auto") -> str:
+    """"zstd" (requiere zstandard), "gzip" (stdlib) o "auto" (zstd si está instalado)."""
+    if codec not in ("auto", "zstd", "gzip"):
+        raise ValueError(f"ARCHIVE_CODEC desconocido: {codec!r}")
+    if codec == "gzip":
+        return "gzip"
+    try:
+        import zstandard  # noqa: F401
+    except ImportError as e:
+        if codec == "zstd":
+            raise RuntimeError("ARCHIVE_CODEC='zstd' requiere zstandard (pip install zstandard)") from e
+        return "gzip"
+    return "zstd"
+
+
+def compress(data: bytes, codec: str, level: int | None = None) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=level or 10).compress(data)
+    return gzip.compress(data, compresslevel=level or 6)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def blob_path(root: Path, sha256: str, codec: str) -> Path:
+    return Path(root) / "objects" / sha256[:2] / f"{sha256}{_SUFFIX[codec]}"
+
+
+def read_blob(root: Path, sha256: str, codec: str) -> str:
+    """HTML de un blob del archivo (sin abrir el índice: sirve en procesos de replay)."""
+    with open(blob_path(root, sha256, codec), "rb") as f:
+        return decompress(f.read(), codec).decode("utf-8")
+
+
+class PageArchive:
+    """
+    Archivo de HTML crudo direccionado por contenido (data/raw/html_archive/).
+
+    - objects/<sha[:2]>/<sha256>.html.zst|.gz: un blob por contenido distinto
+      (páginas idénticas, p.ej. "No items found", se guardan una sola vez).
+    - index.sqlite: tabla pages con la clave (subventana, canal, mirror,
+      query_hash, intento, página) -> blob; replay la recorre sin navegador.
+    - En paginación click + page_source el DOM es acumulado: se guarda solo la
+      última página del intento (accumulated=1), que contiene a las anteriores.
+    - Thread-safe (1 conexión + lock). Un error de disco no corta el scraping.
+    """
+    def __init__(self, root: Path, codec: str = "auto", level: int | None = None):
+        self.root = Path(root)
+        self.codec = resolve_codec(codec)
+        self.level = level
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.errors = 0
+
+    def put_page(self, *, window_id: str, window_end: str, channel: str, mirror: str, query_hash: str,
+                 attempt_utc: str, page_index: int, html: str, target: int, accumulated: bool = False) -> None:
+        data = html.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        try:
+            with self._lock:
+                known = self._conn.execute("SELECT codec FROM blobs WHERE sha256=?", (sha,)).fetchone()
+            codec = known[0] if known else self.codec
+            if known is None:
+                blob = compress(data, codec, self.level)
+                path = blob_path(self.root, sha, codec)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+                with open(tmp, "wb") as f:
+                    f.write(blob)
+                os.replace(tmp, path)
+            with self._lock:
+                if known is None:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO blobs (sha256, codec, n_bytes, n_stored) VALUES (?, ?, ?, ?)",
+                        (sha, codec, len(data), len(blob)),
+                    )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO pages (window_id, window_end, channel, mirror, query_hash, attempt_utc, "
+                    "page_index, accumulated, target, sha256, codec, n_bytes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (window_id, window_end, channel, mirror, query_hash, attempt_utc,
+                     int(page_index), int(accumulated), int(target), sha, codec, len(data)),
+                )
+        except (OSError, sqlite3.Error) as e:
+            self.errors += 1
+            if self.errors <= 3:
+                print(f"   ⚠️ Archivo HTML: no se pudo guardar la página ({type(e).__name__}: {e})")
+
+    def units(self, channels: list[str] | None = None, since: str | None = None,
+              until: str | None = None) -> list[dict]:
+        """
+        Unidades (subventana x canal) con sus páginas en orden de intento y de
+        página: [{window_id, window_end, channel, target, pages: [...]}].
+        since/until filtran window_id ("YYYY-MM-DD[ HH:MM]", until exclusivo).
+        """
+        sql = ("SELECT window_id, window_end, channel, mirror, query_hash, attempt_utc, page_index, "
+               "accumulated, target, sha256, codec FROM pages WHERE 1=1")
+        args: list = []
+        if channels:
+            sql += f" AND channel IN ({','.join('?' * len(channels))})"
+            args.extend(channels)
+        if since:
+            sql += " AND window_id >= ?"
+            args.append(since)
+        if until:
+            sql += " AND window_id < ?"
+            args.append(until)
+        sql += " ORDER BY window_id, window_end, channel, attempt_utc, mirror, page_index"
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+
+        out: list[dict] = []
+        for r in rows:
+            key = (r[0], r[1], r[2])
+            if not out or (out[-1]["window_id"], out[-1]["window_end"], out[-1]["channel"]) != key:
+                out.append({"window_id": r[0], "window_end": r[1], "channel": r[2], "target": 0, "pages": []})
+            unit = out[-1]
+            unit["target"] = max(unit["target"], r[8])
+            unit["pages"].append({"mirror": r[3], "query_hash": r[4], "attempt_utc": r[5], "page_index": r[6],
+                                  "accumulated": bool(r[7]), "sha256": r[9], "codec": r[10]})
+        return out
+
+    def summary(self) -> dict:
+        with self._lock:
+            pages, raw = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(n_bytes), 0) FROM pages").fetchone()
+            blobs, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(n_stored), 0) FROM blobs").fetchone()
+        return {"pages": pages, "blobs": blobs, "html_bytes": raw, "stored_bytes": stored,
+                "ratio": round(raw / stored, 2) if stored else None, "codec": self.codec, "errors": self.errors}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,136 @@
+# src/utils/dataset_parquet.py
+# ============================================================
+# DATASET EN PARQUET (Arrow) PARTICIONADO + SCHEMA EXPLÍCITO
+# ============================================================
+# Nota:
+# - Layout Hive: <root>/day=YYYY-MM-DD/query_type=<canal>/part-<run>-<n>.parquet
+#   (day = día LOCAL de timestamp_local, igual que el presupuesto diario).
+# - Cada flush escribe un archivo por partición tocada (tmp + os.replace):
+#   lo que está en disco siempre es legible, coherente con el ledger/resume.
+# - query_type vive en la ruta (no dentro del archivo); leer con
+#   partitioning="hive" o con read_channel_day() para recuperarlo.
+# - pyarrow es opcional: solo se importa con DATASET_FORMAT="parquet".
+# ============================================================
+
+from __future__ import annotations
+
+import itertools
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+# Mismo orden de columnas que el CSV (ver SubwindowCollector.consume).
+DATASET_COLUMNS: tuple[str, ...] = (
+    "window_id",
+    "timestamp_local",
+    "timestamp_utc",
+    "query_type",
+    "usuario",
+    "texto_raw",
+    "texto_norm",
+    "hashtags",
+    "menciones",
+    "replies",
+    "retweets",
+    "quotes",
+    "likes",
+    "stats_raw",
+    "stats_len",
+    "stats_suspect",
+    "status_id",
+    "mirror_used",
+    "mode_used",
+    "query_hash",
+)
+
+PARTITION_COLUMNS: tuple[str, ...] = ("day", "query_type")
+
+_TIMESTAMP_COLUMNS = {"timestamp_local": "America/Bogota", "timestamp_utc": "UTC"}
+_INT_COLUMNS = {"replies": "int64", "retweets": "int64", "quotes": "int64", "likes": "int64",
+                "stats_len": "int16", "stats_suspect": "int8"}
+
+_RUN_TOKEN = uuid.uuid4().hex[:8]
+_PART_SEQ = itertools.count()
+
+
+def require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("DATASET_FORMAT='parquet' requiere pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def dataset_schema():
+    """Schema fijo de los archivos (sin query_type: va en la partición)."""
+    pa = require_pyarrow()
+    fields = []
+    for col in DATASET_COLUMNS:
+        if col == "query_type":
+            continue
+        if col in _TIMESTAMP_COLUMNS:
+            typ = pa.timestamp("us", tz=_TIMESTAMP_COLUMNS[col])
+        elif col in _INT_COLUMNS:
+            typ = pa.type_for_alias(_INT_COLUMNS[col])
+        else:
+            typ = pa.string()
+        fields.append(pa.field(col, typ, nullable=(col not in ("status_id", "timestamp_utc"))))
+    return pa.schema(fields)
+
+
+def rows_to_table(rows: list[dict], schema=None):
+    """Filas (dicts del extractor) -> pyarrow.Table con el schema fijo."""
+    pa = require_pyarrow()
+    schema = schema if schema is not None else dataset_schema()
+    arrays = []
+    for f in schema:
+        vals = [r.get(f.name) for r in rows]
+        if f.name in _TIMESTAMP_COLUMNS:
+            vals = [datetime.fromisoformat(v) if v else None for v in vals]
+        arrays.append(pa.array(vals, type=f.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def partition_dir(root: Path, day: str, query_type: str) -> Path:
+    return Path(root) / f"day={day}" / f"query_type={query_type}"
+
+
+def append_parquet_rows(root: Path, rows: list[dict], compression: str = "zstd") -> list[Path]:
+    """
+    Escribe las filas como archivos nuevos, uno por (día local, query_type).
+    Devuelve las rutas escritas.
+    """
+    if not rows:
+        return []
+    import pyarrow.parquet as pq
+
+    schema = dataset_schema()
+    groups: dict[tuple[str, str], list[dict]] = defaultdict(list)
+    for r in rows:
+        groups[(r["timestamp_local"][:10], r["query_type"])].append(r)
+
+    written = []
+    for (day, qt), part_rows in groups.items():
+        out_dir = partition_dir(root, day, qt)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        out = out_dir / f"part-{_RUN_TOKEN}-{next(_PART_SEQ):05d}.parquet"
+        tmp = out.with_suffix(".parquet.tmp")
+        pq.write_table(rows_to_table(part_rows, schema), tmp, compression=compression)
+        os.replace(tmp, out)
+        written.append(out)
+    return written
+
+
+def read_channel_day(root: Path, day: str, query_type: str):
+    """Lee solo la partición (día, canal) -> pyarrow.Table (con query_type como columna)."""
+    pa = require_pyarrow()
+    import pyarrow.parquet as pq
+
+    files = sorted(partition_dir(root, day, query_type).glob("*.parquet"))
+    if not files:
+        return dataset_schema().empty_table().append_column("query_type", pa.array([], pa.string()))
+    table = pa.concat_tables([pq.read_table(f, schema=dataset_schema()) for f in files])
+    return table.append_column("query_type", pa.array([query_type] * table.num_rows, pa.string()))
@@ -2,17 +2,22 @@
 from __future__ import annotations
 
 from datetime import datetime
+from functools import lru_cache
+from typing import Iterable
 from zoneinfo import ZoneInfo
 from datetime import timezone
 
 TZ_UTC = timezone.utc
 
+# Memo de títulos ya parseados (muchos tweets comparten el mismo minuto).
+TITLE_CACHE_SIZE = 32_768
 
-def parse_date_title_utc(title: str) -> datetime | None:
-    """
-    title: 'Jun 4, 2025 · 11:59 PM UTC'
-    Devuelve datetime aware en UTC.
-    """
+_MONTHS = {m: i for i, m in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), start=1)}
+
+
+def _parse_date_title_strptime(title: str) -> datetime | None:
+    """Parser de referencia (strptime); el fast path cae aquí ante cualquier formato no canónico."""
     try:
         p = title.split("·")
         d = p[0].strip()
@@ -23,6 +28,64 @@ def parse_date_title_utc(title: str) -> datetime | None:
         return None
 
 
+def _fast_title(title: str) -> datetime | None:
+    """Formato canónico de Nitter 'Jun 4, 2025 · 11:59 PM UTC' sin strptime (None = no canónico)."""
+    parts = title.split(" ")
+    if len(parts) != 7 or parts[3] != "·" or parts[6] != "UTC":
+        return None
+    mon, day, year, _, hm, ampm, _ = parts
+    month = _MONTHS.get(mon)
+    hh, _, mm = hm.partition(":")
+    day = day[:-1] if day.endswith(",") else ""
+    if (month is None or ampm not in ("AM", "PM") or not (0 < len(day) <= 2) or len(year) != 4
+            or not (0 < len(hh) <= 2) or len(mm) != 2
+            or not (day + year + hh + mm).isascii() or not (day + year + hh + mm).isdigit()):
+        return None
+    hour = int(hh)
+    if not 1 <= hour <= 12:
+        return None
+    if ampm == "PM":
+        hour = hour % 12 + 12
+    elif hour == 12:
+        hour = 0
+    try:
+        return datetime(int(year), month, int(day), hour, int(mm), tzinfo=TZ_UTC)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def _parse_date_title_cached(title: str) -> datetime | None:
+    return _fast_title(title) or _parse_date_title_strptime(title)
+
+
+def parse_date_title_utc(title: str) -> datetime | None:
+    """
+    title: 'Jun 4, 2025 · 11:59 PM UTC'
+    Devuelve datetime aware en UTC.
+    Fast path sin strptime para el formato canónico + memo acotado por título
+    (TITLE_CACHE_SIZE); mismo resultado que _parse_date_title_strptime.
+    """
+    if isinstance(title, str):
+        return _parse_date_title_cached(title)
+    return _parse_date_title_strptime(title)
+
+
+def parse_date_titles_utc(titles: Iterable[str | None]) -> list[datetime | None]:
+    """Batch de parse_date_title_utc sobre una columna (títulos repetidos se parsean 1 vez)."""
+    seen: dict[str, datetime | None] = {}
+    out: list[datetime | None] = []
+    for t in titles:
+        if not t:
+            out.append(None)
+            continue
+        dt = seen.get(t, seen)
+        if dt is seen:
+            dt = seen[t] = parse_date_title_utc(t)
+        out.append(dt)
+    return out
+
+
 def parse_date_any_utc(item) -> datetime | None:
     """
     Intenta extraer fecha/hora del tweet como datetime aware UTC.
@@ -35,13 +98,19 @@ def parse_date_any_utc(item) -> datetime | None:
     if not a:
         return None
 
-    title = a.get("title")
+    return parse_date_fields_utc(a.get("title"), a.get("datetime"))
+
+
+def parse_date_fields_utc(title: str | None, dt_iso: str | None) -> datetime | None:
+    """
+    Igual que parse_date_any_utc, pero sobre los atributos title/datetime
+    de span.tweet-date > a ya extraídos (parsers de 1 pasada / JSON).
+    """
     if title:
         dt = parse_date_title_utc(title)
         if dt:
             return dt
 
-    dt_iso = a.get("datetime")
     if dt_iso:
         try:
             return datetime.fromisoformat(dt_iso.replace("Z", "+00:00")).astimezone(TZ_UTC)
@@ -51,6 +120,13 @@ def parse_date_any_utc(item) -> datetime | None:
     return None
 
 
+def parse_date_fields_utc_batch(titles: Iterable[str | None],
+                                dt_isos: Iterable[str | None]) -> list[datetime | None]:
+    """Batch de parse_date_fields_utc sobre 2 columnas alineadas (title, datetime)."""
+    return [dt if dt is not None else parse_date_fields_utc(None, iso)
+            for dt, iso in zip(parse_date_titles_utc(titles), dt_isos)]
+
+
 def to_epoch_utc(dt_local_aware: datetime) -> int:
     """Convierte un datetime aware en TZ_LOCAL a epoch UTC (segundos)."""
     return int(dt_local_aware.astimezone(TZ_UTC).timestamp())
@@ -0,0 +1,217 @@
+# src/utils/dedup.py
+# ============================================================
+# DEDUP PERSISTENTE DE status_id (Bloom + SQLite)
+# ============================================================
+# Nota:
+# - Un tweet ya escrito (en otra corrida u otro canal) no se duplica en el dataset.
+# ============================================================
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import sqlite3
+import struct
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+_BLOOM_MAGIC = b"TDABLOOM1"
+_BLOOM_HEADER = struct.Struct("<9sQBQ")  # magic, m_bits, k, n_synced
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    status_id      TEXT NOT NULL PRIMARY KEY,
+    channel        TEXT NOT NULL,
+    first_seen_utc TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS memberships (
+    status_id TEXT NOT NULL,
+    channel   TEXT NOT NULL,
+    window_id TEXT NOT NULL,
+    PRIMARY KEY (status_id, channel)
+) WITHOUT ROWID;
+"""
+
+
+class BloomFilter:
+    """Bloom filter en un bytearray (memoria fija: m_bits / 8 bytes)."""
+    def __init__(self, m_bits: int, k: int, data: bytearray | None = None):
+        self.m_bits = int(m_bits)
+        self.k = int(k)
+        self.bits = data if data is not None else bytearray((self.m_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float) -> "BloomFilter":
+        n = max(1, int(capacity))
+        m = int(math.ceil(-n * math.log(fp_rate) / (math.log(2) ** 2)))
+        k = max(1, int(round((m / n) * math.log(2))))
+        return cls(m, k)
+
+    def _positions(self, key: str):
+        d = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(d[:8], "little")
+        h2 = int.from_bytes(d[8:], "little") | 1
+        m = self.m_bits
+        for i in range(self.k):
+            yield (h1 + i * h2) % m
+
+    def add(self, key: str) -> None:
+        bits = self.bits
+        for p in self._positions(key):
+            bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class StatusIdIndex:
+    """
+    Índice persistente de status_id ya escritos (entre corridas y entre canales).
+
+    - Bloom filter en memoria (tamaño fijo según DEDUP_CAPACITY / DEDUP_FP_RATE):
+      un id nuevo se descarta en O(1) sin tocar disco (el caso común).
+    - Store exacto en SQLite (logs/): solo se consulta si el Bloom dice "quizás".
+    - reserve() aparta ids para el buffer actual; commit() los persiste recién
+      después del flush del dataset (si el proceso muere antes, no quedan
+      marcados como vistos y el resume los vuelve a capturar).
+      Si la escritura falla, release() los libera (otra subventana / mirror
+      puede volver a entregarlos).
+    - memberships: (status_id, canal) extra cuando el tweet ya estaba escrito
+      por otro canal, en lugar de duplicar la fila.
+    """
+    def __init__(self, db_path: Path, bloom_path: Path, capacity: int, fp_rate: float,
+                 save_every: int = 50_000):
+        self.db_path = Path(db_path)
+        self.bloom_path = Path(bloom_path)
+        self.save_every = int(save_every)
+        self._lock = threading.Lock()
+        self._pending: set[str] = set()
+        self._since_save = 0
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self._n = self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+        self.bloom = self._load_bloom(capacity, fp_rate)
+
+    # -----------------------------
+    # Bloom: carga / persistencia
+    # -----------------------------
+    def _load_bloom(self, capacity: int, fp_rate: float) -> BloomFilter:
+        fresh = BloomFilter.for_capacity(max(capacity, self._n * 2), fp_rate)
+        if self.bloom_path.exists():
+            with open(self.bloom_path, "rb") as f:
+                head = f.read(_BLOOM_HEADER.size)
+                if len(head) == _BLOOM_HEADER.size:
+                    magic, m_bits, k, n_synced = _BLOOM_HEADER.unpack(head)
+                    if magic == _BLOOM_MAGIC and n_synced == self._n and m_bits >= fresh.m_bits // 2:
+                        return BloomFilter(m_bits, k, bytearray(f.read()))
+
+        # Sin archivo, parámetros viejos o desincronizado (corte abrupto): reconstruir desde SQLite.
+        if self._n:
+            print(f"🧮 Dedup: reconstruyendo Bloom desde {self._n} status_id en {self.db_path.name}...")
+            for (sid,) in self._conn.execute("SELECT status_id FROM seen"):
+                fresh.add(sid)
+        return fresh
+
+    def _save_bloom_locked(self) -> None:
+        tmp = self.bloom_path.with_suffix(self.bloom_path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_BLOOM_HEADER.pack(_BLOOM_MAGIC, self.bloom.m_bits, self.bloom.k, self._n))
+            f.write(self.bloom.bits)
+        os.replace(tmp, self.bloom_path)
+        self._since_save = 0
+
+    # -----------------------------
+    # Consultas
+    # -----------------------------
+    def _seen_locked(self, sid: str) -> bool:
+        if sid in self._pending:
+            return True
+        if sid not in self.bloom:
+            return False
+        return self._conn.execute("SELECT 1 FROM seen WHERE status_id=?", (sid,)).fetchone() is not None
+
+    def __contains__(self, sid: str) -> bool:
+        with self._lock:
+            return self._seen_locked(sid)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._n + len(self._pending)
+
+    def reserve(self, rows: list[dict]) -> tuple[list[dict], list[dict]]:
+        """
+        Separa filas nuevas de duplicadas y aparta los ids nuevos (pendientes de commit).
+        Devuelve (nuevas, duplicadas).
+        """
+        new_rows: list[dict] = []
+        dups: list[dict] = []
+        with self._lock:
+            for r in rows:
+                sid = r.get("status_id") or ""
+                if not sid:
+                    new_rows.append(r)
+                    continue
+                if self._seen_locked(sid):
+                    dups.append(r)
+                else:
+                    self._pending.add(sid)
+                    new_rows.append(r)
+        return new_rows, dups
+
+    def commit(self, rows: list[dict]) -> None:
+        """Persiste los ids de filas ya escritas en el dataset."""
+        now = datetime.now(timezone.utc).isoformat()
+        params = [(r["status_id"], r.get("query_type", ""), now) for r in rows if r.get("status_id")]
+        if not params:
+            return
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                before = self._conn.total_changes
+                cur.executemany("INSERT OR IGNORE INTO seen (status_id, channel, first_seen_utc) VALUES (?, ?, ?)", params)
+                inserted = self._conn.total_changes - before
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+            for sid, _, _ in params:
+                self.bloom.add(sid)
+                self._pending.discard(sid)
+            self._n += inserted
+            self._since_save += inserted
+            if self._since_save >= self.save_every:
+                self._save_bloom_locked()
+
+    def release(self, rows: list[dict]) -> None:
+        """Libera los ids reservados de filas que no llegaron al dataset (escritura fallida)."""
+        with self._lock:
+            for r in rows:
+                sid = r.get("status_id")
+                if sid:
+                    self._pending.discard(sid)
+
+    def record_memberships(self, rows: list[dict]) -> None:
+        params = [(r["status_id"], r.get("query_type", ""), r.get("window_id", "")) for r in rows if r.get("status_id")]
+        if not params:
+            return
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            cur.executemany(
+                "INSERT OR IGNORE INTO memberships (status_id, channel, window_id) VALUES (?, ?, ?)", params
+            )
+            cur.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._save_bloom_locked()
+            self._conn.close()
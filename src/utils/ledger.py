@@ -0,0 +1,138 @@
+# src/utils/ledger.py
+# ============================================================
+# LEDGER DE PROGRESO (SQLite) PARA --resume
+# ============================================================
+# Nota:
+# - Una fila por unidad subventana x canal (done / short / failed).
+# - El orquestador salta las unidades "done" al reanudar.
+# ============================================================
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    window_id   TEXT    NOT NULL,
+    window_end  TEXT    NOT NULL,
+    channel     TEXT    NOT NULL,
+    target      INTEGER NOT NULL,
+    obtained    INTEGER NOT NULL,
+    status      TEXT    NOT NULL,
+    attempts    INTEGER NOT NULL,
+    updated_utc TEXT    NOT NULL,
+    PRIMARY KEY (window_id, window_end, channel)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS unit_ids (
+    window_id  TEXT NOT NULL,
+    window_end TEXT NOT NULL,
+    channel    TEXT NOT NULL,
+    status_id  TEXT NOT NULL,
+    PRIMARY KEY (window_id, window_end, channel, status_id)
+) WITHOUT ROWID;
+"""
+
+
+class ProgressLedger:
+    """
+    Ledger durable (SQLite en logs/) de unidades subventana x canal terminadas.
+
+    - status: "done" (obtained >= target), "short" (0 < obtained < target), "failed" (0).
+    - Para unidades "short" guarda los status_id ya escritos, así un reintento
+      en modo resume no duplica filas en el dataset.
+    - Solo un reintento de resume suma a la fila previa; una corrida sin --resume
+      que vuelve a bajar la unidad la reemplaza (mismos tweets, no se cuentan 2 veces).
+    - Thread-safe (1 conexión + lock); cada record() es una transacción.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, window_id: str, window_end: str, channel: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT target, obtained, status, attempts FROM units "
+                "WHERE window_id=? AND window_end=? AND channel=?",
+                (window_id, window_end, channel),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"target": row[0], "obtained": row[1], "status": row[2], "attempts": row[3]}
+
+    def known_ids(self, window_id: str, window_end: str, channel: str) -> frozenset[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status_id FROM unit_ids WHERE window_id=? AND window_end=? AND channel=?",
+                (window_id, window_end, channel),
+            ).fetchall()
+        return frozenset(r[0] for r in rows)
+
+    def record(self, window_id: str, window_end: str, channel: str, target: int,
+               new_rows: list[dict], resumed: bool = False) -> str:
+        """
+        Registra las filas nuevas (ya persistidas en el dataset) de la unidad y
+        actualiza su estado. Devuelve el status resultante.
+        resumed=True (reintento de resume): suma a obtained/attempts previos y
+        conserva el target original; si no, reemplaza la fila.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        ids = [r.get("status_id", "") for r in new_rows]
+
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                prev = cur.execute(
+                    "SELECT obtained, attempts, target FROM units WHERE window_id=? AND window_end=? AND channel=?",
+                    (window_id, window_end, channel),
+                ).fetchone()
+                if not resumed:
+                    prev = None
+                    cur.execute(
+                        "DELETE FROM unit_ids WHERE window_id=? AND window_end=? AND channel=?",
+                        (window_id, window_end, channel),
+                    )
+                # En un reintento 'target' es lo que faltaba: se conserva el target original.
+                target = prev[2] if prev else int(target)
+                obtained = (prev[0] if prev else 0) + len(new_rows)
+                attempts = (prev[1] if prev else 0) + 1
+                status = "done" if obtained >= target else ("short" if obtained > 0 else "failed")
+
+                cur.execute(
+                    "INSERT OR REPLACE INTO units "
+                    "(window_id, window_end, channel, target, obtained, status, attempts, updated_utc) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (window_id, window_end, channel, target, obtained, status, attempts, now),
+                )
+                if status == "short":
+                    cur.executemany(
+                        "INSERT OR IGNORE INTO unit_ids (window_id, window_end, channel, status_id) VALUES (?, ?, ?, ?)",
+                        [(window_id, window_end, channel, sid) for sid in ids if sid],
+                    )
+                else:
+                    cur.execute(
+                        "DELETE FROM unit_ids WHERE window_id=? AND window_end=? AND channel=?",
+                        (window_id, window_end, channel),
+                    )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+        return status
+
+    def summary(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall()
+        return {k: v for k, v in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,275 @@
+# src/utils/live_metrics.py
+from __future__ import annotations
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+
+def log_buckets(lo: float, hi: float, factor: float) -> tuple[float, ...]:
+    """Límites superiores lo, lo*factor, ... hasta >= hi (error relativo de cuantil <= factor - 1)."""
+    out, b = [], float(lo)
+    while b < hi:
+        out.append(round(b, 4))
+        b *= factor
+    out.append(round(b, 4))
+    return tuple(out)
+
+
+# Latencia de un intento (s): 50 ms .. ~10 min, buckets x1.25
+LATENCY_BUCKETS = log_buckets(0.05, 600.0, 1.25)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """
+    Histograma de buckets fijos (memoria constante): count por bucket + sum.
+    quantile() interpola dentro del bucket, como histogram_quantile de Prometheus.
+    """
+    __slots__ = ("bounds", "counts", "total", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # último = +Inf
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect_left(self.bounds, v)] += 1
+        self.total += 1
+        self.sum += v
+
+    def quantile(self, q: float) -> float | None:
+        if self.total == 0:
+            return None
+        rank = q * self.total
+        cum = 0
+        for i, c in enumerate(self.counts):
+            if c and cum + c >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                return lo + (self.bounds[i] - lo) * (rank - cum) / c
+            cum += c
+        return self.bounds[-1]
+
+    def samples(self, name: str, labels: str) -> list[str]:
+        out, cum = [], 0
+        sep = "," if labels else ""
+        for b, c in zip(self.bounds, self.counts):
+            cum += c
+            out.append(f'{name}_bucket{{{labels}{sep}le="{b:g}"}} {cum}')
+        out.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.total}')
+        lbl = f"{{{labels}}}" if labels else ""
+        out.append(f"{name}_sum{lbl} {self.sum:.6g}")
+        out.append(f"{name}_count{lbl} {self.total}")
+        return out
+
+
+def _esc(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _num(v: float | None) -> str:
+    if v is None or (isinstance(v, float) and math.isnan(v)):
+        return "NaN"
+    return f"{v:.6g}"
+
+
+class LiveMetrics:
+    """
+    Métricas en vivo de la corrida para el endpoint /metrics (formato texto de Prometheus).
+    - Por mirror y por canal: intentos por resultado (ok / empty / error), tweets,
+      histograma de latencia del intento + cuantiles p50/p95/p99 estimados.
+    - Páginas por intento (histograma), tweets/min en ventana deslizante.
+    - add_gauge(): valores leídos al momento del scrape (backlog del writer, buffer, etc.).
+    Telemetry.update_after_request alimenta observe_request; thread-safe.
+    """
+    def __init__(self, rate_window_min: int = 5, max_pages: int = 12):
+        self.rate_window_min = max(1, int(rate_window_min))
+        self.t0 = time.time()
+        self._lock = threading.Lock()
+        self._lat: dict[tuple[str, str], Histogram] = {}
+        self._outcomes: dict[tuple[str, str, str], int] = {}
+        self._tweets: dict[tuple[str, str], int] = {}
+        self._pages = Histogram(tuple(float(k) for k in range(1, max(1, int(max_pages)) + 1)))
+        self._per_min: deque[list] = deque(maxlen=self.rate_window_min + 1)  # [minuto epoch, tweets]
+        self._gauges: list[tuple[str, str, str, Callable[[], object]]] = []
+
+    def observe_request(self, channel: str, mirror: str, outcome: str, latency_sec: float,
+                        pages: int, obtained: int) -> None:
+        now_min = int(time.time() // 60)
+        with self._lock:
+            for key in (("mirror", mirror), ("channel", channel)):
+                h = self._lat.get(key)
+                if h is None:
+                    h = self._lat[key] = Histogram(LATENCY_BUCKETS)
+                h.observe(float(latency_sec))
+                ko = key + (outcome,)
+                self._outcomes[ko] = self._outcomes.get(ko, 0) + 1
+                self._tweets[key] = self._tweets.get(key, 0) + int(obtained)
+            if pages:
+                self._pages.observe(float(pages))
+            self._add_tweets_locked(now_min, obtained)
+
+    def add_tweets(self, n: int) -> None:
+        """Filas que no vienen de un request (p.ej. canales derivados por el planner)."""
+        with self._lock:
+            self._add_tweets_locked(int(time.time() // 60), n)
+
+    def _add_tweets_locked(self, now_min: int, n: int) -> None:
+        if self._per_min and self._per_min[-1][0] == now_min:
+            self._per_min[-1][1] += int(n)
+        else:
+            self._per_min.append([now_min, int(n)])
+
+    def tweets_per_min(self) -> float:
+        """Promedio de los últimos rate_window_min minutos (el actual, proporcional; mínimo 1 min)."""
+        now = time.time()
+        now_min = int(now // 60)
+        with self._lock:
+            total = sum(n for m, n in self._per_min if m > now_min - self.rate_window_min)
+        span_min = min(self.rate_window_min - 1 + (now % 60) / 60, (now - self.t0) / 60)
+        return total / max(1.0, span_min)
+
+    def add_gauge(self, name: str, help_text: str, fn: Callable[[], object], kind: str = "gauge") -> None:
+        """fn() -> número, o dict {etiquetas (str 'k="v"') : número}; se evalúa en cada scrape."""
+        self._gauges.append((name, help_text, kind, fn))
+
+    def quantiles(self, kind: str, name: str) -> dict[float, float | None]:
+        with self._lock:
+            h = self._lat.get((kind, name))
+            return {q: (h.quantile(q) if h is not None else None) for q in QUANTILES}
+
+    def render(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            lat = sorted(self._lat.items())
+            outcomes = sorted(self._outcomes.items())
+            tweets = sorted(self._tweets.items())
+            pages = list(self._pages.samples("sismografo_pages_per_attempt", ""))
+            quant = [(k, {q: h.quantile(q) for q in QUANTILES}) for k, h in lat]
+            lat_samples = [(k, h.samples("sismografo_attempt_latency_seconds", f'{k[0]}="{_esc(k[1])}"'))
+                           for k, h in lat]
+
+        lines += ["# HELP sismografo_up_seconds Segundos desde el inicio de la corrida.",
+                  "# TYPE sismografo_up_seconds gauge",
+                  f"sismografo_up_seconds {time.time() - self.t0:.1f}"]
+
+        lines += ["# HELP sismografo_attempts_total Intentos mirror x subventana por resultado.",
+                  "# TYPE sismografo_attempts_total counter"]
+        for (kind, name, outcome), n in outcomes:
+            lines.append(f'sismografo_attempts_total{{{kind}="{_esc(name)}",outcome="{outcome}"}} {n}')
+
+        lines += ["# HELP sismografo_tweets_total Tweets válidos obtenidos.",
+                  "# TYPE sismografo_tweets_total counter"]
+        for (kind, name), n in tweets:
+            lines.append(f'sismografo_tweets_total{{{kind}="{_esc(name)}"}} {n}')
+
+        lines += [f"# HELP sismografo_tweets_per_min Tweets/min de los últimos {self.rate_window_min} min.",
+                  "# TYPE sismografo_tweets_per_min gauge",
+                  f"sismografo_tweets_per_min {self.tweets_per_min():.3f}"]
+
+        lines += ["# HELP sismografo_attempt_latency_seconds Duración de cada intento mirror x subventana.",
+                  "# TYPE sismografo_attempt_latency_seconds histogram"]
+        for _, samples in lat_samples:
+            lines += samples
+
+        lines += ["# HELP sismografo_attempt_latency_quantile_seconds Cuantiles estimados desde el histograma.",
+                  "# TYPE sismografo_attempt_latency_quantile_seconds gauge"]
+        for (kind, name), qs in quant:
+            for q, v in qs.items():
+                lines.append(f'sismografo_attempt_latency_quantile_seconds{{{kind}="{_esc(name)}",'
+                             f'quantile="{q:g}"}} {_num(v)}')
+
+        lines += ["# HELP sismografo_pages_per_attempt Páginas recorridas por intento (mirror x subventana).",
+                  "# TYPE sismografo_pages_per_attempt histogram"]
+        lines += pages
+
+        for name, help_text, kind, fn in self._gauges:
+            try:
+                value = fn()
+            except Exception:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            if isinstance(value, dict):
+                for labels, v in sorted(value.items()):
+                    lines.append(f"{name}{{{labels}}} {_num(v)}")
+            else:
+                lines.append(f"{name} {_num(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def register_run_gauges(metrics: LiveMetrics, telemetry, writer=None, mirror_scheduler=None,
+                        rate_limiter=None, backlog: Callable[[], int] | None = None) -> None:
+    """Gauges de la corrida leídos en cada scrape (RunStats, writer, scheduler, rate limiter)."""
+    s = telemetry.stats
+    metrics.add_gauge("sismografo_rows_written_total", "Filas escritas al dataset.",
+                      lambda: s.total_rows_written, kind="counter")
+    metrics.add_gauge("sismografo_rows_deduped_total", "Filas descartadas por dedup.",
+                      lambda: s.total_rows_deduped, kind="counter")
+    metrics.add_gauge("sismografo_hedges_total", "Hedges lanzados / ganados.",
+                      lambda: {'result="started"': s.hedges_started, 'result="won"': s.hedge_wins}, kind="counter")
+    metrics.add_gauge("sismografo_driver_recycles_total", "Reciclajes de Chrome.",
+                      lambda: s.driver_recycles, kind="counter")
+    metrics.add_gauge("sismografo_driver_rss_peak_mb", "Pico de RSS del árbol de Chrome (MB).",
+                      lambda: s.driver_rss_peak_mb)
+    if backlog is not None:
+        metrics.add_gauge("sismografo_writer_backlog", "Lotes en cola del writer de fondo.", backlog)
+    if writer is not None:
+        metrics.add_gauge("sismografo_dataset_buffer_rows", "Filas en el buffer del dataset sin flush.",
+                          lambda: len(writer.buffer))
+    if mirror_scheduler is not None:
+        def _health(field: str):
+            return lambda: {f'mirror="{_esc(m)}"': h[field] for m, h in mirror_scheduler.snapshot().items()}
+        metrics.add_gauge("sismografo_mirror_success_ewma", "Éxito reciente del mirror (EWMA).",
+                          _health("success_ewma"))
+        metrics.add_gauge("sismografo_mirror_latency_ewma_seconds", "Latencia reciente del mirror (EWMA).",
+                          _health("latency_ewma_sec"))
+        metrics.add_gauge("sismografo_mirror_circuit_open_seconds", "Segundos que le quedan al circuit breaker.",
+                          _health("circuit_open_sec_left"))
+    if rate_limiter is not None:
+        metrics.add_gauge("sismografo_mirror_rate_rps", "Tasa actual del token bucket por mirror.",
+                          lambda: {f'mirror="{_esc(m)}"': b["rate_rps"] for m, b in rate_limiter.snapshot().items()})
+
+
+class MetricsServer:
+    """HTTP local (thread daemon) que sirve LiveMetrics.render() en /metrics."""
+    def __init__(self, metrics: LiveMetrics, host: str = "127.0.0.1", port: int = 9108):
+        self.metrics = metrics
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, int(port)), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="sismografo-metrics", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
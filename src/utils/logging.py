@@ -1,13 +1,26 @@
 # src/utils/logging.py
 from __future__ import annotations
 
+import csv
 import json
+import os
+import queue
+import threading
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from collections import defaultdict
 from pathlib import Path
+from typing import Callable
 
-import pandas as pd
+from src.utils.spans import stage_totals, trace_span
+
+# Serializa escrituras a disco: varios workers pueden escribir el mismo CSV
+# (window_log, dataset) y el chequeo de header no es atómico.
+_CSV_WRITE_LOCK = threading.Lock()
+
+# Writer en segundo plano activo (start_background_writer); None = escritura síncrona.
+_BACKGROUND_WRITER: "BackgroundWriter | None" = None
 
 
 def _short_err(e: Exception, maxlen: int = 160) -> str:
@@ -15,24 +28,251 @@ def _short_err(e: Exception, maxlen: int = 160) -> str:
     return s[:maxlen]
 
 
-def append_csv_rows(path: Path, rows: list[dict], write_header_if_new: bool = True) -> None:
+def _read_csv_header(path: Path) -> list[str] | None:
+    """Header de un CSV existente (None si no existe o está vacío)."""
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return next(csv.reader(f), None)
+    except FileNotFoundError:
+        return None
+
+
+def _fieldnames_for(rows: list[dict]) -> list[str]:
+    # Unión de claves en orden de aparición (mismo criterio que pd.DataFrame(rows)).
+    return list(dict.fromkeys(k for r in rows for k in r))
+
+
+def _rewrite_with_header(path: Path, fieldnames: list[str]) -> None:
+    """Reescribe un CSV existente con un header más amplio (columnas nuevas vacías en filas viejas)."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(path, "r", encoding="utf-8", newline="") as src, \
+            open(tmp, "w", encoding="utf-8", newline="") as dst:
+        w = csv.DictWriter(dst, fieldnames=fieldnames, restval="", extrasaction="ignore", lineterminator="\n")
+        w.writeheader()
+        for row in csv.DictReader(src):
+            w.writerow(row)
+    os.replace(tmp, path)
+
+
+class _CsvHandle:
+    """
+    Archivo CSV abierto en modo append con columnas del header del archivo o del primer lote.
+    Si llega una clave que no está en el header (p.ej. log de una corrida anterior sin
+    columnas nuevas), reescribe el archivo con la unión de columnas en vez de descartarla.
+    """
+    def __init__(self, path: Path, rows: list[dict], write_header_if_new: bool):
+        self.path = Path(path)
+        header = _read_csv_header(self.path)
+        self.has_header = write_header_if_new  # False: CSV sin header, no se puede ampliar
+        self.fieldnames = header if header else _fieldnames_for(rows)
+        self._dropped: set[str] = set()
+        self._open()
+        if not header and write_header_if_new:
+            self.writer.writeheader()
+
+    def _open(self) -> None:
+        self.f = open(self.path, "a", encoding="utf-8", newline="")
+        self.writer = csv.DictWriter(self.f, fieldnames=self.fieldnames, restval="",
+                                     extrasaction="ignore", lineterminator="\n")
+
+    def _widen(self, rows: list[dict]) -> None:
+        known = set(self.fieldnames)
+        extra = [k for k in _fieldnames_for(rows) if k not in known]
+        if not extra:
+            return
+        if not self.has_header:
+            new = [k for k in extra if k not in self._dropped]
+            if new:
+                self._dropped.update(new)
+                print(f"   ⚠️ {self.path.name}: CSV sin header, columnas descartadas: {', '.join(new)}")
+            return
+        print(f"   ℹ️ {self.path.name}: columnas nuevas {', '.join(extra)} -> reescribiendo header")
+        self.f.close()
+        self.fieldnames = self.fieldnames + extra
+        _rewrite_with_header(self.path, self.fieldnames)
+        self._open()
+
+    def write(self, rows: list[dict]) -> None:
+        self._widen(rows)
+        self.writer.writerows(rows)
+
+    def close(self) -> None:
+        self.f.close()
+
+
+def append_csv_rows(path: Path, rows: list[dict], write_header_if_new: bool = True,
+                    on_written: Callable[[], None] | None = None,
+                    on_failed: Callable[[], None] | None = None) -> None:
     """
     Append incremental a CSV (crea header solo si el archivo no existe).
     - Mantiene UTF-8.
     - Evita reescribir todo el dataset/log en memoria.
+    - Si hay un BackgroundWriter activo, solo encola: la escritura ocurre en
+      su hilo y 'on_written' corre cuando las filas ya están en disco.
+    - 'on_failed' corre si la escritura falla (en modo síncrono, antes de
+      propagar la excepción).
     """
     if not rows:
+        if on_written is not None:
+            on_written()
+        return
+
+    if _BACKGROUND_WRITER is not None:
+        _BACKGROUND_WRITER.submit_csv(path, rows, write_header_if_new, on_written, on_failed)
         return
 
-    df = pd.DataFrame(rows)
-    df.to_csv(
-        path,
-        mode="a",
-        index=False,
-        header=(write_header_if_new and (not path.exists())),
-        encoding="utf-8",
-        lineterminator="\n",
-    )
+    try:
+        with _CSV_WRITE_LOCK, trace_span("write", file=Path(path).name, rows=len(rows)):
+            h = _CsvHandle(path, rows, write_header_if_new)
+            try:
+                h.write(rows)
+            finally:
+                h.close()
+    except Exception:
+        if on_failed is not None:
+            on_failed()
+        raise
+    if on_written is not None:
+        on_written()
+
+
+def run_write_job(fn: Callable[[], object], on_written: Callable[[], None] | None = None,
+                  on_failed: Callable[[], None] | None = None) -> None:
+    """Escritura arbitraria (p.ej. Parquet) por la misma vía que append_csv_rows."""
+    if _BACKGROUND_WRITER is not None:
+        _BACKGROUND_WRITER.submit_call(fn, on_written, on_failed)
+        return
+    try:
+        with trace_span("write"):
+            fn()
+    except Exception:
+        if on_failed is not None:
+            on_failed()
+        raise
+    if on_written is not None:
+        on_written()
+
+
+class BackgroundWriter:
+    """
+    Hilo único de escritura a disco:
+    - 1 handle abierto por archivo de salida (dataset, window_log, request_log).
+    - Recibe lotes por una cola acotada (backpressure si el disco no da abasto),
+      agrupa lo que haya en cola y escribe con el csv de la stdlib (sin pandas).
+    - Los callbacks on_written corren en este hilo después del flush del lote;
+      si un job falla se cuenta en 'errors' y corre su on_failed (p.ej. liberar
+      los ids reservados en el dedup).
+    - close() drena la cola y cierra los archivos (llamar en el finally de main).
+    """
+    def __init__(self, max_queue: int = 10_000, batch_max: int = 512):
+        self.batch_max = int(batch_max)
+        self._q: queue.Queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._handles: dict[str, _CsvHandle] = {}
+        self._thread: threading.Thread | None = None
+        self.errors = 0
+
+    def start(self) -> "BackgroundWriter":
+        self._thread = threading.Thread(target=self._loop, name="sismografo-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit_csv(self, path: Path, rows: list[dict], write_header_if_new: bool,
+                   on_written: Callable[[], None] | None = None,
+                   on_failed: Callable[[], None] | None = None) -> None:
+        self._q.put(("csv", Path(path), list(rows), write_header_if_new, on_written, on_failed))
+
+    def submit_call(self, fn: Callable[[], object], on_written: Callable[[], None] | None = None,
+                    on_failed: Callable[[], None] | None = None) -> None:
+        self._q.put(("call", fn, None, None, on_written, on_failed))
+
+    def drain(self) -> None:
+        self._q.join()
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._q.put(None)
+            self._thread.join()
+            self._thread = None
+        for h in self._handles.values():
+            h.close()
+        self._handles.clear()
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._q.get()]
+            while len(batch) < self.batch_max:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = self._write_batch(batch)
+            for _ in batch:
+                self._q.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, batch: list) -> bool:
+        stop = False
+        done_callbacks = []
+        touched: set[str] = set()
+
+        for job in batch:
+            if job is None:
+                stop = True
+                continue
+            kind, target, rows, write_header_if_new, on_written, on_failed = job
+            try:
+                if kind == "csv":
+                    key = str(target)
+                    with trace_span("write", file=target.name, rows=len(rows)):
+                        h = self._handles.get(key)
+                        if h is None:
+                            h = self._handles[key] = _CsvHandle(target, rows, write_header_if_new)
+                        h.write(rows)
+                    touched.add(key)
+                else:
+                    with trace_span("write"):
+                        target()
+            except Exception as e:
+                self.errors += 1
+                print(f"   ⚠️ Error en writer de fondo ({kind}): {_short_err(e)}")
+                if on_failed is not None:
+                    done_callbacks.append(on_failed)
+                continue
+            if on_written is not None:
+                done_callbacks.append(on_written)
+
+        with trace_span("write_flush", files=len(touched)):
+            for key in touched:
+                self._handles[key].f.flush()
+
+        for cb in done_callbacks:
+            try:
+                cb()
+            except Exception as e:
+                print(f"   ⚠️ Error post-escritura: {_short_err(e)}")
+        return stop
+
+
+def start_background_writer(max_queue: int = 10_000) -> BackgroundWriter:
+    """Activa el writer de fondo para todas las llamadas a append_csv_rows / run_write_job."""
+    global _BACKGROUND_WRITER
+    _BACKGROUND_WRITER = BackgroundWriter(max_queue=max_queue).start()
+    return _BACKGROUND_WRITER
+
+
+def writer_backlog() -> int:
+    """Lotes en cola del writer de fondo (0 con escritura síncrona)."""
+    bw = _BACKGROUND_WRITER
+    return bw._q.qsize() if bw is not None else 0
+
+
+def stop_background_writer() -> None:
+    """Drena la cola, cierra los archivos y vuelve a escritura síncrona."""
+    global _BACKGROUND_WRITER
+    bw, _BACKGROUND_WRITER = _BACKGROUND_WRITER, None
+    if bw is not None:
+        bw.close()
 
 
 class Heartbeat:
@@ -56,6 +296,14 @@ class Heartbeat:
 @dataclass
 class RunStats:
     total_rows_written: int = 0
+    total_rows_deduped: int = 0
+    hedges_started: int = 0
+    hedge_wins: int = 0
+    planner_rows_derived: int = 0
+    planner_queries_saved: int = 0
+    planner_topups: int = 0
+    driver_recycles: int = 0
+    driver_rss_peak_mb: float = 0.0
     total_tweets_collected: int = 0
     total_requests: int = 0
     requests_ok: int = 0
@@ -68,90 +316,171 @@ class RunStats:
 
 
 class Telemetry:
-    def __init__(self, request_log_path: Path, run_summary_path: Path, write_header_if_new: bool, request_log_flush_every: int):
+    """
+    Contadores de la corrida + request_log bufferizado.
+    Thread-safe: varios workers pueden reportar en paralelo.
+    live_metrics: LiveMetrics opcional (src/utils/live_metrics.py) que se
+    actualiza con cada intento para el endpoint /metrics.
+    """
+    def __init__(self, request_log_path: Path, run_summary_path: Path, write_header_if_new: bool, request_log_flush_every: int,
+                 process_t0: float | None = None, driver_log_path: Path | None = None, live_metrics=None):
         self.request_log_path = request_log_path
+        self.live_metrics = live_metrics
+        self.driver_log_path = driver_log_path
         self.run_summary_path = run_summary_path
         self.write_header_if_new = write_header_if_new
         self.request_log_flush_every = request_log_flush_every
 
         self.run_start_utc = datetime.now(timezone.utc)
+        # Arranque: import_sec (lo pone main) y time_to_first_request_sec, medidos desde process_t0 (perf_counter).
+        self._process_t0 = time.perf_counter() if process_t0 is None else process_t0
+        self.startup: dict = {}
         self.stats = RunStats()
         self._request_log_buffer: list[dict] = []
+        self._lock = threading.Lock()
 
     def append_request_log(self, row: dict) -> None:
-        self._request_log_buffer.append(row)
-        if len(self._request_log_buffer) >= self.request_log_flush_every:
+        with self._lock:
+            self._request_log_buffer.append(row)
+            should_flush = len(self._request_log_buffer) >= self.request_log_flush_every
+        if should_flush:
             self.flush_request_log()
 
     def flush_request_log(self) -> None:
-        if not self._request_log_buffer:
+        with self._lock:
+            rows = self._request_log_buffer
+            self._request_log_buffer = []
+        if not rows:
             return
         append_csv_rows(
             path=self.request_log_path,
-            rows=self._request_log_buffer,
+            rows=rows,
             write_header_if_new=self.write_header_if_new,
         )
-        self._request_log_buffer = []
 
-    def update_after_request(self, channel: str, mirror: str, ok: bool, obtained: int, pages_used: int, t_total_sec: float, had_error: bool) -> None:
-        s = self.stats
-        s.total_requests += 1
-        s.total_pages += int(pages_used)
-
-        s.by_channel[channel]["requests"] += 1
-        s.by_mirror[mirror]["requests"] += 1
-        s.by_mirror[mirror]["lat_sum"] += float(t_total_sec)
-
-        if had_error:
-            s.requests_error += 1
-            s.by_channel[channel]["error"] += 1
-            s.by_mirror[mirror]["error"] += 1
+    def note_request_start(self) -> None:
+        """Lo llaman los pagers justo antes de cada fetch: fija time_to_first_request_sec (solo el 1ro)."""
+        if "time_to_first_request_sec" in self.startup:
             return
+        now = time.perf_counter()
+        with self._lock:
+            self.startup.setdefault("time_to_first_request_sec", now - self._process_t0)
 
-        if ok:
-            s.requests_ok += 1
-            s.by_channel[channel]["ok"] += 1
-            s.by_mirror[mirror]["ok"] += 1
-        else:
-            s.requests_empty += 1
-            s.by_channel[channel]["empty"] += 1
-            s.by_mirror[mirror]["empty"] += 1
-
-        s.total_tweets_collected += int(obtained)
-        s.by_channel[channel]["tweets"] += int(obtained)
-        s.by_mirror[mirror]["tweets"] += int(obtained)
+    def update_after_request(self, channel: str, mirror: str, ok: bool, obtained: int, pages_used: int, t_total_sec: float, had_error: bool) -> None:
+        if self.live_metrics is not None:
+            outcome = "error" if had_error else ("ok" if ok else "empty")
+            self.live_metrics.observe_request(channel, mirror, outcome, t_total_sec, pages_used,
+                                              0 if had_error else obtained)
+        with self._lock:
+            s = self.stats
+            s.total_requests += 1
+            s.total_pages += int(pages_used)
+
+            s.by_channel[channel]["requests"] += 1
+            s.by_mirror[mirror]["requests"] += 1
+            s.by_mirror[mirror]["lat_sum"] += float(t_total_sec)
+
+            if had_error:
+                s.requests_error += 1
+                s.by_channel[channel]["error"] += 1
+                s.by_mirror[mirror]["error"] += 1
+                return
+
+            if ok:
+                s.requests_ok += 1
+                s.by_channel[channel]["ok"] += 1
+                s.by_mirror[mirror]["ok"] += 1
+            else:
+                s.requests_empty += 1
+                s.by_channel[channel]["empty"] += 1
+                s.by_mirror[mirror]["empty"] += 1
+
+            s.total_tweets_collected += int(obtained)
+            s.by_channel[channel]["tweets"] += int(obtained)
+            s.by_mirror[mirror]["tweets"] += int(obtained)
 
     def add_rows_written(self, n: int) -> None:
-        self.stats.total_rows_written += int(n)
-
-    def write_run_summary(self, dataset_path: Path, window_log_path: Path) -> None:
+        with self._lock:
+            self.stats.total_rows_written += int(n)
+
+    def add_rows_deduped(self, n: int) -> None:
+        with self._lock:
+            self.stats.total_rows_deduped += int(n)
+
+    def add_hedge_started(self) -> None:
+        with self._lock:
+            self.stats.hedges_started += 1
+
+    def add_hedge_win(self) -> None:
+        with self._lock:
+            self.stats.hedge_wins += 1
+
+    def add_planner_derived(self, channel: str, n_rows: int, topup: bool) -> None:
+        """Unidad derivada localmente (sin request); topup = hubo que pedir remoto lo que faltaba."""
+        if self.live_metrics is not None:
+            self.live_metrics.add_tweets(n_rows)
+        with self._lock:
+            s = self.stats
+            s.planner_rows_derived += int(n_rows)
+            s.total_tweets_collected += int(n_rows)
+            s.by_channel[channel]["tweets"] += int(n_rows)
+            if topup:
+                s.planner_topups += 1
+            else:
+                s.planner_queries_saved += 1
+
+    def log_driver_event(self, row: dict) -> None:
+        """Muestra de memoria o reciclaje de un driver (event = "sample" | "recycle")."""
+        with self._lock:
+            s = self.stats
+            if row.get("event") == "recycle":
+                s.driver_recycles += 1
+            rss = row.get("rss_mb")
+            if rss is not None and rss > s.driver_rss_peak_mb:
+                s.driver_rss_peak_mb = float(rss)
+        if self.driver_log_path is not None:
+            append_csv_rows(self.driver_log_path, [row], write_header_if_new=self.write_header_if_new)
+
+    def write_run_summary(self, dataset_path: Path, window_log_path: Path, extra: dict | None = None) -> None:
         end_utc = datetime.now(timezone.utc)
         elapsed = (end_utc - self.run_start_utc).total_seconds()
 
-        by_channel = {k: dict(v) for k, v in self.stats.by_channel.items()}
-        by_mirror = {}
-        for k, v in self.stats.by_mirror.items():
-            vv = dict(v)
-            vv["avg_latency_sec"] = (vv["lat_sum"] / vv["requests"]) if vv["requests"] else None
-            by_mirror[k] = vv
+        with self._lock:
+            by_channel = {k: dict(v) for k, v in self.stats.by_channel.items()}
+            by_mirror = {}
+            for k, v in self.stats.by_mirror.items():
+                vv = dict(v)
+                vv["avg_latency_sec"] = (vv["lat_sum"] / vv["requests"]) if vv["requests"] else None
+                by_mirror[k] = vv
 
         summary = {
             "run_start_utc": self.run_start_utc.isoformat(),
             "run_end_utc": end_utc.isoformat(),
             "elapsed_sec": elapsed,
+            "startup": dict(self.startup),
             "dataset_path": str(dataset_path),
             "window_log_path": str(window_log_path),
             "request_log_path": str(self.request_log_path),
             "total_tweets_collected": self.stats.total_tweets_collected,
             "total_rows_written": self.stats.total_rows_written,
+            "total_rows_deduped": self.stats.total_rows_deduped,
             "total_requests": self.stats.total_requests,
             "requests_ok": self.stats.requests_ok,
             "requests_empty": self.stats.requests_empty,
             "requests_error": self.stats.requests_error,
             "total_pages": self.stats.total_pages,
+            "hedges_started": self.stats.hedges_started,
+            "hedge_wins": self.stats.hedge_wins,
+            "planner_rows_derived": self.stats.planner_rows_derived,
+            "planner_queries_saved": self.stats.planner_queries_saved,
+            "planner_topups": self.stats.planner_topups,
+            "driver_recycles": self.stats.driver_recycles,
+            "driver_rss_peak_mb": self.stats.driver_rss_peak_mb,
             "throughput_tweets_per_min": (self.stats.total_tweets_collected / elapsed) * 60 if elapsed > 0 else 0,
+            "stage_sec": stage_totals(),
             "by_channel": by_channel,
             "by_mirror": by_mirror,
+            **(extra or {}),
         }
 
         with open(self.run_summary_path, "w", encoding="utf-8") as f:
@@ -2,11 +2,21 @@
 from __future__ import annotations
 
 import re
-from bs4.element import Tag
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable
 
+if TYPE_CHECKING:
+    from bs4.element import Tag
 
-def clean_metric(txt: str | None) -> int:
-    """Convierte '1.2K', '1,2K', '1.1M', '—' a int."""
+
+# Memo de textos de stats ya convertidos ("0", "12", "1.2K" se repiten mucho).
+METRIC_CACHE_SIZE = 8_192
+
+_SUFFIX_MULT = {"K": 1000, "M": 1_000_000}
+
+
+def _clean_metric_regex(txt: str | None) -> int:
+    """Conversión de referencia (2 pasadas de regex); el fast path cae aquí ante casos raros."""
     if txt is None:
         return 0
     s = txt.strip().upper().replace(",", ".")
@@ -23,6 +33,37 @@ def clean_metric(txt: str | None) -> int:
     return int("".join(digits)) if digits else 0
 
 
+@lru_cache(maxsize=METRIC_CACHE_SIZE)
+def _clean_metric_cached(txt: str) -> int:
+    s = txt.strip()
+    if s.isascii():
+        if s.isdigit():
+            return int(s)
+        mult = _SUFFIX_MULT.get(s[-1:].upper())
+        if mult is not None:
+            num = s[:-1].rstrip().replace(",", ".")
+            whole, dot, frac = num.partition(".")
+            if whole.isdigit() and (not dot or frac.isdigit()):
+                return int(float(num) * mult)
+    return _clean_metric_regex(txt)
+
+
+def clean_metric(txt: str | None) -> int:
+    """
+    Convierte '1.2K', '1,2K', '1.1M', '—' a int.
+    Fast path (dígitos / sufijo K-M) + memo acotado por texto (METRIC_CACHE_SIZE);
+    mismo resultado que _clean_metric_regex.
+    """
+    if isinstance(txt, str):
+        return _clean_metric_cached(txt)
+    return _clean_metric_regex(txt)
+
+
+def clean_metrics(texts: Iterable[str | None]) -> list[int]:
+    """Batch de clean_metric sobre una columna de textos de stats."""
+    return [clean_metric(t) for t in texts]
+
+
 def parse_stats_best_effort(item: Tag) -> dict:
     """
     Auditoría:
@@ -32,8 +73,12 @@ def parse_stats_best_effort(item: Tag) -> dict:
     Asignación típica: [replies, retweets, quotes, likes]
     """
     stats_elems = item.find_all("span", class_="tweet-stat")
-    stats_raw = [s.get_text(strip=True) for s in stats_elems]
-    stats_clean = [clean_metric(x) for x in stats_raw]
+    return parse_stats_texts([s.get_text(strip=True) for s in stats_elems])
+
+
+def parse_stats_texts(stats_raw: list[str]) -> dict:
+    """Igual que parse_stats_best_effort, pero sobre los textos ya extraídos de span.tweet-stat."""
+    stats_clean = clean_metrics(stats_raw)
 
     return {
         "stats_raw": "|".join(stats_raw),
@@ -0,0 +1,162 @@
+# src/utils/spans.py
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+# Etapas de un intento (mirror x subventana); cada una es una columna t_<etapa>_sec en request_log:
+# - wait:    token del rate limiter + pausas fijas entre páginas
+# - fetch:   driver.get / click / GET HTTP (incluye transferencia en backend http)
+# - ready:   espera de "página lista" (JS_PAGE_READY) tras get/click
+# - source:  driver.page_source / execute_script de extracción (transferencia del DOM)
+# - parse:   parse_timeline_page (PARSER_BACKEND)
+# - rows:    SubwindowCollector.consume (fechas, stats, filas)
+# - archive: PageArchive.put_page
+# - log:     fila de window_log (CSV)
+STAGES: tuple[str, ...] = ("wait", "fetch", "ready", "source", "parse", "rows", "archive", "log")
+
+# Totales de la corrida por etapa (incluye "write": escrituras de CSV del dataset/logs).
+_TOTALS: Counter = Counter()
+_TOTALS_LOCK = threading.Lock()
+
+# Trace activo (start_trace); None = sin export.
+_TRACE: "TraceRecorder | None" = None
+
+
+class TraceRecorder:
+    """
+    Eventos en formato Chrome trace (abrir en https://ui.perfetto.dev o chrome://tracing).
+    - 1 evento "X" (completo) por span, ts/dur en microsegundos desde el inicio.
+    - 1 fila (tid) por thread: worker, hedge, writer de fondo.
+    - Acotado a max_events (los siguientes se cuentan en 'dropped').
+    """
+    def __init__(self, path: Path, max_events: int = 500_000):
+        self.path = Path(path)
+        self.max_events = int(max_events)
+        self.dropped = 0
+        self._t0 = time.perf_counter()
+        self._pid = os.getpid()
+        self._events: list[dict] = []
+        self._threads: set[int] = set()
+        self._lock = threading.Lock()
+
+    def complete(self, name: str, t0: float, dur: float, cat: str = "stage", args: dict | None = None) -> None:
+        """Span [t0, t0 + dur] en segundos de perf_counter."""
+        tid = threading.get_ident()
+        ev = {"name": name, "cat": cat, "ph": "X", "pid": self._pid, "tid": tid,
+              "ts": round((t0 - self._t0) * 1e6, 1), "dur": round(dur * 1e6, 1)}
+        if args:
+            ev["args"] = args
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                self.dropped += 1
+                return
+            if tid not in self._threads:
+                self._threads.add(tid)
+                self._events.append({"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid,
+                                     "args": {"name": threading.current_thread().name}})
+            self._events.append(ev)
+
+    def save(self) -> Path:
+        with self._lock:
+            events = list(self._events)
+            dropped = self.dropped
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"dropped_events": dropped}}, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        return self.path
+
+
+def start_trace(path: Path, max_events: int = 500_000) -> TraceRecorder:
+    """Activa el export de spans a un archivo Chrome trace (lo escribe stop_trace)."""
+    global _TRACE
+    _TRACE = TraceRecorder(path, max_events=max_events)
+    return _TRACE
+
+
+def stop_trace() -> Path | None:
+    """Escribe el trace activo (si hay) y lo desactiva."""
+    global _TRACE
+    tr, _TRACE = _TRACE, None
+    return tr.save() if tr is not None else None
+
+
+def add_stage_time(stage: str, sec: float) -> None:
+    with _TOTALS_LOCK:
+        _TOTALS[stage] += sec
+
+
+def stage_totals() -> dict[str, float]:
+    """Segundos acumulados por etapa en la corrida (para run_summary)."""
+    with _TOTALS_LOCK:
+        return {k: round(v, 3) for k, v in _TOTALS.items()}
+
+
+@contextmanager
+def trace_span(name: str, cat: str = "io", **args):
+    """Span suelto (fuera de un intento): suma a los totales y, con trace activo, emite el evento."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        add_stage_time(name, dt)
+        tr = _TRACE
+        if tr is not None:
+            tr.complete(name, t0, dt, cat, args or None)
+
+
+class SpanTimer:
+    """
+    Tiempos por etapa de 1 intento (mirror x subventana).
+    span(etapa) acumula en totals y, con trace activo, emite 1 evento por
+    llamada (args: page + los del intento). row() -> columnas t_<etapa>_sec.
+    """
+    def __init__(self, **args):
+        self.totals: dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        self.args = args
+        self.page = 0
+
+    @contextmanager
+    def span(self, stage: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            self.totals[stage] = self.totals.get(stage, 0.0) + dt
+            tr = _TRACE
+            if tr is not None:
+                tr.complete(stage, t0, dt, "stage", {"page": self.page, **self.args})
+
+    def close(self, name: str, t0: float, **args) -> None:
+        """Cierra el intento: suma a los totales de la corrida y emite el span del intento."""
+        dt = time.perf_counter() - t0
+        with _TOTALS_LOCK:
+            for k, v in self.totals.items():
+                _TOTALS[k] += v
+        tr = _TRACE
+        if tr is not None:
+            tr.complete(name, t0, dt, "attempt", {**self.args, **args})
+
+    def row(self) -> dict[str, float]:
+        return {f"t_{k}_sec": round(v, 4) for k, v in self.totals.items()}
+
+
+class _NullSpans:
+    """SpanTimer sin costo para pagers usados fuera de un intento (bench, tests a mano)."""
+    page = 0
+
+    def span(self, stage: str):
+        return nullcontext()
+
+
+NULL_SPANS = _NullSpans()